@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.async_lint
+~~~~~~~~~~~~~~~
+This module contains an asyncio API for linting files from within an event loop
+(e.g. an async web service).  Reading files and running checks happens in an executor,
+so the event loop stays responsive, and each file can be given a timeout.
+
+Note that work already handed to the executor cannot be interrupted: on cancellation or
+timeout, the column being checked finishes in the background but no further columns are checked
+"""
+
+import asyncio
+
+from data_linter.lint import Linter
+from data_linter.read_data import read_file
+
+
+async def alint_file(path, meta_data, file_format=None, executor=None, progress=None):
+    """
+    Read the file at path and run all checks against meta_data, returning the Linter.
+    If provided, progress is called with a progress event (a dict) after each column is checked
+    """
+    loop = asyncio.get_event_loop()
+    df = await loop.run_in_executor(executor, read_file, path, file_format, None, meta_data)
+    linter = await loop.run_in_executor(executor, Linter, df, meta_data)
+
+    def column_progress(event):
+        if progress is not None:
+            progress(dict(event, path=path))
+
+    await linter.acheck_all(executor, column_progress)
+    return linter
+
+
+async def alint_files(files, file_format=None, executor=None, timeout=None, max_concurrency=4, progress=None):
+    """
+    Lint many files concurrently.  files is an iterable of (path, meta_data) pairs.
+
+    At most max_concurrency files are linted at once, and each is given timeout seconds.
+    Returns a list with, for each file in order, either the Linter or the exception raised
+    while linting it (asyncio.TimeoutError if the timeout was exceeded)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    def emit(event):
+        if progress is not None:
+            progress(event)
+
+    async def lint_one(path, meta_data):
+        async with semaphore:
+            emit({"event": "file_started", "path": path})
+            try:
+                linter = await asyncio.wait_for(
+                    alint_file(path, meta_data, file_format, executor, progress), timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                emit({"event": "file_failed", "path": path, "error": repr(e)})
+                return e
+            emit({"event": "file_finished", "path": path, "success": linter.success()})
+            return linter
+
+    return await asyncio.gather(*[lint_one(path, meta_data) for path, meta_data in files])
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.checks
+~~~~~~~~~~~~~~~
+This module contains vectorised, row level versions of the linter's checks.
+Each check takes a pandas series of raw (untyped or typed) values and the metadata for the
+column, and returns a boolean series which is True for rows that fail the check.
+Null values only ever fail check_nulls - all other checks treat them as passing
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_linter.enums import get_enum_set
+
+INT_MAX = 2147483647
+LONG_MAX = 9223372036854775807
+
+_INTEGER_REGEX = r"^[+-]?\d+$"
+# Control characters other than tab, line feed and carriage return
+_CONTROL_CHARACTER_REGEX = r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]"
+_TYPE_LIMITS = {"int": INT_MAX, "long": LONG_MAX}
+
+# Strings are parsed this many at a time, to limit the size of the arrays of their characters
+_PARSE_CHUNK_SIZE = 2 ** 18
+# Longer strings (which can only be integers if padded with spaces or zeros) are parsed in python
+_MAX_PARSE_WIDTH = 32
+# The whitespace stripped from integers, which is the same for both ways of parsing them
+_WHITESPACE_CODES = [0, 9, 10, 11, 12, 13, 32]
+_WHITESPACE = "".join(chr(code) for code in _WHITESPACE_CODES)
+_MAX_DIGITS = 19
+
+
+def _no_failures(series):
+    return pd.Series(False, index=series.index)
+
+
+def _strings(values):
+    return values.astype(str).str.strip()
+
+
+def null_failures(series, col):
+    if col.get("nullable", True):
+        return _no_failures(series)
+    return series.isnull()
+
+
+def enum_failures(series, col):
+    notnull = series.notnull()
+    failures = _no_failures(series)
+    failures[notnull] = ~get_enum_set(col).contains(series[notnull])
+    return failures
+
+
+def control_character_failures(series, col):
+    if series.dtype.kind != "O":
+        return _no_failures(series)
+    notnull = series.notnull()
+    failures = _no_failures(series)
+    failures[notnull] = series[notnull].astype(str).str.contains(_CONTROL_CHARACTER_REGEX, regex=True)
+    return failures
+
+
+def pattern_failures(series, col, cache=None):
+    notnull = series.notnull()
+    failures = _no_failures(series)
+    # Not stripped, as great_expectations' expect_column_values_to_match_regex doesn't strip
+    values = series[notnull].astype(str)
+
+    def matches(values):
+        return values.str.contains(col["pattern"], regex=True)
+
+    if cache is None:
+        failures[notnull] = ~matches(values)
+    else:
+        failures[notnull] = cache.apply("pattern", col["pattern"], values, matches) == 0
+    return failures
+
+
+def _parse_fixed_width(strings, limit):
+    # Parse a numpy array of fixed width unicode strings as the rows of a 2d array of character
+    # codes, so each step is a numpy operation over every string at once
+    n = len(strings)
+    codes = strings.view(np.uint32).reshape(n, -1)
+    width = codes.shape[1]
+    rows = np.arange(n)
+    positions = np.arange(width)
+
+    content = ~np.isin(codes, _WHITESPACE_CODES)
+    has_content = content.any(axis=1)
+    first = content.argmax(axis=1)
+    last = width - 1 - content[:, ::-1].argmax(axis=1)
+
+    first_code = codes[rows, first]
+    negative = first_code == ord("-")
+    digits_start = first + (negative | (first_code == ord("+")))
+
+    inside = (positions >= digits_start[:, None]) & (positions <= last[:, None])
+    is_digit = (codes >= ord("0")) & (codes <= ord("9"))
+    valid = has_content & (digits_start <= last) & ~(inside & ~is_digit).any(axis=1)
+
+    # Leading zeros don't count towards the number of digits
+    significant = inside & is_digit & (codes != ord("0"))
+    first_significant = np.where(significant.any(axis=1), significant.argmax(axis=1), last + 1)
+
+    # Up to 19 digits fit in an unsigned 64 bit integer, so the magnitude can be checked against the limit
+    magnitude = np.zeros(n, dtype=np.uint64)
+    for j in range(width):
+        active = inside[:, j] & (j >= first_significant)
+        digit = codes[:, j].astype(np.uint64) - np.uint64(ord("0"))
+        magnitude = np.where(active, magnitude * np.uint64(10) + digit, magnitude)
+
+    bounds = np.where(negative, np.uint64(limit) + np.uint64(1), np.uint64(limit))
+    overflow = (last + 1 - first_significant > _MAX_DIGITS) | (magnitude > bounds)
+
+    # Negate via magnitude - 1 so that the smallest long doesn't overflow
+    ints = np.where(negative, -(magnitude - np.uint64(1)).astype(np.int64) - 1, magnitude.astype(np.int64))
+    return ints, ~valid | overflow
+
+
+def _parse_in_python(value, limit):
+    value = value.strip(_WHITESPACE)
+    if not re.match(_INTEGER_REGEX, value, flags=re.ASCII):
+        return 0, True
+    number = int(value)
+    if number < -limit - 1 or number > limit:
+        return 0, True
+    return number, False
+
+
+def parse_integer_strings(strings, limit):
+    """
+    Parse the numpy object array strings as integers between -limit - 1 and limit.  Returns an
+    int64 array of the values and a boolean array which is True where a value is not an
+    integer (after stripping whitespace), or is out of range.  strings must not contain nulls
+    """
+    ints = np.zeros(len(strings), dtype=np.int64)
+    failures = np.zeros(len(strings), dtype=bool)
+
+    for start in range(0, len(strings), _PARSE_CHUNK_SIZE):
+        chunk = pd.Series(strings[start:start + _PARSE_CHUNK_SIZE]).astype(str).values
+        short = pd.Series(chunk).str.len().values <= _MAX_PARSE_WIDTH
+        index = start + np.flatnonzero(short)
+        if len(index):
+            ints[index], failures[index] = _parse_fixed_width(np.asarray(chunk[short], dtype="U"), limit)
+        for i in np.flatnonzero(~short):
+            ints[start + i], failures[start + i] = _parse_in_python(chunk[i], limit)
+    return ints, failures
+
+
+def _integer_failures(values, limit):
+    kind = values.dtype.kind
+    if kind in "iu":
+        return (values < -limit - 1) | (values > limit)
+    if kind == "f":
+        # limit + 1 is a power of two, so is exact as a float, unlike limit for long
+        return (values != np.floor(values)) | (values < -limit - 1) | (values >= float(limit + 1))
+    if kind != "O":
+        return pd.Series(True, index=values.index)
+
+    _, failures = parse_integer_strings(values.values, limit)
+    return pd.Series(failures, index=values.index)
+
+
+def parse_integer_column(series, col_type):
+    """
+    Convert series to a nullable Int64 series of the values of the metadata type col_type ("int",
+    which is 32 bit, or "long").  Returns the converted series, and a boolean series which is
+    True for non-null values which are not integers or are out of range - these are null in the
+    converted series
+    """
+    notnull = series.notnull().values
+    ints = np.zeros(len(series), dtype=np.int64)
+    failures = np.zeros(len(series), dtype=bool)
+
+    values = series[notnull]
+    if len(values):
+        if values.dtype.kind == "O":
+            ints[notnull], failures[notnull] = parse_integer_strings(values.values, _TYPE_LIMITS[col_type])
+        else:
+            value_failures = _integer_failures(values, _TYPE_LIMITS[col_type]).values
+            failures[notnull] = value_failures
+            converted = notnull.copy()
+            converted[notnull] = ~value_failures
+            ints[converted] = values[~value_failures].astype(np.int64).values
+
+    converted = pd.Series(pd.arrays.IntegerArray(ints, ~notnull | failures), index=series.index, name=series.name)
+    return converted, pd.Series(failures, index=series.index)
+
+
+def _range_bound(col, key):
+    value = col[key]
+    try:
+        if col["type"] in ["date", "datetime"]:
+            # Values are naive, so a bound with a timezone is converted to UTC
+            value = pd.Timestamp(value)
+            return value.tz_convert(None) if value.tzinfo is not None else value
+        if col["type"] in _TYPE_LIMITS:
+            # Kept as python ints, so long bounds beyond 2**53 aren't rounded
+            if isinstance(value, str):
+                value = value.strip()
+                return int(value) if value.lstrip("+-").isdigit() else float(value)
+            return int(value) if float(value).is_integer() else float(value)
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} {value!r} of column {col['name']} is not a valid {col['type']}")
+
+
+def get_range_bounds(col):
+    """
+    Return the (minimum, maximum) from the metadata column col, converted so they can be
+    compared with values of the column's type.  Either may be None.
+    Raises a ValueError if a bound is not a valid value of the column's type
+    """
+    minimum = _range_bound(col, "minimum") if "minimum" in col else None
+    maximum = _range_bound(col, "maximum") if "maximum" in col else None
+    return minimum, maximum
+
+
+def _comparable_values(series, col_type):
+    kind = series.dtype.kind
+    if col_type in ["date", "datetime"]:
+        return series if kind == "M" else pd.to_datetime(series, errors="coerce")
+    return series if kind in "iuf" else pd.to_numeric(series, errors="coerce")
+
+
+def _bounds_failures(values, minimum, maximum):
+    # Comparisons with nulls (including values which failed to convert) are False
+    failures = pd.Series(False, index=values.index)
+    if minimum is not None:
+        failures = failures | (values < minimum)
+    if maximum is not None:
+        failures = failures | (values > maximum)
+    return failures
+
+
+def range_failures(series, col):
+    """
+    True where a value is below the minimum or above the maximum in the metadata.
+    Values which cannot be converted to the column's type are left to check_data_type
+    """
+    minimum, maximum = get_range_bounds(col)
+    values = _comparable_values(series, col["type"])
+    return _bounds_failures(values, minimum, maximum) & series.notnull()
+
+
+def length_failures(series, col):
+    """
+    True where the length of a value (as a string) is outside min_length and max_length in the metadata
+    """
+    notnull = series.notnull()
+    failures = _no_failures(series)
+    lengths = series[notnull].astype(str).str.len()
+    failures[notnull] = _bounds_failures(lengths, col.get("min_length"), col.get("max_length"))
+    return failures
+
+
+def _type_failures_of_values(values, col_type):
+    kind = values.dtype.kind
+
+    if col_type == "character":
+        return pd.Series(False, index=values.index)
+
+    if col_type in _TYPE_LIMITS:
+        return _integer_failures(values, _TYPE_LIMITS[col_type])
+
+    if col_type in ["float", "double"]:
+        if kind in "iuf":
+            return pd.Series(False, index=values.index)
+        return pd.to_numeric(values, errors="coerce").isnull()
+
+    if col_type == "boolean":
+        if kind == "b":
+            return pd.Series(False, index=values.index)
+        return ~_strings(values).str.lower().isin(["true", "false"])
+
+    if col_type in ["date", "datetime"]:
+        if kind != "M":
+            values = pd.to_datetime(values, errors="coerce")
+        failures = values.isnull()
+        if col_type == "date":
+            failures = failures | (values.dt.normalize() != values)
+        return failures
+
+    raise ValueError(f"Unknown type {col_type}")
+
+
+def type_failures(series, col, cache=None):
+    """
+    True where a non-null value cannot be converted to the type in the metadata
+    """
+    notnull = series.notnull()
+    failures = _no_failures(series)
+    values = series[notnull]
+
+    def evaluate(values):
+        return _type_failures_of_values(values, col["type"])
+
+    # Only strings are worth caching - checking already typed values is cheap
+    if cache is None or values.dtype.kind != "O" or col["type"] == "character":
+        failures[notnull] = evaluate(values)
+    else:
+        failures[notnull] = cache.apply("type_failure", col["type"], values.astype(str), evaluate) == 1
+    return failures
+
+
+ROW_CHECKS = {
+    "check_nulls": null_failures,
+    "check_pattern": pattern_failures,
+    "check_enums": enum_failures,
+    "check_data_type": type_failures,
+    "check_range": range_failures,
+    "check_length": length_failures,
+}
+
+
+def get_column_checks(col):
+    """
+    The names of the row level checks which apply to the metadata column col
+    """
+    checks = []
+    if not col.get("nullable", True):
+        checks.append("check_nulls")
+    if "pattern" in col:
+        checks.append("check_pattern")
+    if "enum" in col or "enum_file" in col:
+        checks.append("check_enums")
+    if "minimum" in col or "maximum" in col:
+        checks.append("check_range")
+    if "min_length" in col or "max_length" in col:
+        checks.append("check_length")
+    checks.append("check_data_type")
+    return checks
+
+
+# Checks which can look up the results for individual values in a VerdictCache
+CACHED_CHECKS = ["check_pattern", "check_data_type"]
+
+
+def failure_mask(check_name, series, col, cache=None):
+    """
+    Return the boolean series of rows of series which fail check_name.  If cache (a VerdictCache
+    or VerdictCacheView) is provided, it is used for the checks in CACHED_CHECKS
+    """
+    if cache is not None and check_name in CACHED_CHECKS:
+        return ROW_CHECKS[check_name](series, col, cache=cache)
+    return ROW_CHECKS[check_name](series, col)
+
+
+def failure_result(series, failures):
+    """
+    Summarise the failures of a row level check on series in the same format as great_expectations
+    """
+    element_count = len(series)
+    missing_count = int(series.isnull().sum())
+    non_missing = element_count - missing_count
+    unexpected = series[failures.values]
+    return {
+        "success": len(unexpected) == 0,
+        "result": {
+            "element_count": element_count,
+            "missing_count": missing_count,
+            "unexpected_count": len(unexpected),
+            "unexpected_percent": 100 * len(unexpected) / non_missing if non_missing else 0.0,
+            "unexpected_list": unexpected.tolist(),
+            "unexpected_index_list": unexpected.index.tolist(),
+        }
+    }
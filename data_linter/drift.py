@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.drift
+~~~~~~~~~~~~~~~
+This module contains functions for detecting drift in data which still passes all of its
+checks - e.g. the rate of nulls jumping, or the distribution of an enum shifting.
+
+Each column is summarised by compact, mergeable sketches (a null count, a HyperLogLog distinct
+count, a quantile sketch for numbers and dates and the frequencies of the top values of discrete
+columns).  The sketches of one run are stored as a baseline, and later runs are compared with it
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_linter.sketches import HyperLogLog, QuantileSketch, TopValues
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+_QUANTILE_TYPES = ["int", "long", "float", "double", "date", "datetime"]
+_TOP_VALUE_TYPES = ["character", "boolean", "int", "long"]
+
+DEFAULT_THRESHOLDS = {
+    # Largest allowed absolute change in the fraction of values which are null
+    "null_rate": 0.05,
+    # Largest allowed change in the number of distinct values, relative to the baseline
+    "distinct_count": 0.2,
+    # Largest allowed shift of any of QUANTILES, relative to the baseline's 5th to 95th percentile range
+    "quantiles": 0.1,
+    # Largest allowed total variation distance between the frequencies of the top values
+    "top_values": 0.1,
+}
+
+
+def _merge_optional(sketch, other):
+    # Either sketch may be None, e.g. if the column's type changed between runs
+    if sketch is None:
+        return other
+    if other is None:
+        return sketch
+    return sketch.merge(other)
+
+
+def _numeric_values(series, col_type):
+    # Numbers (or dates as nanoseconds) as floats, without nulls or values which don't convert
+    if col_type in ["date", "datetime"]:
+        values = pd.to_datetime(series, errors="coerce").dropna()
+        return values.values.astype("int64").astype(np.float64)
+    if pd.api.types.is_extension_array_dtype(series):
+        series = series.astype("float64")
+    return pd.to_numeric(series, errors="coerce").dropna().values.astype(np.float64)
+
+
+class ColumnSketch:
+    """
+    Mergeable sketches of the values in a single column with the metadata col
+    """
+
+    def __init__(self, col, top_k=20):
+        self.name = col["name"]
+        self.type = col["type"]
+        self.top_k = top_k
+        self.row_count = 0
+        self.null_count = 0
+        self.hll = HyperLogLog()
+        self.quantiles = QuantileSketch() if self.type in _QUANTILE_TYPES else None
+        self.top_values = TopValues(top_k) if self.type in _TOP_VALUE_TYPES else None
+
+    def update(self, series):
+        values = series.dropna()
+        self.row_count += len(series)
+        self.null_count += len(series) - len(values)
+        if len(values) == 0:
+            return
+
+        if pd.api.types.is_extension_array_dtype(values):
+            values = values.astype(object)
+        self.hll.update(values)
+        if self.quantiles is not None:
+            self.quantiles.update(_numeric_values(values, self.type))
+        if self.top_values is not None:
+            self.top_values.update(values)
+
+    def merge(self, other):
+        merged = ColumnSketch({"name": self.name, "type": self.type}, self.top_k)
+        merged.row_count = self.row_count + other.row_count
+        merged.null_count = self.null_count + other.null_count
+        merged.hll = self.hll.merge(other.hll)
+        merged.quantiles = _merge_optional(self.quantiles, other.quantiles)
+        merged.top_values = _merge_optional(self.top_values, other.top_values)
+        return merged
+
+    def null_rate(self):
+        return self.null_count / self.row_count if self.row_count else 0.0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "type": self.type,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "hll": self.hll.to_dict(),
+            "quantiles": None if self.quantiles is None else self.quantiles.to_dict(),
+            "top_values": None if self.top_values is None else self.top_values.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        top_k = d["top_values"]["k"] if d["top_values"] is not None else 20
+        sketch = cls({"name": d["name"], "type": d["type"]}, top_k)
+        sketch.row_count = d["row_count"]
+        sketch.null_count = d["null_count"]
+        sketch.hll = HyperLogLog.from_dict(d["hll"])
+        if d["quantiles"] is not None:
+            sketch.quantiles = QuantileSketch.from_dict(d["quantiles"])
+        if d["top_values"] is not None:
+            sketch.top_values = TopValues.from_dict(d["top_values"])
+        return sketch
+
+
+class TableSketch:
+    """
+    The ColumnSketch of each column in the metadata meta_data.  Can be saved as a baseline
+    with save, and loaded again with TableSketch.load
+    """
+
+    def __init__(self, meta_data=None, top_k=20):
+        self.columns = {}
+        if meta_data is not None:
+            for col in meta_data["columns"]:
+                self.columns[col["name"]] = ColumnSketch(col, top_k)
+
+    def update(self, df):
+        """
+        Add the values in the dataframe df to the sketches.  Columns missing from df are skipped
+        """
+        for name, sketch in self.columns.items():
+            if name in df.columns:
+                sketch.update(df[name])
+
+    def merge(self, other):
+        merged = TableSketch()
+        for name, sketch in self.columns.items():
+            merged.columns[name] = sketch.merge(other.columns[name]) if name in other.columns else sketch
+        for name, sketch in other.columns.items():
+            merged.columns.setdefault(name, sketch)
+        return merged
+
+    def to_dict(self):
+        return {name: sketch.to_dict() for name, sketch in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, d):
+        table = cls()
+        table.columns = {name: ColumnSketch.from_dict(sketch) for name, sketch in d.items()}
+        return table
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _drift_result(success, **result):
+    # unexpected_list and unexpected_index_list are included so the log entry can be rendered
+    result.update(unexpected_list=[], unexpected_index_list=[])
+    return {"success": bool(success), "result": result}
+
+
+def _top_value_distance(baseline, current):
+    # Total variation distance, with the values which aren't in either top values as one more value
+    p, q = baseline.frequencies(), current.frequencies()
+    values = set(p) | set(q)
+    distance = sum(abs(p.get(v, 0.0) - q.get(v, 0.0)) for v in values)
+    distance += abs((1 - sum(p.values())) - (1 - sum(q.values())))
+    return distance / 2
+
+
+def compare_column_sketches(baseline, current, thresholds):
+    """
+    Compare the ColumnSketch current with baseline, returning {check name: result}
+    with results in the same format as great_expectations
+    """
+    results = {}
+
+    base_rate, current_rate = baseline.null_rate(), current.null_rate()
+    results["check_drift_null_rate"] = _drift_result(
+        abs(current_rate - base_rate) <= thresholds["null_rate"],
+        baseline=base_rate, current=current_rate, threshold=thresholds["null_rate"])
+
+    base_distinct, current_distinct = baseline.hll.count(), current.hll.count()
+    change = abs(current_distinct - base_distinct) / max(base_distinct, 1)
+    results["check_drift_distinct_count"] = _drift_result(
+        change <= thresholds["distinct_count"],
+        baseline=base_distinct, current=current_distinct, change=change,
+        threshold=thresholds["distinct_count"])
+
+    if baseline.quantiles is not None and current.quantiles is not None \
+            and baseline.quantiles.count and current.quantiles.count:
+        base_qs = baseline.quantiles.quantiles(QUANTILES)
+        current_qs = current.quantiles.quantiles(QUANTILES)
+        scale = base_qs[-1] - base_qs[0] or abs(base_qs[2]) or 1.0
+        shift = max(abs(c - b) for b, c in zip(base_qs, current_qs)) / scale
+        results["check_drift_quantiles"] = _drift_result(
+            shift <= thresholds["quantiles"],
+            quantiles=QUANTILES, baseline=base_qs, current=current_qs, shift=shift,
+            threshold=thresholds["quantiles"])
+
+    if baseline.top_values is not None and current.top_values is not None:
+        distance = _top_value_distance(baseline.top_values, current.top_values)
+        results["check_drift_top_values"] = _drift_result(
+            distance <= thresholds["top_values"],
+            baseline=baseline.top_values.frequencies(), current=current.top_values.frequencies(),
+            distance=distance, threshold=thresholds["top_values"])
+
+    return results
+
+
+def compare_sketches(baseline, current, thresholds=None):
+    """
+    Compare the TableSketch current with baseline, returning {col name: {check name: result}}
+    for the columns in both.
+
+    thresholds overrides DEFAULT_THRESHOLDS, and may contain a dict of overrides for
+    individual columns under "columns" e.g. {"null_rate": 0.01, "columns": {"mycol": {"quantiles": 0.5}}}
+    """
+    thresholds = thresholds or {}
+    results = {}
+    for name, sketch in current.columns.items():
+        if name not in baseline.columns or sketch.row_count == 0:
+            continue
+        col_thresholds = dict(DEFAULT_THRESHOLDS)
+        col_thresholds.update({k: v for k, v in thresholds.items() if k != "columns"})
+        col_thresholds.update(thresholds.get("columns", {}).get(name, {}))
+        results[name] = compare_column_sketches(baseline.columns[name], sketch, col_thresholds)
+    return results
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.duckdb_linter
+~~~~~~~~~~~~~~~
+This module contains DuckDBLinter, which runs the linter's checks using an embedded DuckDB
+database rather than pandas and great_expectations.
+All of the checks are compiled into a single aggregate SQL query which DuckDB runs directly
+against the csv, jsonl or parquet file - in parallel and out-of-core - so the table never has
+to fit in memory.  The same query collects the row numbers of a sample of the failures of each
+check, and only those rows are brought back into pandas.
+
+DuckDB is an optional dependency: pip install duckdb
+"""
+
+import pandas as pd
+
+from data_linter.checks import get_range_bounds
+from data_linter.enums import SMALL_ENUM_SIZE, get_enum_set
+from data_linter.lint import Linter
+from data_linter.read_data import get_file_format, open_input
+from data_linter.validation_log import ValidationLog
+
+# How each metadata type is cast in DuckDB.  Character columns can hold anything
+DUCKDB_TYPES = {
+    "int": "INTEGER",
+    "long": "BIGINT",
+    "float": "DOUBLE",
+    "double": "DOUBLE",
+    "boolean": "BOOLEAN",
+    "date": "DATE",
+    "datetime": "TIMESTAMP",
+}
+
+ROW_NUMBER_COL = "__row_number"
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _leading_blank_lines(path):
+    with open_input(path) as f:
+        for i, line in enumerate(f):
+            if line.strip():
+                return i
+    return 0
+
+
+def _number_literal(value):
+    if isinstance(value, int):
+        return str(value)
+    return f"CAST({_quote_literal(repr(float(value)))} AS DOUBLE)"
+
+
+def _numeric_predicate(c, predicate):
+    # Integers are compared exactly as HUGEINTs (a DOUBLE can't hold every long), anything else as
+    # a DOUBLE, as pd.to_numeric would.  predicate takes the SQL of the value and returns a condition
+    s = f"trim(CAST({c} AS VARCHAR))"
+    return (f"(CASE WHEN regexp_full_match({s}, '[+-]?[0-9]+') THEN {predicate(f'TRY_CAST({s} AS HUGEINT)')} "
+            f"ELSE {predicate(f'TRY_CAST({c} AS DOUBLE)')} END)")
+
+
+def _source_sql(path, file_format):
+    quoted_path = _quote_literal(path)
+    if file_format == "csv":
+        # Read as strings, like pandas with dtype=object, so we can test castability.  pandas
+        # skips blank lines before the header, which DuckDB would read as the header
+        skip = _leading_blank_lines(path)
+        skip = f", skip={skip}" if skip else ""
+        return f"read_csv_auto({quoted_path}, header=true, all_varchar=true{skip})"
+    elif file_format == "jsonl":
+        return f"read_json_auto({quoted_path}, format='newline_delimited')"
+    elif file_format == "parquet":
+        return f"read_parquet({quoted_path})"
+    raise ValueError(f"DuckDBLinter cannot read file_format {file_format}")
+
+
+def get_failure_conditions(col, all_varchar=False, enum_table=None):
+    """
+    Return a dict of SQL conditions, keyed by check name, which are true
+    for the rows failing each check on the metadata column col.
+    all_varchar should be True if the column is read as strings (i.e. from csv).
+    If given, enum_table is the name of a table whose value column holds the enum.
+
+    As in the pandas backend, numeric enums and ranges are compared as numbers, and others as strings
+    """
+    c = _quote_identifier(col["name"])
+    as_string = f"CAST({c} AS VARCHAR)"
+
+    conditions = {}
+    if not col.get("nullable", True):
+        conditions["check_nulls"] = f"{c} IS NULL"
+
+    if "pattern" in col:
+        conditions["check_pattern"] = \
+            f"{c} IS NOT NULL AND NOT regexp_matches({as_string}, {_quote_literal(col['pattern'])})"
+
+    if "enum" in col or "enum_file" in col:
+        enum_set = get_enum_set(col)
+        if enum_table is not None:
+            values = f"SELECT value FROM {_quote_identifier(enum_table)}"
+        elif enum_set.size:
+            literal = _number_literal if enum_set.numeric else _quote_literal
+            values = ", ".join(literal(v) for v in enum_set.values)
+        else:
+            values = None
+
+        if values is None:
+            conditions["check_enums"] = f"{c} IS NOT NULL"
+        elif enum_set.numeric:
+            # Values which aren't numbers aren't in the enum
+            not_in = _numeric_predicate(c, lambda v: f"{v} NOT IN ({values})")
+            conditions["check_enums"] = f"{c} IS NOT NULL AND coalesce({not_in}, TRUE)"
+        else:
+            conditions["check_enums"] = f"{c} IS NOT NULL AND {as_string} NOT IN ({values})"
+
+    if "minimum" in col or "maximum" in col:
+        minimum, maximum = get_range_bounds(col)
+        bounds = [(op, b) for op, b in [("<", minimum), (">", maximum)] if b is not None]
+        if col["type"] in ["date", "datetime"]:
+            value = f"TRY_CAST({c} AS TIMESTAMP)"
+            out_of_range = " OR ".join(f"{value} {op} TIMESTAMP {_quote_literal(b.isoformat())}" for op, b in bounds)
+        else:
+            out_of_range = _numeric_predicate(
+                c, lambda v: "(" + " OR ".join(f"{v} {op} {_number_literal(b)}" for op, b in bounds) + ")")
+        conditions["check_range"] = f"{c} IS NOT NULL AND ({out_of_range})"
+
+    if "min_length" in col or "max_length" in col:
+        bad_length = []
+        if "min_length" in col:
+            bad_length.append(f"length({as_string}) < {int(col['min_length'])}")
+        if "max_length" in col:
+            bad_length.append(f"length({as_string}) > {int(col['max_length'])}")
+        conditions["check_length"] = f"{c} IS NOT NULL AND ({' OR '.join(bad_length)})"
+
+    if col["type"] in DUCKDB_TYPES:
+        cast_fails = f"TRY_CAST({c} AS {DUCKDB_TYPES[col['type']]}) IS NULL"
+        if all_varchar and col["type"] in ["int", "long"]:
+            # Don't allow strings like '2.1' to be rounded to an integer
+            cast_fails = f"(NOT regexp_full_match(trim({c}), '[+-]?[0-9]+') OR {cast_fails})"
+        conditions["check_data_type"] = f"{c} IS NOT NULL AND {cast_fails}"
+    else:
+        conditions["check_data_type"] = "FALSE"
+
+    return conditions
+
+
+class DuckDBLinter(Linter):
+    """
+    Takes the path to a data file and a table meta data object and checks the values
+    in the file against the meta data using DuckDB.
+
+    The checks are run when the linter is created.  check_all (and the individual checks)
+    then write the results to the log, which has the same format as for Linter.
+    linter.df_ge holds the first rows of the data plus the sampled failing rows,
+    indexed by their row number in the file
+    """
+
+    def __init__(self, path, meta_data, file_format=None, max_failure_samples=20):
+        import duckdb
+
+        self.meta_data = meta_data
+        self.validate_meta_data()
+        self.meta_cols = meta_data["columns"]
+
+        self.path = path
+        self.file_format = file_format or get_file_format(path)
+        self.max_failure_samples = max_failure_samples
+
+        self._con = duckdb.connect()
+        self._source = _source_sql(path, self.file_format)
+        self._results = {}
+
+        self.df_ge = self._run_checks()
+        self.vlog = ValidationLog(self)
+
+    def _execute(self, sql):
+        return self._con.execute(sql)
+
+    def _register_enum(self, i, col):
+        """
+        Large enums, and those in enum files, are registered as tables rather
+        than inlined in the query.  Returns the table name or None
+        """
+        if "enum_file" not in col and len(col.get("enum", [])) <= SMALL_ENUM_SIZE:
+            return None
+        table_name = f"__enum_{i}"
+        enum_set = get_enum_set(col)
+        values = enum_set.values if enum_set.numeric else [str(v) for v in enum_set.values]
+        self._con.register(table_name, pd.DataFrame({"value": values}))
+        return table_name
+
+    def _run_checks(self):
+        description = self._execute(f"SELECT * FROM {self._source} LIMIT 0").description
+        file_columns = [d[0] for d in description]
+        present = [c for c in self.meta_cols if c["name"] in file_columns]
+
+        aggregates = ["count(*)"]
+        aggregates.extend(f"count({_quote_identifier(c['name'])})" for c in present)
+        checks = []
+        for i, col in enumerate(present):
+            enum_table = self._register_enum(i, col)
+            conditions = get_failure_conditions(col, self.file_format == "csv", enum_table)
+            for check_name, condition in conditions.items():
+                # The count of failures, and the row numbers of the first max_failure_samples of them
+                aggregates.append(f"count(*) FILTER (WHERE {condition})")
+                aggregates.append(f"array_slice(list({ROW_NUMBER_COL} ORDER BY {ROW_NUMBER_COL}) "
+                                  f"FILTER (WHERE {condition}), 0, {self.max_failure_samples})")
+                checks.append((col["name"], check_name, condition))
+
+        numbered = f"(SELECT row_number() OVER () - 1 AS {ROW_NUMBER_COL}, * FROM {self._source})"
+        row = self._execute(f"SELECT {', '.join(aggregates)} FROM {numbered}").fetchone()
+        element_count = row[0]
+        non_null_counts = {c["name"]: n for c, n in zip(present, row[1:1 + len(present)])}
+        failures = row[1 + len(present):]
+        unexpected_counts = failures[0::2]
+        sample_rows = [list(rows or [])[:self.max_failure_samples] for rows in failures[1::2]]
+
+        # The first rows and the sampled failing rows are fetched together
+        sampled = sorted({r for rows in sample_rows for r in rows})
+        if sampled:
+            df = self._execute(f"SELECT * FROM {numbered} WHERE {ROW_NUMBER_COL} < 2 OR "
+                               f"{ROW_NUMBER_COL} IN ({', '.join(str(r) for r in sampled)})").fetchdf()
+        else:
+            df = self._execute(f"SELECT * FROM {numbered} LIMIT 2").fetchdf()
+        df = df.drop_duplicates(ROW_NUMBER_COL).set_index(ROW_NUMBER_COL).sort_index()
+        df.index.name = None
+
+        for (col_name, check_name, condition), unexpected_count, rows in zip(checks, unexpected_counts, sample_rows):
+            non_missing = non_null_counts[col_name]
+            self._results[(col_name, check_name)] = {
+                "success": unexpected_count == 0,
+                "result": {
+                    "element_count": element_count,
+                    "missing_count": element_count - non_missing,
+                    "unexpected_count": unexpected_count,
+                    "unexpected_percent": 100 * unexpected_count / non_missing if non_missing else 0.0,
+                    "unexpected_list": df.loc[rows, col_name].tolist(),
+                    "unexpected_index_list": rows,
+                }
+            }
+
+        return df[file_columns]
+
+    def _log_results(self, check_name, columns):
+        for col in self._get_meta_cols(columns):
+            key = (col["name"], check_name)
+            if key in self._results:
+                col_logentries = self.vlog[col["name"]]
+                col_logentries.create_logentry_from_ge_result(check_name, self._results[key])
+
+    def check_nulls(self, columns=None):
+        self._log_results("check_nulls", columns)
+
+    def check_pattern(self, columns=None):
+        self._log_results("check_pattern", columns)
+
+    def check_enums(self, columns=None):
+        self._log_results("check_enums", columns)
+
+    def check_range(self, columns=None):
+        self._log_results("check_range", columns)
+
+    def check_length(self, columns=None):
+        self._log_results("check_length", columns)
+
+    def check_types(self, columns=None):
+        self._log_results("check_data_type", columns)
+
+    def _duplicates_result(self, key_columns):
+        keys = ", ".join(_quote_identifier(c) for c in key_columns)
+        notnull = " AND ".join(f"{_quote_identifier(c)} IS NOT NULL" for c in key_columns)
+        grouped = (f"SELECT {keys}, count(*) AS __count FROM {self._source} "
+                   f"WHERE {notnull} GROUP BY {keys} HAVING count(*) > 1")
+
+        element_count, missing_count = self._execute(
+            f"SELECT count(*), count(*) FILTER (WHERE NOT ({notnull})) FROM {self._source}").fetchone()
+        duplicate_rows, duplicate_keys = self._execute(
+            f"SELECT coalesce(sum(__count), 0), count(*) FROM ({grouped})").fetchone()
+        sample = self._execute(
+            f"SELECT {keys} FROM ({grouped}) LIMIT {self.max_failure_samples}").fetchall()
+
+        # Row numbers of duplicates aren't fetched, as the rows aren't in df_ge
+        return {
+            "success": duplicate_rows == 0,
+            "result": {
+                "element_count": element_count,
+                "missing_count": missing_count,
+                "unexpected_count": int(duplicate_rows),
+                "duplicate_key_count": duplicate_keys,
+                "unexpected_list": [k[0] if len(key_columns) == 1 else tuple(k) for k in sample],
+                "unexpected_index_list": [],
+            }
+        }
+
+    def check_unique(self, columns=None):
+        for col in self._get_meta_cols(columns):
+            if col.get("unique", False) and col["name"] in self.df_ge.columns:
+                col_logentries = self.vlog[col["name"]]
+                col_logentries.create_logentry_from_ge_result(
+                    "check_unique", self._duplicates_result([col["name"]]))
+
+        primary_key = self.meta_data.get("primary_key")
+        if not primary_key:
+            return
+        if columns is not None and primary_key[0] not in columns:
+            return
+        if not all(c in self.df_ge.columns for c in primary_key):
+            return
+
+        pk_result = self._duplicates_result(primary_key)
+        for col_name in primary_key:
+            self.vlog[col_name].create_logentry_from_ge_result("check_primary_key", pk_result)
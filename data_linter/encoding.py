@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.encoding
+~~~~~~~~~~~~~~~
+This module contains functions that validate the raw bytes of a text file before it is parsed:
+invalid UTF-8 sequences, which otherwise crash pd.read_csv or become mangled strings, and stray
+control characters.
+
+The file is memory-mapped and checked in large blocks with numpy, and the byte offsets of csv
+records found along the way are kept so iter_chunks can read the file in chunks without
+searching for the record boundaries again
+"""
+
+import mmap
+
+import numpy as np
+
+from data_linter.read_data import get_compression
+
+DEFAULT_BLOCK_SIZE = 16 * 1024 ** 2
+
+# Tab, line feed and carriage return are the only control characters expected in text files
+_ALLOWED_CONTROL_CHARACTERS = [9, 10, 13]
+
+
+class EncodingError(ValueError):
+    """
+    Raised when a file is not valid UTF-8, with the EncodingReport as report
+    """
+
+    def __init__(self, report):
+        self.report = report
+        first = report.invalid_utf8[0]
+        super().__init__(
+            f"{report.path} has {report.invalid_utf8_count} invalid UTF-8 sequences, "
+            f"the first at byte {first['offset']} (line {first['line']})")
+
+
+class EncodingReport:
+    """
+    The results of scan_file.  Invalid sequences and control characters are listed as dicts of
+    offset (byte offset in the file), line (1-based line number) and byte (the offending byte),
+    up to max_errors of each, with the total number in the counts
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.invalid_utf8 = []
+        self.invalid_utf8_count = 0
+        self.control_characters = []
+        self.control_character_count = 0
+        self.line_count = 0
+        self.chunk_offsets = []
+
+    def success(self, allow_control_characters=False):
+        if self.invalid_utf8_count:
+            return False
+        return allow_control_characters or self.control_character_count == 0
+
+    def as_dict(self):
+        return {
+            "invalid_utf8": self.invalid_utf8,
+            "invalid_utf8_count": self.invalid_utf8_count,
+            "control_characters": self.control_characters,
+            "control_character_count": self.control_character_count,
+            "line_count": self.line_count,
+        }
+
+
+def invalid_utf8_mask(arr):
+    """
+    Return a boolean array which is True at the start of each invalid UTF-8 sequence in the
+    uint8 array arr: bytes which can never appear, leading bytes without the right number of
+    continuation bytes, overlong or surrogate encodings and unexpected continuation bytes.
+    A sequence which is cut off by the end of arr is invalid
+    """
+    n = len(arr)
+    padded = np.concatenate([arr, np.zeros(3, dtype=np.uint8)])
+    is_continuation = (padded & 0xC0) == 0x80
+
+    need = np.zeros(n, dtype=np.int8)
+    need[(arr >= 0xC2) & (arr <= 0xDF)] = 1
+    need[(arr >= 0xE0) & (arr <= 0xEF)] = 2
+    need[(arr >= 0xF0) & (arr <= 0xF4)] = 3
+
+    invalid = (arr == 0xC0) | (arr == 0xC1) | (arr >= 0xF5)
+
+    # The second byte of some three and four byte sequences has a narrower range
+    second = padded[1:n + 1]
+    invalid |= (arr == 0xE0) & (second < 0xA0)
+    invalid |= (arr == 0xED) & (second > 0x9F)
+    invalid |= (arr == 0xF0) & (second < 0x90)
+    invalid |= (arr == 0xF4) & (second > 0x8F)
+
+    claimed = np.zeros(n + 3, dtype=bool)
+    complete = need > 0
+    for k in range(1, 4):
+        leads = np.flatnonzero(complete & (need >= k))
+        ok = is_continuation[leads + k]
+        invalid[leads[~ok]] = True
+        complete[leads[~ok]] = False
+        claimed[leads[ok] + k] = True
+
+    invalid |= is_continuation[:n] & ~claimed[:n]
+    return invalid
+
+
+def control_character_mask(arr):
+    """
+    Return a boolean array which is True for control characters other than tab, line feed
+    and carriage return in the uint8 array arr
+    """
+    mask = (arr < 0x20) | (arr == 0x7F)
+    for allowed in _ALLOWED_CONTROL_CHARACTERS:
+        mask &= arr != allowed
+    return mask
+
+
+def _block_end(mm, start, block_size):
+    # End blocks just after a newline, which can't be part of a multi-byte sequence.  If there
+    # isn't one, end before a continuation byte so sequences aren't split between blocks
+    end = min(start + block_size, len(mm))
+    if end == len(mm):
+        return end
+    newline = mm.rfind(b"\n", start, end)
+    if newline != -1:
+        return newline + 1
+    for _ in range(3):
+        if mm[end] & 0xC0 != 0x80:
+            break
+        end -= 1
+    return end
+
+
+def _record_errors(errors, positions, arr, start, newlines, lines_before, max_errors):
+    for pos in positions[:max(0, max_errors - len(errors))]:
+        errors.append({
+            "offset": int(start + pos),
+            "line": int(lines_before + np.searchsorted(newlines, pos, side="right") + 1),
+            "byte": int(arr[pos]),
+        })
+
+
+def scan_file(path, chunksize=100000, quotechar='"', block_size=DEFAULT_BLOCK_SIZE, max_errors=100):
+    """
+    Scan the raw bytes of the text file at path for invalid UTF-8 and control characters,
+    block_size bytes at a time, and return an EncodingReport.
+
+    The report also has chunk_offsets - the byte offsets at which every chunksize-th csv record
+    after the header starts - which can be passed to iter_chunks.  Newlines between quotechars are
+    part of a field, not the end of a record (set quotechar to None for files without quoting).
+    Blank lines are skipped, as they are by pandas, so they are neither the header nor a record
+    """
+    if get_compression(path) is not None:
+        raise ValueError(f"Cannot scan the bytes of compressed file {path}")
+    if block_size < 4:
+        # Blocks must be able to hold the longest UTF-8 sequence, or the scan can't advance
+        raise ValueError("block_size must be at least 4 bytes")
+
+    report = EncodingReport(path)
+
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be memory-mapped
+            return report
+
+        arr = None
+        try:
+            quotes_before = 0
+            records_before = 0
+            # The offset of the end of the previous line which ended a record
+            previous_end = -1
+            start = 0
+            while start < len(mm):
+                end = _block_end(mm, start, block_size)
+                arr = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+                newlines = np.flatnonzero(arr == 10)
+
+                # Pure ASCII blocks can't contain invalid UTF-8
+                if arr.max() >= 0x80:
+                    invalid = np.flatnonzero(invalid_utf8_mask(arr))
+                    report.invalid_utf8_count += len(invalid)
+                    _record_errors(report.invalid_utf8, invalid, arr, start, newlines,
+                                   report.line_count, max_errors)
+
+                control = np.flatnonzero(control_character_mask(arr))
+                report.control_character_count += len(control)
+                _record_errors(report.control_characters, control, arr, start, newlines,
+                               report.line_count, max_errors)
+
+                # A newline ends a record if an even number of quotechars come before it
+                if quotechar is None:
+                    record_ends = newlines
+                else:
+                    quotes = np.flatnonzero(arr == ord(quotechar))
+                    parity = (quotes_before + np.searchsorted(quotes, newlines)) % 2
+                    record_ends = newlines[parity == 0]
+                    quotes_before += len(quotes)
+
+                # A record end directly after the previous one (or its \r) ends a blank line
+                ends = start + record_ends
+                previous = np.concatenate([[previous_end], ends[:-1]])
+                before = np.where(record_ends > 0, arr[np.maximum(record_ends - 1, 0)], mm[start - 1] if start else 0)
+                blank = (ends - previous == 1) | ((ends - previous == 2) & (before == 13))
+                if len(ends):
+                    previous_end = ends[-1]
+                record_ends = record_ends[~blank]
+
+                # The first record is the header, so data record i starts after the i-th record end
+                record_numbers = records_before + np.arange(len(record_ends))
+                is_chunk_start = record_numbers % chunksize == 0
+                report.chunk_offsets.extend((start + record_ends[is_chunk_start] + 1).tolist())
+                records_before += len(record_ends)
+
+                report.line_count += len(newlines)
+                start = end
+
+            if len(mm) and mm[len(mm) - 1] != ord("\n"):
+                report.line_count += 1
+            report.chunk_offsets = [o for o in report.chunk_offsets if o < len(mm)]
+        finally:
+            # The mmap can't be closed while an array still refers to it
+            arr = None
+            mm.close()
+
+    return report
+
+
+def check_encoding(path, **kwargs):
+    """
+    Scan the file at path and raise an EncodingError if it is not valid UTF-8.
+    Returns the EncodingReport otherwise
+    """
+    report = scan_file(path, **kwargs)
+    if report.invalid_utf8_count:
+        raise EncodingError(report)
+    return report
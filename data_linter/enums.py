@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.enums
+~~~~~~~~~~~~~~~
+This module contains functions for checking values against enums which may be very large
+(hundreds of thousands of values), and which may be kept in a separate file referenced by
+enum_file in the metadata rather than inline.
+
+Enum files are loaded once and cached (until the file changes), so many linters can share them.
+Membership is tested with a strategy chosen by the size and type of the enum
+"""
+
+import json
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Enums up to this size are tested with pd.Series.isin, as building anything else costs more
+SMALL_ENUM_SIZE = 1000
+
+# The EnumSets of this many large inline enums are kept, so they aren't rebuilt for each chunk or check
+_ENUM_SET_CACHE_SIZE = 32
+_enum_set_cache = OrderedDict()
+
+
+class EnumSet:
+    """
+    A set of valid values, which tests the membership of a pandas series of values with:
+    - pd.Series.isin, for small enums
+    - binary search (np.searchsorted) in a sorted array, for large numeric enums
+    - a hash table which is built once (the engine of a pd.Index), for other large enums
+    """
+
+    def __init__(self, values):
+        values = pd.Series(values).drop_duplicates()
+        self.size = len(values)
+        self.numeric = values.dtype.kind in "iuf"
+
+        if self.size <= SMALL_ENUM_SIZE:
+            self.strategy = "isin"
+            self._values = values.tolist()
+        elif self.numeric:
+            self.strategy = "sorted"
+            self._values = np.sort(values.values)
+        else:
+            self.strategy = "hashed"
+            self._values = pd.Index(values.values)
+
+    @property
+    def values(self):
+        return list(self._values)
+
+    def contains(self, values):
+        """
+        Return a boolean array which is True where the (non-null) value is in the enum
+        """
+        if self.numeric:
+            if values.dtype.kind not in "iuf":
+                values = pd.to_numeric(values, errors="coerce")
+            elif pd.api.types.is_extension_array_dtype(values):
+                values = values.astype("float64")
+
+        if self.strategy == "isin":
+            return values.isin(self._values).values
+
+        if self.strategy == "sorted":
+            arr = values.values
+            positions = np.minimum(np.searchsorted(self._values, arr), self.size - 1)
+            return self._values[positions] == arr
+
+        return self._values.get_indexer(values.values) != -1
+
+
+def read_enum_file(path, col_type="character"):
+    """
+    Read the values in an enum file - either a json array (.json), or one value per line.
+    Values are converted to numbers for numeric column types
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    with open(path, encoding="utf-8") as f:
+        values = [line.rstrip("\r\n") for line in f]
+    values = [v for v in values if v != ""]
+
+    if col_type in ["int", "long"]:
+        return [int(v) for v in values]
+    if col_type in ["float", "double"]:
+        return [float(v) for v in values]
+    return values
+
+
+@lru_cache(maxsize=32)
+def _cached_file_enum_set(path, mtime, size, col_type):
+    return EnumSet(read_enum_file(path, col_type))
+
+
+def get_file_enum_set(path, col_type="character"):
+    """
+    Return the EnumSet for an enum file, reading the file only if it hasn't
+    been read before or has changed since
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _cached_file_enum_set(path, stat.st_mtime, stat.st_size, col_type)
+
+
+def get_enum_set(col):
+    """
+    Return the EnumSet of valid values for the metadata column col, combining
+    enum and enum_file if both are present.
+
+    The EnumSets of enums larger than SMALL_ENUM_SIZE are cached by their values, so the same
+    enum is only built once however many times it is checked
+    """
+    file_set = get_file_enum_set(col["enum_file"], col["type"]) if "enum_file" in col else None
+    if "enum" not in col:
+        return file_set
+
+    values = list(col["enum"]) if file_set is None else file_set.values + list(col["enum"])
+    if len(values) <= SMALL_ENUM_SIZE:
+        # Small enums are tested with isin, so there is next to nothing to build
+        return EnumSet(values)
+
+    # The types are part of the key, as 1 and "1" are different values but 1 and 1.0 hash the same
+    key = (col["type"], tuple(values), tuple(type(v) for v in values))
+    enum_set = _enum_set_cache.get(key)
+    if enum_set is None:
+        enum_set = EnumSet(values)
+        _enum_set_cache[key] = enum_set
+        if len(_enum_set_cache) > _ENUM_SET_CACHE_SIZE:
+            _enum_set_cache.popitem(last=False)
+    else:
+        _enum_set_cache.move_to_end(key)
+    return enum_set
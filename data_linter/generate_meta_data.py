@@ -1,4 +1,14 @@
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from data_linter.read_data import get_file_format, iter_chunks, read_schema
+from data_linter.sketches import HyperLogLog
+
 
 def get_col_datatype(col):
     type_name = col.dtype.name
@@ -45,4 +55,468 @@ def generate_from_pd_df(df):
                         "type": get_col_datatype(df[col])
                         }
         metadata["columns"].append(col_metadata)
-    return metadata
\ No newline at end of file
+    return metadata
+
+
+# Types are listed from most to least specific.  A column is given the first type
+# which every non-null value seen could be converted to
+TYPE_CANDIDATES = ["boolean", "int", "long", "float", "date", "datetime", "character"]
+
+# Enums aren't proposed from fewer non-null values than this, as a small sample
+# will repeat a few values by chance
+MIN_ENUM_ROWS = 50
+
+INT_MAX = 2147483647
+LONG_MAX = 9223372036854775807
+
+DATE_REGEX = r"^\d{4}-\d{2}-\d{2}$"
+DATETIME_REGEX = r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$"
+
+# Character classes used to summarise the 'shape' of string values
+_SHAPE_CLASSES = [(r"[0-9]", "9"), (r"[a-z]", "a"), (r"[A-Z]", "A")]
+_SHAPE_REGEX = {"9": r"\d", "a": "[a-z]", "A": "[A-Z]"}
+
+
+def _integer_types_from_strings(digits):
+    """
+    Given a series of strings of digits (sign and leading zeros removed),
+    which of int and long could they be stored as.
+    Compares strings rather than numbers so values beyond 64 bits don't overflow
+    """
+    lengths = digits.str.len()
+    max_length = lengths.max()
+
+    # Strings of the same length compare in the same order as the numbers they represent
+    if max_length > 19 or (digits[lengths == 19] > str(LONG_MAX)).any():
+        return set()
+    if max_length < 10 or (max_length == 10 and (digits[lengths == 10] <= str(INT_MAX)).all()):
+        return {"int", "long"}
+    return {"long"}
+
+
+def _possible_types(values, candidates, integral_floats=False):
+    """
+    Return the subset of candidates that every value in the (non-null) series
+    values could be converted to.  If integral_floats is True, float values which are whole
+    numbers could be integers (which pandas reads as floats when there are nulls)
+    """
+    kind = values.dtype.kind
+
+    if kind == "b":
+        possible = {"boolean"}
+    elif kind in "iu":
+        possible = {"long", "float"}
+        if values.min() >= -INT_MAX - 1 and values.max() <= INT_MAX:
+            possible.add("int")
+    elif kind == "f":
+        possible = {"float"}
+        if integral_floats and np.isfinite(values).all() and (values % 1 == 0).all():
+            if values.min() >= -LONG_MAX - 1 and values.max() < float(LONG_MAX + 1):
+                possible.add("long")
+            if values.min() >= -INT_MAX - 1 and values.max() <= INT_MAX:
+                possible.add("int")
+    elif kind == "M":
+        possible = {"datetime"}
+        if (values.dt.normalize() == values).all():
+            possible.add("date")
+    else:
+        possible = set()
+        strings = values.astype(str).str.strip()
+
+        if "boolean" in candidates and strings.str.lower().isin(["true", "false"]).all():
+            possible.add("boolean")
+
+        if candidates & {"int", "long"} and strings.str.match(r"^[+-]?\d+$").all():
+            digits = strings.str.lstrip("+-").str.lstrip("0")
+            possible |= _integer_types_from_strings(digits)
+
+        if "float" in candidates and pd.to_numeric(strings, errors="coerce").notnull().all():
+            possible.add("float")
+
+        if candidates & {"date", "datetime"} and strings.str.match(DATETIME_REGEX).all():
+            if pd.to_datetime(strings, errors="coerce").notnull().all():
+                possible.add("datetime")
+                if strings.str.match(DATE_REGEX).all():
+                    possible.add("date")
+
+    possible.add("character")
+    return candidates & possible
+
+
+def _shape_runs(shape):
+    """
+    Run length encode a shape string e.g. 'AA99' -> [['A', 2], ['9', 2]]
+    """
+    runs = []
+    for ch in shape:
+        if runs and runs[-1][0] == ch:
+            runs[-1][1] += 1
+        else:
+            runs.append([ch, 1])
+    return runs
+
+
+def _pattern_from_shapes(shapes):
+    """
+    Propose a regex pattern which matches all of the shapes, provided they all have the
+    same sequence of character classes (differing only in how many of each there are).
+    Returns None if no such pattern exists
+    """
+    all_runs = [_shape_runs(s) for s in shapes]
+    sequences = {tuple(ch for ch, _ in runs) for runs in all_runs}
+    if len(sequences) != 1:
+        return None
+
+    pattern = "^"
+    for i, ch in enumerate(sequences.pop()):
+        lengths = [runs[i][1] for runs in all_runs]
+        lo, hi = min(lengths), max(lengths)
+        pattern += _SHAPE_REGEX.get(ch, re.escape(ch))
+        if lo != hi:
+            pattern += f"{{{lo},{hi}}}"
+        elif lo > 1:
+            pattern += f"{{{lo}}}"
+    return pattern + "$"
+
+
+def _meta_bound(value, col_type):
+    """
+    Convert a minimum or maximum to a json value of the metadata column type
+    """
+    if value is None or pd.isnull(value):
+        return None
+    if col_type in ["int", "long"]:
+        return int(value)
+    if col_type == "float":
+        value = float(value)
+        return value if np.isfinite(value) else None
+    if col_type == "date":
+        return pd.Timestamp(value).strftime("%Y-%m-%d")
+    return pd.Timestamp(value).isoformat()
+
+
+class ColumnProfile:
+    """
+    Accumulates a summary of the values seen in a single column, one chunk at a time,
+    from which metadata for the column can be inferred.
+
+    Memory use is bounded: at most max_enum_values distinct values and max_shapes
+    distinct value shapes are kept, after which tracking of each is abandoned.
+    Beyond that the number of distinct values is estimated with a HyperLogLog sketch.
+
+    Profiles of the same column built from different chunks or files can be combined
+    with merge, in any order, to give the profile of all of the data
+    """
+
+    def __init__(self, name, max_enum_values=20, max_shapes=20):
+        self.name = name
+        self.candidates = set(TYPE_CANDIDATES)
+        self.has_nulls = False
+        self.row_count = 0
+        self.non_null_count = 0
+
+        self.max_enum_values = max_enum_values
+        self.distinct = set()
+        self.hll = HyperLogLog()
+
+        self.max_shapes = max_shapes
+        self.shapes = {}
+
+        self._min = None
+        self._max = None
+
+    def update(self, series, integral_floats=False):
+        """
+        Add the values in the pandas series to the profile.  integral_floats is True if the
+        column's whole-number floats could be integers read as floats because of nulls - as
+        for jsonl files and the integer columns of parquet files, but not columns of floats
+        """
+        self.row_count += len(series)
+        notnull = series.notnull()
+        values = series[notnull]
+        if len(values) < len(series):
+            self.has_nulls = True
+        if len(values) == 0:
+            return
+
+        self.non_null_count += len(values)
+        self.candidates = _possible_types(values, self.candidates, integral_floats)
+        self.hll.update(values)
+        self._update_distinct(values)
+        self._update_shapes(values)
+        self._update_min_max(values)
+
+    def _update_distinct(self, values):
+        if self.distinct is None:
+            return
+        if values.dtype.kind not in "Oiub":
+            # Only character and integer columns are candidates for an enum
+            self.distinct = None
+            return
+        for v in values.unique().tolist():
+            self.distinct.add(v)
+            if len(self.distinct) > self.max_enum_values:
+                self.distinct = None
+                return
+
+    def _update_shapes(self, values):
+        if self.shapes is None:
+            return
+        if values.dtype.kind != "O":
+            self.shapes = None
+            return
+        shapes = values.astype(str)
+        for regex, symbol in _SHAPE_CLASSES:
+            shapes = shapes.str.replace(regex, symbol, regex=True)
+        for shape, count in shapes.value_counts().items():
+            self.shapes[shape] = self.shapes.get(shape, 0) + count
+            if len(self.shapes) > self.max_shapes:
+                self.shapes = None
+                return
+
+    def _update_min_max(self, values):
+        kind = values.dtype.kind
+        if kind == "O":
+            if self.candidates & {"int", "long", "float"}:
+                values = pd.to_numeric(values, errors="coerce")
+            elif self.candidates & {"date", "datetime"}:
+                values = pd.to_datetime(values, errors="coerce")
+            else:
+                return
+        elif kind not in "iufM":
+            return
+        self._set_min_max(values.min(), values.max())
+
+    def _set_min_max(self, lo, hi):
+        if pd.isnull(lo):
+            return
+        try:
+            self._min = lo if self._min is None else min(self._min, lo)
+            self._max = hi if self._max is None else max(self._max, hi)
+        except TypeError:
+            # e.g. numbers in one chunk and dates in another.  The column will be character
+            self._min, self._max = None, None
+
+    @property
+    def minimum(self):
+        if self.type in ["int", "long", "float", "date", "datetime"]:
+            return self._min
+        return None
+
+    @property
+    def maximum(self):
+        if self.type in ["int", "long", "float", "date", "datetime"]:
+            return self._max
+        return None
+
+    @property
+    def distinct_count(self):
+        """
+        Exact number of distinct non-null values if they have been tracked, an estimate otherwise
+        """
+        if self.distinct is not None:
+            return len(self.distinct)
+        return self.hll.count()
+
+    def merge(self, other):
+        """
+        Return a new profile combining this profile with other, a profile of the same column
+        built from different data.  Merging is associative and commutative
+        """
+        if other.name != self.name:
+            raise ValueError(f"Cannot merge profile of column {other.name} into profile of {self.name}")
+
+        merged = ColumnProfile(self.name, self.max_enum_values, self.max_shapes)
+        merged.candidates = self.candidates & other.candidates
+        merged.has_nulls = self.has_nulls or other.has_nulls
+        merged.row_count = self.row_count + other.row_count
+        merged.non_null_count = self.non_null_count + other.non_null_count
+        merged.hll = self.hll.merge(other.hll)
+
+        if self.distinct is None or other.distinct is None:
+            merged.distinct = None
+        else:
+            merged.distinct = self.distinct | other.distinct
+            if len(merged.distinct) > merged.max_enum_values:
+                merged.distinct = None
+
+        if self.shapes is None or other.shapes is None:
+            merged.shapes = None
+        else:
+            merged.shapes = dict(self.shapes)
+            for shape, count in other.shapes.items():
+                merged.shapes[shape] = merged.shapes.get(shape, 0) + count
+            if len(merged.shapes) > merged.max_shapes:
+                merged.shapes = None
+
+        merged._min, merged._max = self._min, self._max
+        if other._min is not None:
+            merged._set_min_max(other._min, other._max)
+
+        return merged
+
+    @property
+    def type(self):
+        if self.non_null_count == 0:
+            return "character"
+        return [t for t in TYPE_CANDIDATES if t in self.candidates][0]
+
+    def proposed_enum(self, min_enum_repeats=2, min_rows=MIN_ENUM_ROWS):
+        """
+        Propose an enum if at least min_rows values have been seen, and the column has few
+        distinct values, each of which appears on average at least min_enum_repeats times
+        """
+        col_type = self.type
+        if self.distinct is None or col_type not in ["character", "int", "long"]:
+            return None
+        if self.non_null_count < min_rows:
+            return None
+        if self.non_null_count < min_enum_repeats * len(self.distinct):
+            return None
+        if col_type == "character":
+            return sorted({str(v) for v in self.distinct})
+        return sorted({int(v) for v in self.distinct})
+
+    def proposed_pattern(self):
+        if self.shapes is None or not self.shapes or self.type != "character":
+            return None
+        return _pattern_from_shapes(list(self.shapes))
+
+    def as_meta_col(self, total_rows=None, include_range=False):
+        """
+        Return the metadata for this column.  total_rows is the number of rows in
+        the table - if the column was missing from some of them it is nullable.
+
+        If include_range is True, the minimum and maximum values seen are added as the
+        column's range, so later data outside them fails check_range
+        """
+        nullable = self.has_nulls
+        if total_rows is not None and self.row_count < total_rows:
+            nullable = True
+
+        col_metadata = {"name": self.name,
+                        "description": "",
+                        "type": self.type,
+                        "nullable": nullable
+                        }
+
+        enum = self.proposed_enum()
+        if enum is not None:
+            col_metadata["enum"] = enum
+        else:
+            pattern = self.proposed_pattern()
+            if pattern is not None:
+                col_metadata["pattern"] = pattern
+
+        if include_range:
+            for key, value in [("minimum", self.minimum), ("maximum", self.maximum)]:
+                value = _meta_bound(value, self.type)
+                if value is not None:
+                    col_metadata[key] = value
+
+        return col_metadata
+
+
+class TableProfile:
+    """
+    The column profiles of a table, along with the total number of rows and
+    the order in which columns were first seen
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.column_order = []
+        self.total_rows = 0
+
+    def update(self, df, max_enum_values=20, max_shapes=20, integral_floats=False):
+        """
+        Add the rows of the dataframe df to the profile.  integral_floats is as for
+        ColumnProfile.update, and is either a bool for every column or a set of column names
+        """
+        self.total_rows += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col, max_enum_values, max_shapes)
+                self.column_order.append(col)
+            col_integral_floats = integral_floats is True or col in (integral_floats or ())
+            self.columns[col].update(df[col], col_integral_floats)
+
+    def merge(self, other):
+        merged = TableProfile()
+        merged.total_rows = self.total_rows + other.total_rows
+        merged.column_order = self.column_order + \
+            [c for c in other.column_order if c not in self.columns]
+        for col in merged.column_order:
+            if col in self.columns and col in other.columns:
+                merged.columns[col] = self.columns[col].merge(other.columns[col])
+            elif col in self.columns:
+                merged.columns[col] = self.columns[col]
+            else:
+                merged.columns[col] = other.columns[col]
+        return merged
+
+    def as_metadata(self, include_range=False):
+        metadata = {"columns": []}
+        for col in self.column_order:
+            metadata["columns"].append(self.columns[col].as_meta_col(self.total_rows, include_range))
+        return metadata
+
+
+def profile_file(path, chunksize=100000, file_format=None, max_enum_values=20, max_shapes=20):
+    """
+    Build a TableProfile from a csv, jsonl or parquet file, reading chunksize rows at a time
+    """
+    file_format = file_format or get_file_format(path)
+    if file_format == "parquet":
+        import pyarrow as pa
+        integral_floats = {name for name, arrow_type in read_schema(path, file_format)
+                           if pa.types.is_integer(arrow_type)}
+    else:
+        # pandas reads whole numbers in a jsonl column with nulls as floats.  csv values are strings
+        integral_floats = file_format == "jsonl"
+
+    profile = TableProfile()
+    for chunk in iter_chunks(path, chunksize=chunksize, file_format=file_format):
+        profile.update(chunk, max_enum_values, max_shapes, integral_floats)
+    return profile
+
+
+def generate_from_file(path, chunksize=100000, file_format=None, max_enum_values=20, max_shapes=20,
+                       include_range=False):
+    """
+    Generate metadata from a csv, jsonl or parquet file in a single pass, reading
+    chunksize rows at a time so the file does not need to fit in memory.
+
+    As well as 'name' and 'type', the metadata includes 'nullable', and where the data
+    suggests them, a proposed 'enum' or 'pattern'.  These are inferred from the data seen
+    and should be reviewed before the metadata is used.  With include_range, the 'minimum'
+    and 'maximum' of numeric and date columns are the range of the values seen.
+    """
+    profile = profile_file(path, chunksize, file_format, max_enum_values, max_shapes)
+    return profile.as_metadata(include_range)
+
+
+def generate_from_files(paths, chunksize=100000, file_format=None, max_enum_values=20, max_shapes=20, n_jobs=None,
+                        include_range=False):
+    """
+    Generate a single metadata document for a table which is split across many files
+    (e.g. partitions).  Each file is profiled in a separate process (n_jobs at a time,
+    defaulting to the number of cpus) and the profiles are merged.
+
+    Column order is the order in which columns are first seen, taking files in the order given.
+    Set n_jobs=1 to profile the files one at a time in the current process.  include_range
+    is as for generate_from_file
+    """
+    paths = list(paths)
+    if not paths:
+        raise ValueError("paths must contain at least one file")
+
+    args = (paths, repeat(chunksize), repeat(file_format), repeat(max_enum_values), repeat(max_shapes))
+    if n_jobs == 1:
+        profiles = map(profile_file, *args)
+        profile = reduce(TableProfile.merge, profiles)
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            profile = reduce(TableProfile.merge, executor.map(profile_file, *args))
+
+    return profile.as_metadata(include_range)
@@ -9,10 +9,13 @@ This is needed because, in the case of text-based files like csv, we import the
 strings rather than let pandas attempt to guess types
 """
 
-import pkg_resources
+import copy
+
 import pandas as pd
 import numpy as np
-import json
+
+from data_linter.checks import parse_integer_column
+from data_linter.utils import read_package_json
 
 
 def _pd_df_datatypes_match_metadata_data_types(df, meta_cols):
@@ -29,10 +32,16 @@ def _pd_df_datatypes_match_metadata_data_types(df, meta_cols):
 
     return actual_numpy_types == expected_dtypes
 
+def _type_conversion_dict():
+    # The cached dict, which must not be modified
+    return read_package_json("data/type_conversion.json")
+
 def get_type_conversion_dict():
-    with pkg_resources.resource_stream(__name__, "data/type_conversion.json") as io:
-        type_conversion_dict = json.load(io)
-    return type_conversion_dict
+    """
+    Return the conversions from metadata types to pandas and GE types.  The result is a copy,
+    so the caller is free to modify it
+    """
+    return copy.deepcopy(_type_conversion_dict())
 
 def _pd_dtype_dict_from_metadata(meta_cols):
     """
@@ -40,7 +49,7 @@ def _pd_dtype_dict_from_metadata(meta_cols):
     passed to the dtype argument of pd.read_csv
     """
 
-    type_conversion_dict = get_type_conversion_dict()
+    type_conversion_dict = _type_conversion_dict()
 
     dtype = {}
 
@@ -57,9 +66,7 @@ def _get_np_datatype_from_metadata(col_name, meta_cols):
     Lookup the datatype from the metadata, and our conversion table
     """
 
-    with pkg_resources.resource_stream(__name__, "data/type_conversion.json") as io:
-        type_conversion_dict = json.load(io)
-
+    type_conversion_dict = _type_conversion_dict()
 
     # Find the specific col_name in the meta_cols array
     col = None
@@ -75,14 +82,56 @@ def _get_np_datatype_from_metadata(col_name, meta_cols):
         return None
 
 
-def convert_int_column(series, errors):
-    # Running astype("Int64") on a series with character values always fails
-    series[pd.notnull(series)] = series[pd.notnull(series)].astype(int, errors=errors)
-    series = series.astype("Int64", errors=errors)
-    return series
+def convert_int_column(series, errors, col_type="int"):
+    """
+    Convert series to a nullable Int64 series, checking values are in the range of col_type
+    ("int" or "long").  If any non-null values aren't integers in range, the series is returned
+    unchanged (or those values are nulls if errors is "coerce", or a ValueError is raised if
+    errors is "raise")
+    """
+    converted, failures = parse_integer_column(series, col_type)
+    if failures.any():
+        if errors == "raise":
+            index = failures[failures].index.tolist()
+            raise ValueError(f"{len(index)} values of {series.name} are not valid {col_type}s, at index {index[:10]}")
+        if errors != "coerce":
+            return series
+    return converted
+
+
+# NaT as a datetime64[ns] is the smallest int64
+_NAT_NANOSECONDS = np.iinfo(np.int64).min
 
 
-def impose_metadata_types_on_pd_df(df, meta_data, errors='ignore'):
+def _datetime_nanoseconds(series):
+    parsed = pd.to_datetime(series, errors="coerce")
+    return pd.Series(np.where(parsed.isnull(), None, parsed.values.astype("int64")), dtype=object)
+
+
+def convert_datetime_column(series, errors, verdict_cache=None):
+    """
+    pd.to_datetime, but if verdict_cache is provided, strings which have been parsed before
+    are looked up rather than parsed again
+    """
+    if verdict_cache is None or series.dtype.kind != "O":
+        return pd.to_datetime(series, errors=errors)
+
+    notnull = series.notnull()
+    nanoseconds = verdict_cache.apply("datetime", "ns", series[notnull].astype(str), _datetime_nanoseconds)
+    parsed = nanoseconds.notnull()
+    if not parsed.all() and errors != "coerce":
+        # Let pandas raise, or return the strings unchanged, as it would without the cache
+        return pd.to_datetime(series, errors=errors)
+
+    # Filled as int64 and viewed as datetimes, as setting datetimes into a series by label can
+    # go through float64 and lose nanoseconds
+    result = np.full(len(series), _NAT_NANOSECONDS, dtype=np.int64)
+    positions = np.flatnonzero(notnull.values)[parsed.values]
+    result[positions] = nanoseconds[parsed].astype(np.int64).values
+    return pd.Series(result.view("datetime64[ns]"), index=series.index, name=series.name)
+
+
+def impose_metadata_types_on_pd_df(df, meta_data, errors='ignore', verdict_cache=None):
     """
     Try to impose correct data type on all columns in metadata.
     Doesn't modify columns not in metadata
@@ -91,6 +140,9 @@ def impose_metadata_types_on_pd_df(df, meta_data, errors='ignore'):
 
     Allows you to pass arguments through to the astype e.g. to errors = 'ignore'
     https://pandas.pydata.org/pandas-docs/stable/generated/pandas.Series.astype.html
+
+    If verdict_cache (a VerdictCache or VerdictCacheView) is provided, it is used to avoid parsing
+    the same date and datetime strings again
     """
     df = df.copy()
 
@@ -105,17 +157,17 @@ def impose_metadata_types_on_pd_df(df, meta_data, errors='ignore'):
         expected_type = _get_np_datatype_from_metadata(colname, meta_cols)
         actual_type = df[colname].dtype.type
 
-        if coltype not in ["date", "datetime", "int", "Int64", "character"]:
+        if coltype not in ["date", "datetime", "int", "long", "character"]:
             if expected_type != actual_type:
                 df[colname] = df[colname].astype(expected_type, errors=errors)
         elif coltype == "character":
             if expected_type != actual_type:
                 df[colname] = df[colname].astype(str, errors=errors)
-        elif coltype == "int":
-            df[colname] = convert_int_column(df[colname], errors=errors)
+        elif coltype in ["int", "long"]:
+            df[colname] = convert_int_column(df[colname], errors, coltype)
         elif coltype in ["date", "datetime"]:
             # TODO:  The metadata should probably support a datatime format (e.g. '%d/%m/%Y') string, which
             # we attempt to apply here
-            df[colname] = pd.to_datetime(df[colname], errors=errors)
+            df[colname] = convert_datetime_column(df[colname], errors, verdict_cache)
 
     return df
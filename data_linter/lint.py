@@ -1,10 +1,13 @@
-import great_expectations as ge
-import json
-import jsonschema
-import numpy as np
+import asyncio
 import pandas as pd
-import pkg_resources
+from functools import lru_cache
+from data_linter.checks import (control_character_failures, failure_mask, failure_result, get_column_checks,
+                                get_range_bounds)
+from data_linter.enums import SMALL_ENUM_SIZE
 from data_linter.impose_data_types import impose_metadata_types_on_pd_df, get_type_conversion_dict
+from data_linter.read_data import get_compression, get_file_format, read_file
+from data_linter.uniqueness import find_duplicates_in_df
+from data_linter.utils import read_package_json
 from data_linter.validation_log import ValidationLog
 
 GE_ARGS = {
@@ -13,11 +16,118 @@ GE_ARGS = {
     "catch_exceptions": True
 }
 
+
+@lru_cache(maxsize=None)
+def _get_meta_data_validator():
+    # jsonschema is only imported (and the schema only checked) the first time it's needed
+    import jsonschema
+
+    schema = read_package_json("data/metadata_jsonschema.json")
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def validate_meta_data(meta_data):
+    """
+    Check that the metadata the user has provided is valid against our jsonschema
+    """
+    _get_meta_data_validator().validate(meta_data)
+
+    meta_colnames = [c["name"] for c in meta_data["columns"]]
+    missing = [c for c in meta_data.get("primary_key", []) if c not in meta_colnames]
+    if missing:
+        raise ValueError(f"primary_key columns {missing} not found in meta data columns.")
+
+    # Raises a ValueError if a minimum or maximum isn't a valid value of its column's type
+    for col in meta_data["columns"]:
+        get_range_bounds(col)
+
+
+BACKENDS = ["pandas", "duckdb"]
+
+
+def lint_file(path, meta_data, backend="pandas", file_format=None, structure_first=False,
+              check_encoding=False, verdict_cache=None, drift_baseline=None, drift_thresholds=None,
+              raw_pattern_scan=False):
+    """
+    Read the file at path, run all checks against meta_data and return the linter.
+
+    backend can be "pandas", which loads the file into a pandas dataframe and uses
+    great_expectations, or "duckdb", which runs the checks as SQL directly against the
+    file and so works on files larger than memory (requires duckdb to be installed)
+
+    If structure_first is True, the columns are checked first without reading any data,
+    and if that fails the StructureLinter is returned without the file being read
+
+    If check_encoding is True, the raw bytes of an uncompressed csv or jsonl file are checked before it is parsed,
+    and a data_linter.encoding.EncodingError is raised if they are not valid UTF-8.  If the scan finds
+    control characters, the pandas backend logs the values containing them with Linter.check_control_characters
+
+    verdict_cache is passed to the Linter (it is only used by the pandas backend)
+
+    If drift_baseline is provided, the data is also compared with it by Linter.check_drift
+    (pandas backend only)
+
+    If raw_pattern_scan is True and the file is an uncompressed csv, pattern checks are run against
+    the raw bytes of the file (see data_linter.raw_scan) rather than the values in the dataframe,
+    and columns which only have a pattern to check aren't read into the dataframe at all
+    """
+    if drift_baseline is not None and backend != "pandas":
+        raise ValueError("drift_baseline can only be used with the pandas backend")
+
+    encoding_report = None
+    if check_encoding and (file_format or get_file_format(path)) != "parquet" and get_compression(path) is None:
+        from data_linter import encoding
+        encoding_report = encoding.check_encoding(path)
+
+    if structure_first:
+        from data_linter.structure import lint_structure
+        structure_linter = lint_structure(path, meta_data, file_format)
+        if not structure_linter.success():
+            return structure_linter
+
+    if backend == "pandas":
+        file_format = file_format or get_file_format(path)
+        raw_csv_path = path if raw_pattern_scan and file_format == "csv" and get_compression(path) is None else None
+        columns = None
+        if raw_csv_path is not None:
+            from data_linter.raw_scan import read_columns
+            columns = read_columns(path, meta_data)
+        df = read_file(path, file_format, columns=columns, meta_data=meta_data)
+        linter = Linter(df, meta_data, verdict_cache, raw_csv_path)
+    elif backend == "duckdb":
+        from data_linter.duckdb_linter import DuckDBLinter
+        linter = DuckDBLinter(path, meta_data, file_format)
+    else:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+
+    linter.check_all()
+    if backend == "pandas" and encoding_report is not None and encoding_report.control_character_count:
+        linter.check_control_characters()
+    if drift_baseline is not None:
+        linter.check_drift(drift_baseline, drift_thresholds)
+    return linter
+
+
 class Linter:
-    def __init__(self, df, meta_data):
+    # Subclasses which don't evaluate values in pandas don't use a verdict cache
+    verdict_cache = None
+    _table_sketch = None
+    raw_csv_path = None
+    raw_columns = []
+
+    def __init__(self, df, meta_data, verdict_cache=None, raw_csv_path=None):
         """
         Takes a pandas dataframe and a table meta data object and checks
         the values in the dataframe against the meta data.
+
+        If verdict_cache (a data_linter.verdict_cache.VerdictCache) is provided, pattern checks and
+        date parsing look up the values they have seen before instead of evaluating them again
+
+        If raw_csv_path, the path of the uncompressed csv file df was read from, is provided, pattern
+        checks scan the bytes of the file instead of the values in df.  Columns of the file which
+        only have a pattern to check (see data_linter.raw_scan.raw_scan_columns) may be left out of df
         """
         if not isinstance(df, pd.DataFrame):
             raise TypeError("df must be a pandas dataframe object")
@@ -30,9 +140,21 @@ class Linter:
         if not isinstance(self.meta_cols, list):
             raise TypeError("meta_cols must be a list of objects")
 
+        self.verdict_cache = None if verdict_cache is None else verdict_cache.view()
+        self.raw_csv_path = raw_csv_path
+        self._raw_results = {}
+        if raw_csv_path is not None:
+            from data_linter.raw_scan import raw_scan_columns
+            from data_linter.read_data import _read_csv_header
+            self._file_columns = [name for name, _ in _read_csv_header(raw_csv_path)]
+            self.raw_columns = [col["name"] for col in raw_scan_columns(meta_data)
+                                if col["name"] in self._file_columns and col["name"] not in df.columns]
+
         # This never fails, but the resultant types are not guaranteed to be correct
-        df = impose_metadata_types_on_pd_df(df, meta_data)
+        df = impose_metadata_types_on_pd_df(df, meta_data, verdict_cache=self.verdict_cache)
 
+        # great_expectations is slow to import, so only import it when this backend is used
+        import great_expectations as ge
         self.df_ge = ge.from_pandas(df)
 
         self.vlog = ValidationLog(self)
@@ -47,9 +169,20 @@ class Linter:
     def meta_colnames(self):
         return [c["name"] for c in self.meta_cols]
 
+    def _get_meta_cols(self, columns=None):
+        if columns is None:
+            return self.meta_cols
+        return [c for c in self.meta_cols if c["name"] in columns]
+
     def success(self):
         return self.vlog.success()
 
+    def verdict_cache_stats(self):
+        """
+        The hits and misses of this linter's lookups in its verdict cache, or None if it has none
+        """
+        return None if self.verdict_cache is None else self.verdict_cache.stats.as_dict()
+
     def _get_template_result(self):
         return {"success": None, "result": {}}
 
@@ -60,9 +193,11 @@ class Linter:
         """
         fn = "check_column_exists_and_order"
 
-        # Create lookup for df cols vs column position
+        # Create lookup for df cols vs column position.  Columns which are only scanned
+        # aren't in the dataframe, so the file's own header is used
+        file_columns = self._file_columns if self.raw_columns else self.df_ge.columns
         df_cols = {}
-        for i, c in enumerate(self.df_ge.columns):
+        for i, c in enumerate(file_columns):
             df_cols[c] = i
 
         #  Test meta cols
@@ -87,19 +222,25 @@ class Linter:
             le.success = is_successful
 
 
-    def check_enums(self):
+    def check_enums(self, columns=None):
         """
         Test to if values in column are all in
-        enums as specified in metadata
+        enums as specified in metadata (inline or in an enum_file).
+        If columns is provided, only those columns are checked
         """
         test_name = "check_enums"
 
-        for col in self.meta_cols:
-            if "enum" not in col:
+        for col in self._get_meta_cols(columns):
+            if "enum" not in col and "enum_file" not in col:
                 continue
             if col["name"] not in self.df_ge.columns:
                 continue
 
+            if "enum_file" in col or len(col["enum"]) > SMALL_ENUM_SIZE:
+                # Passing a large enum to great_expectations is slow, and bloats its config
+                self._run_row_check(test_name, [col["name"]])
+                continue
+
             enum_result = self.df_ge.expect_column_values_to_be_in_set(
                 col["name"],
                 col["enum"],
@@ -112,17 +253,48 @@ class Linter:
             col_logentries.create_logentry_from_ge_result(
                 test_name, enum_result)
 
-    def check_pattern(self):
+    def check_control_characters(self, columns=None):
+        """
+        Test that values don't contain control characters other than tab, line feed and
+        carriage return.  Not part of check_all - lint_file runs it when check_encoding finds
+        control characters in the file.
+        If columns is provided, only those columns are checked
+        """
+        test_name = "check_control_characters"
+
+        for col in self._get_meta_cols(columns):
+            if col["name"] not in self.df_ge.columns:
+                continue
+
+            series = self.df_ge[col["name"]]
+            result = failure_result(series, control_character_failures(series, col))
+
+            col_logentries = self.vlog[col["name"]]
+            col_logentries.create_logentry_from_ge_result(test_name, result)
+
+    def check_pattern(self, columns=None):
         """
         Test to if values in column all fit within
-        regex pattern as specified in metadata
+        regex pattern as specified in metadata.
+        If columns is provided, only those columns are checked
         """
         test_name = "check_pattern"
 
-        for col in self.meta_cols:
-            if "pattern" not in col:
+        cols = [col for col in self._get_meta_cols(columns) if "pattern" in col
+                and (col["name"] in self.df_ge.columns or col["name"] in self.raw_columns)]
+        raw_results = self._scan_raw_patterns(cols)
+
+        for col in cols:
+            raw_result = raw_results.get(col["name"])
+            # If the file wasn't split into the rows pandas read, check the values instead
+            # (which columns that are only scanned can't be)
+            if raw_result is not None and (col["name"] in self.raw_columns
+                                           or raw_result["result"]["element_count"] == len(self.df_ge)):
+                self.vlog[col["name"]].create_logentry_from_ge_result(test_name, raw_result)
                 continue
-            if col["name"] not in self.df_ge.columns:
+
+            if self.verdict_cache is not None:
+                self._run_row_check(test_name, [col["name"]])
                 continue
 
             pattern_result = self.df_ge.expect_column_values_to_match_regex(
@@ -136,14 +308,25 @@ class Linter:
                 test_name, pattern_result)
 
 
-    def check_nulls(self):
+    def _scan_raw_patterns(self, cols):
+        # Results of scanning raw_csv_path, scanning each column at most once
+        if self.raw_csv_path is None:
+            return {}
+        to_scan = [col for col in cols if col["name"] not in self._raw_results]
+        if to_scan:
+            from data_linter.raw_scan import scan_csv_patterns
+            self._raw_results.update(scan_csv_patterns(self.raw_csv_path, to_scan))
+        return self._raw_results
+
+    def check_nulls(self, columns=None):
         """
         Test column for null values
-        consistent with nullable property in metadata
+        consistent with nullable property in metadata.
+        If columns is provided, only those columns are checked
         """
         test_name = "check_nulls"
 
-        for col in self.meta_cols:
+        for col in self._get_meta_cols(columns):
             if col.get("nullable", True):
                 continue
             if col["name"] not in self.df_ge.columns:
@@ -160,7 +343,67 @@ class Linter:
             col_logentries.create_logentry_from_ge_result(
                 test_name, nulls_result)
 
-    def check_types(self):
+    def check_unique(self, columns=None):
+        """
+        Test that values in columns with unique set in the metadata, and combinations of
+        values in the primary_key columns, are not duplicated.  Nulls are ignored.
+        The primary key is checked if columns is None or includes its first column
+        """
+        for col in self._get_meta_cols(columns):
+            if not col.get("unique", False):
+                continue
+            if col["name"] not in self.df_ge.columns:
+                continue
+
+            unique_result = find_duplicates_in_df(self.df_ge, [col["name"]])
+
+            col_logentries = self.vlog[col["name"]]
+            col_logentries.create_logentry_from_ge_result(
+                "check_unique", unique_result)
+
+        primary_key = self.meta_data.get("primary_key")
+        if not primary_key:
+            return
+        if columns is not None and primary_key[0] not in columns:
+            return
+        if not all(c in self.df_ge.columns for c in primary_key):
+            return
+
+        pk_result = find_duplicates_in_df(self.df_ge, primary_key)
+        for col_name in primary_key:
+            col_logentries = self.vlog[col_name]
+            col_logentries.create_logentry_from_ge_result(
+                "check_primary_key", pk_result)
+
+    def _run_row_check(self, test_name, columns):
+        for col in self._get_meta_cols(columns):
+            if test_name not in get_column_checks(col):
+                continue
+            if col["name"] not in self.df_ge.columns:
+                continue
+
+            series = self.df_ge[col["name"]]
+            failures = failure_mask(test_name, series, col, self.verdict_cache)
+            result = failure_result(series, failures)
+
+            col_logentries = self.vlog[col["name"]]
+            col_logentries.create_logentry_from_ge_result(test_name, result)
+
+    def check_range(self, columns=None):
+        """
+        Test that values in column are between the minimum and maximum
+        specified in metadata, using vectorised comparisons
+        """
+        self._run_row_check("check_range", columns)
+
+    def check_length(self, columns=None):
+        """
+        Test that the lengths of values in column are between the min_length
+        and max_length specified in metadata
+        """
+        self._run_row_check("check_length", columns)
+
+    def check_types(self, columns=None):
         # The implementation of `expect_column_values_to_be_of_type` accepts pandas types so we can just use our data/type_conversion.json types
         # https://github.com/great-expectations/great_expectations/blob/2764099df5edcec98dc3a9260cf927d152d67f63/great_expectations/dataset/pandas_dataset.py#L524
         # see also https://github.com/great-expectations/great_expectations/issues/110
@@ -169,10 +412,23 @@ class Linter:
 
         type_conversion_dict = get_type_conversion_dict()
 
-        for col in self.meta_cols:
+        for col in self._get_meta_cols(columns):
+            if col["name"] in self.raw_columns:
+                # Any value is a valid character, so only the counts from the scan are needed
+                counts = self._scan_raw_patterns([col])[col["name"]]["result"]
+                type_result = failure_result(pd.Series([], dtype=object), pd.Series([], dtype=bool))
+                type_result["result"].update(element_count=counts["element_count"],
+                                             missing_count=counts["missing_count"])
+                self.vlog[col["name"]].create_logentry_from_ge_result(test_name, type_result)
+                continue
             if col["name"] not in self.df_ge.columns:
                 continue
 
+            if col["type"] in ["int", "long"] and self.df_ge[col["name"]].dtype.kind == "O":
+                # The type couldn't be imposed, so report the values which aren't integers in range
+                self._run_row_check(test_name, [col["name"]])
+                continue
+
             pandas_type = type_conversion_dict[col["type"]]["ge_datatype"]
 
             type_result = self.df_ge.expect_column_values_to_be_of_type(
@@ -190,9 +446,7 @@ class Linter:
         """
         Check that the metadata the user has provided is valid
         """
-        with pkg_resources.resource_stream(__name__, "data/metadata_jsonschema.json") as io:
-            schema = json.load(io)
-        jsonschema.validate(self.meta_data, schema)
+        validate_meta_data(self.meta_data)
 
     def check_all(self):
         """
@@ -203,8 +457,80 @@ class Linter:
         self.check_nulls()
         self.check_pattern()
         self.check_enums()
+        self.check_range()
+        self.check_length()
+        self.check_unique()
         self.check_types()
 
+    def profile(self, top_k=20):
+        """
+        Return a data_linter.drift.TableSketch of the values in each column, which can be saved
+        as a baseline for check_drift.  The sketches are computed once, on the first call
+        """
+        if self._table_sketch is None:
+            from data_linter.drift import TableSketch
+            self._table_sketch = TableSketch(self.meta_data, top_k)
+            self._table_sketch.update(self.df_ge)
+        return self._table_sketch
+
+    def check_drift(self, baseline, thresholds=None):
+        """
+        Compare the profile of the data with baseline (a TableSketch, or the path to one saved
+        with TableSketch.save), logging a check_drift_* entry for each sketch of each column.
+        thresholds overrides data_linter.drift.DEFAULT_THRESHOLDS (see compare_sketches)
+        """
+        from data_linter.drift import TableSketch, compare_sketches
+
+        if isinstance(baseline, str):
+            baseline = TableSketch.load(baseline)
+
+        results = compare_sketches(baseline, self.profile(), thresholds)
+        for col_name, col_results in results.items():
+            col_logentries = self.vlog[col_name]
+            for test_name, result in col_results.items():
+                col_logentries.create_logentry_from_ge_result(test_name, result)
+
+    def check_column(self, col_name):
+        """
+        Perform all of the value validations on a single column
+        """
+        columns = [col_name]
+        self.check_nulls(columns)
+        self.check_pattern(columns)
+        self.check_enums(columns)
+        self.check_range(columns)
+        self.check_length(columns)
+        self.check_unique(columns)
+        self.check_types(columns)
+
+    async def aiter_check_all(self, executor=None):
+        """
+        Asynchronous version of check_all which yields a progress event after each column is checked.
+        The checks are run in executor (by default the event loop's default executor) so
+        the event loop is not blocked.  If the task is cancelled, no further columns are checked
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(executor, self.check_column_exists_and_order)
+
+        col_names = self.meta_colnames
+        for i, col_name in enumerate(col_names):
+            await loop.run_in_executor(executor, self.check_column, col_name)
+            yield {
+                "event": "column_checked",
+                "col_name": col_name,
+                "columns_done": i + 1,
+                "columns_total": len(col_names)
+            }
+
+    async def acheck_all(self, executor=None, progress=None):
+        """
+        Asynchronous version of check_all.  If provided, progress is called with
+        each progress event from aiter_check_all
+        """
+        async for event in self.aiter_check_all(executor):
+            if progress is not None:
+                progress(event)
+
     def _repr_markdown_(self):
         return self.markdown_summary()
 
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.partitions
+~~~~~~~~~~~~~~~
+This module contains functions for linting a table stored in a hive-style partitioned
+directory (e.g. table/year=2019/month=01/part-0.csv).
+
+Partition columns only exist in the directory names, so they are checked once per directory
+rather than once per row.  The data files are then linted in parallel against the metadata
+with the partition columns removed
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from urllib.parse import unquote
+
+import pandas as pd
+
+from data_linter.checks import failure_mask, failure_result, get_column_checks
+from data_linter.lint import lint_file, validate_meta_data
+from data_linter.read_data import get_file_format
+
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _is_data_file(filename, file_format):
+    # Skip marker and hidden files e.g. _SUCCESS, .part-0.crc
+    if filename.startswith("_") or filename.startswith("."):
+        return False
+    if file_format is not None:
+        return True
+    try:
+        get_file_format(filename)
+    except ValueError:
+        return False
+    return True
+
+
+def discover_partitions(root, file_format=None):
+    """
+    Walk the directory root and return a list of (partition path, partition values, data files)
+    where partition path is relative to root (e.g. 'year=2019/month=01'), and partition values
+    maps each key in the path to its value (None for hive's null partition)
+    """
+    partitions = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        files = sorted(os.path.join(dirpath, f) for f in filenames if _is_data_file(f, file_format))
+        if not files:
+            continue
+
+        rel_path = os.path.relpath(dirpath, root)
+        values = {}
+        if rel_path != os.curdir:
+            for part in rel_path.split(os.sep):
+                if "=" not in part:
+                    continue
+                key, value = part.split("=", 1)
+                value = unquote(value)
+                values[unquote(key)] = None if value == HIVE_NULL else value
+
+        partitions.append((rel_path.replace(os.sep, "/"), values, files))
+    return partitions
+
+
+def check_partition_values(partitions, partition_cols):
+    """
+    Run the row level checks for each partition column once per partition directory.
+    Returns {col name: {check name: result}}, with results in the same format as great_expectations
+    and the paths of failing directories in unexpected_index_list
+    """
+    paths = [p for p, _, _ in partitions]
+    results = {}
+    for col in partition_cols:
+        series = pd.Series([values.get(col["name"]) for _, values, _ in partitions], index=paths, dtype=object)
+        results[col["name"]] = {
+            check_name: failure_result(series, failure_mask(check_name, series, col))
+            for check_name in get_column_checks(col)
+        }
+    return results
+
+
+def _lint_file_as_dict(path, meta_data, backend, file_format):
+    linter = lint_file(path, meta_data, backend=backend, file_format=file_format)
+    return linter.success(), linter.vlog.as_dict()
+
+
+class PartitionedLintResult:
+    """
+    The results of linting a partitioned directory: checks of the partition values of each
+    directory, keys found in paths which aren't in the metadata, and the log of each data file
+    """
+
+    def __init__(self, partition_results, unexpected_keys, file_results):
+        self.partition_results = partition_results
+        self.unexpected_keys = unexpected_keys
+        self.file_results = file_results
+
+    def success(self):
+        if self.unexpected_keys:
+            return False
+        for check_results in self.partition_results.values():
+            if not all(r["success"] for r in check_results.values()):
+                return False
+        return all(success for success, _ in self.file_results.values())
+
+    def as_dict(self):
+        return {
+            "partitions": self.partition_results,
+            "unexpected_partition_keys": self.unexpected_keys,
+            "files": {path: log for path, (_, log) in self.file_results.items()},
+        }
+
+
+def lint_partitioned_directory(root, meta_data, partition_columns=None, backend="pandas",
+                               file_format=None, n_jobs=None):
+    """
+    Lint a table stored in the hive-style partitioned directory root.
+
+    partition_columns are the names of the metadata columns stored in the directory names.  If not
+    given, they are the metadata columns which appear as keys in any directory name.  Each partition
+    directory's values are checked once, then every data file is linted against the metadata without
+    the partition columns, n_jobs files at a time in separate processes (n_jobs=1 lints in this process)
+    """
+    validate_meta_data(meta_data)
+    partitions = discover_partitions(root, file_format)
+
+    meta_colnames = [c["name"] for c in meta_data["columns"]]
+    path_keys = []
+    for _, values, _ in partitions:
+        path_keys.extend(k for k in values if k not in path_keys)
+    if partition_columns is None:
+        partition_columns = [k for k in path_keys if k in meta_colnames]
+    unexpected_keys = [k for k in path_keys if k not in partition_columns]
+
+    partition_cols = [c for c in meta_data["columns"] if c["name"] in partition_columns]
+    partition_results = check_partition_values(partitions, partition_cols)
+
+    file_meta = dict(meta_data)
+    file_meta["columns"] = [c for c in meta_data["columns"] if c["name"] not in partition_columns]
+    if any(c in partition_columns for c in meta_data.get("primary_key", [])):
+        # Files can't be checked for a key which includes a partition column
+        del file_meta["primary_key"]
+
+    files = [f for _, _, partition_files in partitions for f in partition_files]
+    args = (files, repeat(file_meta), repeat(backend), repeat(file_format))
+    if n_jobs == 1:
+        results = list(map(_lint_file_as_dict, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_lint_file_as_dict, *args))
+
+    return PartitionedLintResult(partition_results, unexpected_keys, dict(zip(files, results)))
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.quarantine
+~~~~~~~~~~~~~~~
+This module contains functions that split a data file into the rows which pass all of the
+checks in the metadata and the rows which fail at least one (the quarantine), in a single pass
+over the file.  Rows are checked and written a chunk at a time, so files larger than memory can be split.
+
+For each chunk, a bitset with one bit per column x check is computed for every row.  Failing rows
+are written with an extra column, _failure_reasons, listing the checks they failed
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_linter.checks import failure_mask, get_column_checks
+from data_linter.lint import validate_meta_data
+from data_linter.read_data import (
+    FILE_FORMATS,
+    arrow_schema_from_metadata,
+    get_file_format,
+    iter_chunks,
+    read_schema,
+)
+
+FAILURE_REASONS_COL = "_failure_reasons"
+
+
+class ChunkWriter:
+    """
+    Writes a sequence of dataframes with the same columns to a single csv, jsonl or parquet file.
+
+    For parquet, arrow_types can map column names to the pyarrow types they are written with, and
+    every chunk is cast to them.  Other columns take their type from the first chunk
+    """
+
+    def __init__(self, path, file_format=None, arrow_types=None):
+        self.path = path
+        self.file_format = file_format or get_file_format(path)
+        if self.file_format not in FILE_FORMATS:
+            raise ValueError(f"file_format must be one of {FILE_FORMATS}")
+        self.arrow_types = arrow_types or {}
+        self._file = None
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self.file_format == "parquet":
+            self._write_parquet(df)
+            return
+
+        if self._file is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            if self.file_format == "csv":
+                df.to_csv(self._file, index=False)
+                return
+
+        if self.file_format == "csv":
+            df.to_csv(self._file, index=False, header=False)
+        elif len(df) > 0:
+            self._file.write(df.to_json(orient="records", lines=True, date_format="iso"))
+            self._file.write("\n")
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet_writer is None:
+            schema = pa.Table.from_pandas(df, preserve_index=False).schema
+            # A column which is all null in the first chunk gets the null type - assume strings instead
+            fields = [pa.field(f.name, pa.string() if f.type == pa.null() else f.type) for f in schema]
+            fields = [pa.field(f.name, self.arrow_types.get(f.name, f.type)) for f in fields]
+            self._schema = pa.schema(fields)
+            self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+
+        # The types pandas gives a column can change from chunk to chunk (an int column with
+        # nulls is float64), so each column is cast to the type in the schema
+        missing = pd.Series(None, index=df.index, dtype=object)
+        arrays = [_arrow_column(df[f.name] if f.name in df.columns else missing, f.type) for f in self._schema]
+        table = pa.Table.from_arrays(arrays, schema=self._schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _arrow_column(series, arrow_type):
+    """
+    Convert the pandas series to a pyarrow array of arrow_type
+    """
+    import pyarrow as pa
+
+    if pa.types.is_string(arrow_type) and series.dtype.kind != "O":
+        series = series.astype(str).where(series.notnull(), None)
+    array = pa.array(series, from_pandas=True)
+    if array.type == pa.null():
+        return pa.array([None] * len(series), type=arrow_type)
+    if array.type != arrow_type:
+        array = array.cast(arrow_type)
+    return array
+
+
+def _value_as_string(value, col_type):
+    if isinstance(value, str):
+        return value
+    # Ints in a column with nulls are read as floats
+    if col_type in ("int", "long") and isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _as_strings(df, meta_data):
+    """
+    Return df with the metadata columns converted to strings (nulls stay null)
+    """
+    columns = {}
+    for col in meta_data["columns"]:
+        if col["name"] in df.columns:
+            series = df[col["name"]]
+            strings = series.map(lambda v: _value_as_string(v, col["type"]))
+            columns[col["name"]] = strings.where(series.notnull(), None)
+    return df.assign(**columns)
+
+
+def _parquet_arrow_types(path, file_format, meta_data):
+    """
+    The pyarrow types of the columns of the passed and failed parquet files, so they don't depend
+    on the types pandas happens to give the first chunk.  The failed rows of a jsonl file can
+    hold values of any type, so their metadata columns are written as strings
+    """
+    import pyarrow as pa
+
+    if file_format == "parquet":
+        types = dict(read_schema(path, "parquet"))
+        return types, types
+    if file_format == "jsonl":
+        schema = arrow_schema_from_metadata(meta_data)
+        return ({f.name: f.type for f in schema},
+                {col["name"]: pa.string() for col in meta_data["columns"]})
+    # csv values are all strings
+    return {}, {}
+
+
+def _failure_bits(chunk, checks):
+    """
+    Return an array of shape (rows, words) of uint64, in which bit i of row r is set if
+    row r fails checks[i].  Columns missing from the chunk are treated as all null
+    """
+    n_words = max(1, (len(checks) + 63) // 64)
+    bits = np.zeros((len(chunk), n_words), dtype=np.uint64)
+
+    for i, (col, check_name) in enumerate(checks):
+        if col["name"] in chunk.columns:
+            series = chunk[col["name"]]
+        else:
+            series = pd.Series(None, index=chunk.index, dtype=object)
+        failures = failure_mask(check_name, series, col).values
+        bits[failures, i // 64] |= np.uint64(1 << (i % 64))
+
+    return bits
+
+
+def _failure_reasons(bits, checks):
+    reasons = pd.Series("", index=range(len(bits)))
+    for i, (col, check_name) in enumerate(checks):
+        failed = (bits[:, i // 64] & np.uint64(1 << (i % 64))) != 0
+        if failed.any():
+            reasons[failed] = reasons[failed] + f"{col['name']}:{check_name};"
+    return reasons.str.rstrip(";").values
+
+
+def quarantine_file(path, meta_data, passed_path, failed_path, chunksize=100000,
+                    file_format=None, output_format=None):
+    """
+    Read the file at path in chunks and write the rows which pass all checks in meta_data
+    to passed_path, and the rows which fail to failed_path, with the checks they failed in
+    the _failure_reasons column.  Values are written as they were read (csv values stay strings).
+    Parquet output has the column types of a parquet file, or the metadata types of a jsonl file, except
+    that the failed rows of a jsonl file are written as strings.
+
+    Returns a summary with the row counts and, for each column and check, the number of failing rows
+    """
+    validate_meta_data(meta_data)
+    checks = [(col, check_name)
+              for col in meta_data["columns"]
+              for check_name in get_column_checks(col)]
+
+    summary = {"rows": 0, "passed_rows": 0, "failed_rows": 0, "failures": {}}
+    for col, check_name in checks:
+        summary["failures"].setdefault(col["name"], {})[check_name] = 0
+
+    file_format = file_format or get_file_format(path)
+    output_format = output_format or get_file_format(passed_path)
+    passed_types, failed_types = {}, {}
+    if output_format == "parquet":
+        passed_types, failed_types = _parquet_arrow_types(path, file_format, meta_data)
+    failed_as_strings = output_format == "parquet" and file_format == "jsonl"
+
+    with ChunkWriter(passed_path, output_format, passed_types) as passed_writer, \
+            ChunkWriter(failed_path, output_format, failed_types) as failed_writer:
+
+        for chunk in iter_chunks(path, chunksize=chunksize, file_format=file_format):
+            bits = _failure_bits(chunk, checks)
+            failed = bits.any(axis=1)
+
+            passed_writer.write(chunk[~failed])
+
+            failed_rows = chunk[failed]
+            if failed_as_strings:
+                failed_rows = _as_strings(failed_rows, meta_data)
+            failed_rows = failed_rows.assign(**{FAILURE_REASONS_COL: _failure_reasons(bits[failed], checks)})
+            failed_writer.write(failed_rows)
+
+            for i, (col, check_name) in enumerate(checks):
+                count = np.count_nonzero(bits[:, i // 64] & np.uint64(1 << (i % 64)))
+                summary["failures"][col["name"]][check_name] += int(count)
+
+            summary["rows"] += len(chunk)
+            summary["failed_rows"] += int(failed.sum())
+            summary["passed_rows"] += int((~failed).sum())
+
+    return summary
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.raw_scan
+~~~~~~~~~~~~~~~
+This module contains functions that run pattern checks directly against the raw bytes of an
+uncompressed csv file, without creating a python string for every value.
+
+The file is memory-mapped and the field boundaries of each record are found with numpy, a block
+at a time.  Each field of a column with a pattern is matched by the compiled pattern as a
+zero-copy slice of the file, so only the values which fail are ever decoded, and the memory used
+is proportional to the number of failures rather than the size of the file
+"""
+
+import mmap
+import re
+
+import numpy as np
+
+from data_linter.checks import get_column_checks
+from data_linter.read_data import _read_csv_header, get_compression
+
+# Small enough that the arrays of field boundaries in a block stay small
+DEFAULT_BLOCK_SIZE = 1024 ** 2
+# Fields are matched this many at a time, so only a slice of their bounds are python ints at once
+_SCAN_SLICE_SIZE = 4096
+
+# The strings pandas reads as nulls by default
+_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "N/A", "NA", "NULL", "NaN", "n/a", "nan", "null",
+}
+_NA_VALUES = [s.encode("ascii") for s in _NA_STRINGS if s]
+
+
+class _ColumnScan:
+    """
+    The pattern, and the failures found so far, of one column
+    """
+
+    def __init__(self, col, index):
+        self.col = col
+        self.index = index
+        self.str_regex = re.compile(col["pattern"])
+        try:
+            self.bytes_regex = re.compile(col["pattern"].encode("ascii"))
+        except UnicodeEncodeError:
+            # Character classes with non-ascii characters don't work on bytes
+            self.bytes_regex = None
+        self.non_missing = 0
+        self.unexpected_index_list = []
+        self.unexpected_list = []
+
+    def result(self, element_count):
+        missing_count = element_count - self.non_missing
+        unexpected_count = len(self.unexpected_list)
+        return {
+            "success": unexpected_count == 0,
+            "result": {
+                "element_count": element_count,
+                "missing_count": missing_count,
+                "unexpected_count": unexpected_count,
+                "unexpected_percent": 100 * unexpected_count / self.non_missing if self.non_missing else 0.0,
+                "unexpected_list": self.unexpected_list,
+                "unexpected_index_list": self.unexpected_index_list,
+            }
+        }
+
+
+def _decode_field(raw, quotechar):
+    # The value pandas would read from the field's raw bytes: "a""b" is a"b, and anything
+    # after the closing quote is kept
+    text = raw.decode("utf-8", errors="replace")
+    if quotechar is None or not text.startswith(quotechar):
+        return text
+
+    chars = []
+    in_quotes = True
+    i = 1
+    while i < len(text):
+        c = text[i]
+        if in_quotes and c == quotechar:
+            if text[i + 1:i + 2] == quotechar:
+                chars.append(c)
+                i += 2
+                continue
+            in_quotes = False
+        else:
+            chars.append(c)
+        i += 1
+    return "".join(chars)
+
+
+def _na_mask(arr, starts, ends):
+    # True for the fields [starts, ends) of arr which pandas reads as null, comparing the
+    # fields of the right length with each null string a byte at a time
+    lengths = ends - starts
+    na = lengths == 0
+    for value in _NA_VALUES:
+        candidates = np.flatnonzero(lengths == len(value))
+        for k, byte in enumerate(value):
+            candidates = candidates[arr[starts[candidates] + k] == byte]
+        na[candidates] = True
+    return na
+
+
+def _count_between(positions, starts, ends):
+    return np.searchsorted(positions, ends) - np.searchsorted(positions, starts)
+
+
+class _Block:
+    """
+    The fields of the complete records in a block of a csv file
+    """
+
+    def __init__(self, arr, delimiter, quotechar, final):
+        self.arr = arr
+        self.quotes = np.flatnonzero(arr == ord(quotechar)) if quotechar is not None else np.array([], dtype=np.int64)
+        self.quotechar = quotechar
+        self.non_ascii = np.flatnonzero(arr >= 0x80)
+
+        # Delimiters and newlines end fields unless an odd number of quotechars come before them.
+        # Blocks always start at the start of a record, so no quotes are open
+        seps = np.flatnonzero((arr == ord(delimiter)) | (arr == 10))
+        if quotechar is not None:
+            seps = seps[np.searchsorted(self.quotes, seps) % 2 == 0]
+        is_newline = arr[seps] == 10
+
+        if not final:
+            # Only complete records - the rest of the block is read again as part of the next one
+            newlines = np.flatnonzero(is_newline)
+            if len(newlines) == 0:
+                self.length = None
+                return
+            seps, is_newline = seps[:newlines[-1] + 1], is_newline[:newlines[-1] + 1]
+        elif len(seps) == 0 or seps[-1] != len(arr) - 1 or not is_newline[-1]:
+            # The last record doesn't end with a newline
+            seps = np.append(seps, len(arr))
+            is_newline = np.append(is_newline, True)
+        self.length = int(seps[-1]) + 1
+
+        idx = np.arange(len(seps))
+        starts = np.concatenate([[0], seps[:-1] + 1])
+        ends = seps.copy()
+        # The \r of \r\n line endings isn't part of the last field
+        cr = is_newline & (ends > starts) & (arr[np.maximum(ends - 1, 0)] == 13)
+        ends[cr] -= 1
+
+        is_first = np.concatenate([[True], is_newline[:-1]])
+        self.record = np.cumsum(is_newline) - is_newline
+        self.field_number = idx - np.maximum.accumulate(np.where(is_first, idx, 0))
+        self.starts, self.ends = starts, ends
+
+        # Like pandas, skip blank lines
+        blank_fields = is_first & is_newline & (ends == starts)
+        self.blank_records = np.zeros(int(is_newline.sum()), dtype=bool)
+        self.blank_records[self.record[blank_fields]] = True
+
+    def fields(self, field_number, rows):
+        """
+        Return the bounds of the fields with field_number and of their values (without quotes),
+        their row numbers, and whether they need to be decoded in python
+        """
+        selected = np.flatnonzero((self.field_number == field_number) & ~self.blank_records[self.record])
+        rows = rows[self.record[selected]]
+        keep = rows >= 0
+        selected, rows = selected[keep], rows[keep]
+
+        arr, last = self.arr, len(self.arr) - 1
+        raw_starts, raw_ends = self.starts[selected], self.ends[selected]
+        value_starts, value_ends = raw_starts.copy(), raw_ends.copy()
+        slow = np.zeros(len(selected), dtype=bool)
+
+        if self.quotechar is not None:
+            quote = ord(self.quotechar)
+            quoted = (raw_starts < raw_ends) & (arr[np.minimum(raw_starts, last)] == quote)
+            simple = quoted & (_count_between(self.quotes, raw_starts, raw_ends) == 2) \
+                & (raw_ends - raw_starts >= 2) & (arr[np.maximum(raw_ends - 1, 0)] == quote)
+            value_starts[simple] += 1
+            value_ends[simple] -= 1
+            # Escaped quotes, or text after the closing quote
+            slow |= quoted & ~simple
+
+        # Non-ascii values are matched as strings, as they would be by pandas
+        slow |= _count_between(self.non_ascii, raw_starts, raw_ends) > 0
+
+        return raw_starts, raw_ends, value_starts, value_ends, rows, slow
+
+
+def _scan_fields(scan, block, mm, mv, offset, fields, quotechar):
+    raw_starts, raw_ends, value_starts, value_ends, rows, slow = fields
+    if scan.bytes_regex is None:
+        slow = np.ones(len(slow), dtype=bool)
+    failures = {}
+
+    # Values with escaped quotes or non-ascii characters are decoded
+    slow_fields = np.flatnonzero(slow)
+    for first in range(0, len(slow_fields), _SCAN_SLICE_SIZE):
+        for i in slow_fields[first:first + _SCAN_SLICE_SIZE].tolist():
+            value = _decode_field(mm[offset + raw_starts[i]:offset + raw_ends[i]], quotechar)
+            if value in _NA_STRINGS:
+                continue
+            scan.non_missing += 1
+            if scan.str_regex.search(value) is None:
+                failures[i] = value
+
+    # Everything else is matched as a slice of the file
+    fast_fields = np.flatnonzero(~slow & ~_na_mask(block.arr, value_starts, value_ends))
+    scan.non_missing += len(fast_fields)
+    search = scan.bytes_regex.search if scan.bytes_regex is not None else None
+    for first in range(0, len(fast_fields), _SCAN_SLICE_SIZE):
+        part = fast_fields[first:first + _SCAN_SLICE_SIZE]
+        bounds = zip(part.tolist(), (value_starts[part] + offset).tolist(),
+                     (value_ends[part] + offset).tolist())
+        for i, start, end in bounds:
+            if search(mv[start:end]) is None:
+                failures[i] = mm[offset + value_starts[i]:offset + value_ends[i]].decode("ascii")
+
+    for i in sorted(failures):
+        scan.unexpected_index_list.append(int(rows[i]))
+        scan.unexpected_list.append(failures[i])
+
+
+def raw_scan_columns(meta_data):
+    """
+    The metadata columns whose checks can all be run by scan_csv_patterns: character columns with
+    a pattern and nothing else to check about their values
+    """
+    primary_key = meta_data.get("primary_key") or []
+    return [col for col in meta_data["columns"]
+            if col["type"] == "character" and get_column_checks(col) == ["check_pattern", "check_data_type"]
+            and not col.get("unique", False) and col["name"] not in primary_key]
+
+
+def read_columns(path, meta_data):
+    """
+    The columns of the csv file at path which need to be read into a dataframe if those in
+    raw_scan_columns are scanned instead.  At least one column is read, so the dataframe has
+    the file's rows
+    """
+    header = [name for name, _ in _read_csv_header(path)]
+    scanned = {col["name"] for col in raw_scan_columns(meta_data)}
+    return [name for name in header if name not in scanned] or header[:1]
+
+
+def scan_csv_patterns(path, columns, delimiter=",", quotechar='"', block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Check the values of the columns in the csv file at path against their patterns.  columns is
+    a list of metadata columns - those without a pattern, or which aren't in the file's header,
+    are skipped.
+
+    Returns {column name: result} with results in the same format as great_expectations, and the
+    same as those of data_linter.checks.pattern_failures on the values pandas would read: nulls
+    pass, values are matched as they are (without stripping whitespace), and the row numbers skip blank lines
+    """
+    if get_compression(path) is not None:
+        raise ValueError(f"Cannot scan the bytes of compressed file {path}")
+
+    header = {}
+    for i, (name, _) in enumerate(_read_csv_header(path)):
+        header.setdefault(name, i)
+    scans = [_ColumnScan(col, header[col["name"]])
+             for col in columns if "pattern" in col and col["name"] in header]
+
+    records_seen = 0
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be memory-mapped
+            return {scan.col["name"]: scan.result(0) for scan in scans}
+
+        arr = block = None
+        try:
+            with memoryview(mm) as mv:
+                start, size = 0, block_size
+                while start < len(mm):
+                    end = min(start + size, len(mm))
+                    arr = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+                    block = _Block(arr, delimiter, quotechar, final=end == len(mm))
+                    if block.length is None:
+                        # A record longer than the block
+                        size *= 2
+                        continue
+
+                    # Row numbers of the data records, counting the first non-blank record as the header
+                    rows = records_seen + np.cumsum(~block.blank_records) - 2
+                    records_seen += int((~block.blank_records).sum())
+
+                    for scan in scans:
+                        fields = block.fields(scan.index, rows)
+                        _scan_fields(scan, block, mm, mv, start, fields, quotechar)
+
+                    start, size = start + block.length, block_size
+        finally:
+            # The mmap can't be closed while an array still refers to it
+            arr = block = None
+            mm.close()
+
+    element_count = max(0, records_seen - 1)
+    return {scan.col["name"]: scan.result(element_count) for scan in scans}
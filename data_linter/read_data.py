@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.read_data
+~~~~~~~~~~~~~~~
+This module contains functions that read data files in chunks, so that files which are
+larger than memory can be processed one piece at a time.
+Text-based formats (csv, jsonl) are read as strings wherever possible, leaving it to
+impose_metadata_types_on_pd_df (or the caller) to decide what the types should be.
+
+Text-based files may be compressed (e.g. data.jsonl.gz), in which case they are decompressed
+as they are read.  Given the metadata, jsonl files are parsed by pyarrow's multithreaded JSON
+reader with an explicit schema
+"""
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import mmap
+import os
+import re
+import pandas as pd
+
+FILE_FORMATS = ["csv", "jsonl", "parquet"]
+
+_EXTENSION_LOOKUP = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+
+_COMPRESSION_LOOKUP = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+_JSONL_BLOCK_SIZE = 16 * 1024 ** 2
+
+# Metadata types which pyarrow's JSON reader can parse directly.  Dates are left as strings
+_ARROW_JSON_TYPES = {
+    "character": "string",
+    "int": "int64",
+    "long": "int64",
+    "float": "float64",
+    "double": "float64",
+    "boolean": "bool_",
+    "date": "string",
+    "datetime": "string",
+}
+
+
+def get_compression(path):
+    """
+    Infer the compression (one of the values of _COMPRESSION_LOOKUP, or None) from the file extension
+    """
+    _, ext = os.path.splitext(path)
+    return _COMPRESSION_LOOKUP.get(ext.lower())
+
+
+def get_file_format(path):
+    """
+    Infer the file format (one of FILE_FORMATS) from the file extension,
+    ignoring any compression extension (e.g. data.csv.gz is csv)
+    """
+    root, ext = os.path.splitext(path)
+    if ext.lower() in _COMPRESSION_LOOKUP:
+        _, ext = os.path.splitext(root)
+    ext = ext.lower()
+    if ext not in _EXTENSION_LOOKUP:
+        raise ValueError(
+            f"Cannot infer file format of {path}.  Please specify file_format as one of {FILE_FORMATS}")
+    return _EXTENSION_LOOKUP[ext]
+
+
+class _ArrowInputStream(io.RawIOBase):
+    # Wraps a pyarrow input stream so it can be used like a python file object
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._stream.close()
+        super().close()
+
+
+def open_input(path):
+    """
+    Open the file at path for reading bytes, decompressing it as it is read if it is compressed.
+    zstd needs pyarrow to have been built with zstd support
+    """
+    compression = get_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "zstd":
+        import pyarrow as pa
+        return io.BufferedReader(_ArrowInputStream(pa.input_stream(path, compression="zstd")))
+    return open(path, "rb")
+
+
+def _iter_lines(path, encoding="utf-8", block_size=64 * 1024):
+    # Lines of a (possibly compressed) text file, so the start of a file can be read cheaply
+    with open_input(path) as f:
+        remainder = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines = (remainder + block).split(b"\n")
+            remainder = lines.pop()
+            for line in lines:
+                yield line.rstrip(b"\r").decode(encoding)
+        if remainder:
+            yield remainder.decode(encoding)
+
+
+def arrow_schema_from_metadata(meta_data):
+    """
+    Return a pyarrow schema for reading jsonl data with the metadata meta_data
+    """
+    import pyarrow as pa
+
+    return pa.schema([pa.field(col["name"], getattr(pa, _ARROW_JSON_TYPES[col["type"]])())
+                      for col in meta_data["columns"]])
+
+
+def _column_filter(columns):
+    if columns is None:
+        return None
+    columns = set(columns)
+    return lambda c: c in columns
+
+
+def _iter_csv_chunks(path, chunksize, columns):
+    with open_input(path) as f:
+        reader = pd.read_csv(f, dtype=object, chunksize=chunksize,
+                             usecols=_column_filter(columns))
+        for chunk in reader:
+            yield chunk
+
+
+def _read_csv_bytes(data, names, columns):
+    return pd.read_csv(io.BytesIO(data), header=None, names=names, dtype=object, usecols=_column_filter(columns))
+
+
+def _iter_csv_chunks_at_offsets(path, chunk_offsets, columns):
+    # Each chunk is parsed from its own slice of the file, so the reader doesn't need to
+    # find the record boundaries itself.  The header is read separately
+    names = [name for name, _ in _read_csv_header(path)]
+    start_row = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ends = list(chunk_offsets[1:]) + [len(mm)]
+        for start, end in zip(chunk_offsets, ends):
+            chunk = _read_csv_bytes(mm[start:end], names, columns)
+            chunk.index = pd.RangeIndex(start_row, start_row + len(chunk))
+            start_row += len(chunk)
+            yield chunk
+
+
+def read_csv_slice(path, start, end, columns=None):
+    """
+    Read the records of the uncompressed csv file at path between the byte offsets start and end,
+    which must be the starts of records (e.g. from data_linter.encoding.scan_file), or end the file
+    """
+    names = [name for name, _ in _read_csv_header(path)]
+    with open(path, "rb") as f:
+        f.seek(start)
+        return _read_csv_bytes(f.read(end - start), names, columns)
+
+
+def _iter_jsonl_chunks(path, chunksize, columns):
+    # Dates are left as strings - the caller decides what they should be
+    with io.TextIOWrapper(open_input(path), encoding="utf-8") as f:
+        reader = pd.read_json(f, lines=True, chunksize=chunksize, convert_dates=False)
+        for chunk in reader:
+            if columns is not None:
+                chunk = chunk[[c for c in chunk.columns if c in columns]]
+            yield chunk
+
+
+def _iter_jsonl_blocks(path, block_size):
+    # Blocks of whole lines of the decompressed file
+    with open_input(path) as f:
+        remainder = b""
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            data = remainder + data
+            end = data.rfind(b"\n") + 1
+            remainder = data[end:]
+            if end:
+                yield data[:end]
+        if remainder.strip():
+            yield remainder
+
+
+def _json_parse_options(schema, columns):
+    import pyarrow.json as pj
+
+    if columns is not None:
+        # Newer versions of pyarrow can skip the fields which aren't in the schema altogether
+        try:
+            return pj.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore")
+        except TypeError:
+            pass
+    return pj.ParseOptions(explicit_schema=schema)
+
+
+def _first_record_keys(block):
+    start = re.search(rb"\S", block).start()
+    end = block.find(b"\n", start)
+    return list(json.loads(block[start:end if end != -1 else None]))
+
+
+def _block_has_key(block, name):
+    key = re.escape(json.dumps(name, ensure_ascii=False).encode("utf-8"))
+    return re.search(rb"[{,]\s*" + key + rb"\s*:", block) is not None
+
+
+def _parse_jsonl_block(block, schema, columns):
+    import pyarrow as pa
+    import pyarrow.json as pj
+
+    try:
+        table = pj.read_json(pa.BufferReader(block), parse_options=_json_parse_options(schema, columns))
+        df = table.to_pandas()
+    except pa.ArrowInvalid:
+        # Some value doesn't have the type in the metadata - parse the block with pandas
+        # instead, so that the checks see the value
+        return pd.read_json(io.StringIO(block.decode("utf-8")), lines=True, convert_dates=False)
+
+    # Fields in the schema are always in the table, so a field which is null in every row is
+    # only kept if it is a key somewhere in the block (as pandas would).  Columns are put in file order
+    keys = _first_record_keys(block)
+    schema_names = set(schema.names)
+    present = [c for c in df.columns
+               if c not in schema_names or c in keys or df[c].notnull().any() or _block_has_key(block, c)]
+    ordered = [c for c in keys if c in present] + [c for c in present if c not in keys]
+    return df[ordered]
+
+
+def _iter_jsonl_chunks_with_schema(path, chunksize, columns, schema, block_size=_JSONL_BLOCK_SIZE):
+    # Blocks are parsed with an explicit schema, then split into chunks of chunksize rows
+    # (or one chunk per block if chunksize is None)
+    start_row = 0
+    pending = None
+    for block in _iter_jsonl_blocks(path, block_size):
+        if re.search(rb"\S", block) is None:
+            continue
+        df = _parse_jsonl_block(block, schema, columns)
+        if columns is not None:
+            df = df[[c for c in df.columns if c in columns]]
+        pending = df if pending is None else pd.concat([pending, df], ignore_index=True, sort=False)
+
+        size = chunksize or len(pending)
+        while pending is not None and 0 < size <= len(pending):
+            chunk, pending = pending.iloc[:size], pending.iloc[size:]
+            chunk.index = pd.RangeIndex(start_row, start_row + len(chunk))
+            start_row += len(chunk)
+            yield chunk
+            if len(pending) == 0:
+                pending = None
+
+    if pending is not None and len(pending) > 0:
+        pending.index = pd.RangeIndex(start_row, start_row + len(pending))
+        yield pending
+
+
+def _iter_parquet_chunks(path, chunksize, columns):
+    # Parquet files are read one row group at a time, so chunksize is decided by the writer
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    if columns is not None:
+        file_columns = pf.schema.to_arrow_schema().names
+        columns = [c for c in file_columns if c in columns]
+    for i in range(pf.num_row_groups):
+        yield pf.read_row_group(i, columns=columns).to_pandas()
+
+
+def read_parquet_row_group(path, row_group, columns=None):
+    """
+    Read a single row group of the parquet file at path
+    """
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path).read_row_group(row_group, columns=columns).to_pandas()
+
+
+def iter_chunks(path, chunksize=100000, file_format=None, columns=None, chunk_offsets=None, meta_data=None):
+    """
+    Yield the data in the file at path as a sequence of pandas dataframes of at most
+    chunksize rows (for parquet, one dataframe per row group).
+
+    If columns is provided, only those columns are read.  Columns which are requested
+    but not present in the file are silently ignored.
+
+    If meta_data is provided, jsonl files are parsed by pyarrow with a schema built from it.  Values
+    of the types in the metadata are parsed without any inference, falling back to pandas for
+    blocks of the file which contain values of other types
+
+    For csv files, chunk_offsets can be the byte offsets at which each chunk starts, as found by
+    data_linter.encoding.scan_file, in which case chunksize is ignored
+    """
+    if file_format is None:
+        file_format = get_file_format(path)
+
+    if file_format == "csv" and chunk_offsets is not None:
+        return _iter_csv_chunks_at_offsets(path, chunk_offsets, columns)
+    elif file_format == "csv":
+        return _iter_csv_chunks(path, chunksize, columns)
+    elif file_format == "jsonl" and meta_data is not None:
+        return _iter_jsonl_chunks_with_schema(path, chunksize, columns, arrow_schema_from_metadata(meta_data))
+    elif file_format == "jsonl":
+        return _iter_jsonl_chunks(path, chunksize, columns)
+    elif file_format == "parquet":
+        return _iter_parquet_chunks(path, chunksize, columns)
+    else:
+        raise ValueError(f"file_format must be one of {FILE_FORMATS}")
+
+
+def read_file(path, file_format=None, columns=None, meta_data=None):
+    """
+    Read the whole of the file at path into a pandas dataframe, reading text-based
+    formats as strings in the same way as iter_chunks.
+    """
+    if file_format is None:
+        file_format = get_file_format(path)
+
+    if file_format == "csv":
+        with open_input(path) as f:
+            return pd.read_csv(f, dtype=object, usecols=_column_filter(columns))
+    elif file_format == "jsonl" and meta_data is not None:
+        schema = arrow_schema_from_metadata(meta_data)
+        chunks = list(_iter_jsonl_chunks_with_schema(path, None, columns, schema))
+        return pd.concat(chunks, sort=False) if chunks else pd.DataFrame()
+    elif file_format == "jsonl":
+        with io.TextIOWrapper(open_input(path), encoding="utf-8") as f:
+            df = pd.read_json(f, lines=True, convert_dates=False)
+        if columns is not None:
+            df = df[[c for c in df.columns if c in columns]]
+        return df
+    elif file_format == "parquet":
+        return pd.concat(list(_iter_parquet_chunks(path, None, columns)), ignore_index=True)
+    else:
+        raise ValueError(f"file_format must be one of {FILE_FORMATS}")
+
+
+def _read_csv_header(path):
+    # Like pandas, skip any blank lines before the header
+    for row in csv.reader(_iter_lines(path, encoding="utf-8-sig")):
+        if row:
+            return [(name, None) for name in row]
+    return []
+
+
+def _read_jsonl_first_record(path):
+    for line in _iter_lines(path):
+        if line.strip():
+            record = json.loads(line)
+            return [(name, type(value)) for name, value in record.items()]
+    return []
+
+
+def _read_parquet_schema(path):
+    import pyarrow.parquet as pq
+
+    schema = pq.ParquetFile(path).schema.to_arrow_schema()
+    return [(field.name, field.type) for field in schema]
+
+
+def read_schema(path, file_format=None):
+    """
+    Read the column names of the file at path without reading any data rows - just the
+    csv header line, the first jsonl record or the parquet footer.
+
+    Returns a list of (column name, type) tuples.  type is None for csv, the python type of
+    the value in the first record for jsonl, and the pyarrow DataType for parquet
+    """
+    if file_format is None:
+        file_format = get_file_format(path)
+
+    if file_format == "csv":
+        return _read_csv_header(path)
+    elif file_format == "jsonl":
+        return _read_jsonl_first_record(path)
+    elif file_format == "parquet":
+        return _read_parquet_schema(path)
+    else:
+        raise ValueError(f"file_format must be one of {FILE_FORMATS}")
+
+
+def _statistic_value(value, arrow_type):
+    # Statistics of timestamp and date columns may be the underlying integers.  Some versions of
+    # pyarrow return them as UTC timestamps, which are made naive to compare with the metadata
+    import pyarrow as pa
+
+    if isinstance(value, int) and pa.types.is_timestamp(arrow_type):
+        value = pd.Timestamp(value, unit=arrow_type.unit)
+    elif isinstance(value, int) and pa.types.is_date(arrow_type):
+        value = pd.Timestamp(value, unit="D")
+    elif pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        value = pd.Timestamp(value)
+    else:
+        return value
+    return value.tz_convert(None) if value.tzinfo is not None else value
+
+
+def read_parquet_statistics(path):
+    """
+    Read the min, max and null count of each column from the row group statistics in
+    the parquet footer, without reading any data.  Returns a dict keyed by column name.
+    A statistic is None if any row group does not record it
+    """
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    arrow_schema = pf.schema.to_arrow_schema()
+    metadata = pf.metadata
+
+    statistics = {}
+    for j, field in enumerate(arrow_schema):
+        stats = {"min": None, "max": None, "null_count": 0}
+        for i in range(metadata.num_row_groups):
+            column_stats = metadata.row_group(i).column(j).statistics
+            if column_stats is None or not column_stats.has_min_max:
+                stats = {"min": None, "max": None, "null_count": None}
+                break
+            lo = _statistic_value(column_stats.min, field.type)
+            hi = _statistic_value(column_stats.max, field.type)
+            stats["min"] = lo if stats["min"] is None else min(stats["min"], lo)
+            stats["max"] = hi if stats["max"] is None else max(stats["max"], hi)
+            stats["null_count"] += column_stats.null_count
+        statistics[field.name] = stats
+    return statistics
@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.scheduler
+~~~~~~~~~~~~~~~
+This module contains a scheduler for linting many files concurrently within a global memory budget.
+
+The memory needed to lint each file is estimated from its size (or row count for parquet) and the
+types of the columns in its metadata.  Files which fit in max_task_bytes are linted whole with
+lint_file.  Larger files are split into chunk tasks, each checked by a StreamLinter, which are
+interleaved with the other files' tasks.  Tasks are run in a pool of processes (linting is
+mostly python work which holds the GIL) whenever a worker is free and their estimate fits in
+what is left of the budget.
+
+Uncompressed csv files are split at the record offsets found by data_linter.encoding.scan_file,
+and parquet files into row groups, so each worker reads its own chunk.  Other files are read
+a chunk at a time by the scheduler.  Uniqueness and primary keys of chunked files are checked
+across all of the chunks with a DuplicateFinder
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from data_linter.lint import lint_file
+from data_linter.read_data import (get_compression, get_file_format, iter_chunks, open_input,
+                                   read_csv_slice, read_parquet_row_group)
+from data_linter.stream import StreamLinter
+from data_linter.uniqueness import DuplicateFinder, hash_rows, typed_keys
+
+# Estimated bytes in memory per value: a short python string in an object column,
+# and each type once it has been imposed
+_RAW_CELL_BYTES = 64
+_TYPED_CELL_BYTES = {
+    "character": 64,
+    "int": 8,
+    "long": 8,
+    "float": 8,
+    "double": 8,
+    "boolean": 1,
+    "date": 8,
+    "datetime": 8,
+}
+# Allowance for the temporary copies made while the checks run
+_OVERHEAD = 2
+
+_SAMPLE_BYTES = 1024 ** 2
+# Assumed ratio of decompressed to compressed size, as the decompressed size isn't known
+_COMPRESSION_RATIO = 5
+
+
+def estimate_row_count(path, file_format=None):
+    """
+    Estimate the number of rows in the file at path - exact for parquet, and from the
+    number of lines in the first (decompressed) megabyte for text formats
+    """
+    file_format = file_format or get_file_format(path)
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+
+    with open_input(path) as f:
+        sample = f.read(_SAMPLE_BYTES)
+    if not sample:
+        return 0
+    lines = max(1, sample.count(b"\n"))
+    if len(sample) < _SAMPLE_BYTES:
+        # The sample is the whole file
+        return lines
+
+    size = os.path.getsize(path)
+    if get_compression(path) is not None:
+        size *= _COMPRESSION_RATIO
+    return int(lines * size / len(sample))
+
+
+def estimate_row_bytes(meta_data, file_format="csv"):
+    """
+    Estimate the bytes of memory needed per row to lint data with the metadata meta_data
+    """
+    typed = sum(_TYPED_CELL_BYTES[col["type"]] for col in meta_data["columns"])
+    raw = typed if file_format == "parquet" else _RAW_CELL_BYTES * len(meta_data["columns"])
+    return _OVERHEAD * (raw + typed)
+
+
+def _key_checks(meta_data):
+    # The uniqueness checks of the metadata, as (check name, log column, key columns)
+    checks = [("check_unique", col["name"], [col["name"]])
+              for col in meta_data["columns"] if col.get("unique", False)]
+    primary_key = meta_data.get("primary_key")
+    if primary_key:
+        checks.extend(("check_primary_key", name, primary_key) for name in primary_key)
+    return checks
+
+
+# The row numbers of chunk results are (chunk index, row in chunk) packed into an int64, which sort
+# in the same order as the rows of the file.  They are converted to row numbers in LintJob.finish
+_CHUNK_ROW_BITS = 32
+
+
+def _chunk_row_id(chunk_index, row):
+    return (chunk_index << _CHUNK_ROW_BITS) + row
+
+
+def _lint_whole(path, meta_data, file_format):
+    start = time.perf_counter()
+    linter = lint_file(path, meta_data, file_format=file_format)
+    return time.perf_counter() - start, (linter.success(), linter.vlog.as_dict())
+
+
+def _check_chunk(meta_data, source, chunk_index, key_checks):
+    # Read (unless the scheduler already has) and check one chunk of a file.  Returns the chunk's
+    # number of rows, a StreamLinter of its results, and the hashes of its keys for each of the
+    # key_checks.  Rows are numbered by _chunk_row_id, as the rows before the chunk aren't known yet
+    start = time.perf_counter()
+    row_offset = _chunk_row_id(chunk_index, 0)
+    kind = source[0]
+    if kind == "csv":
+        chunk = read_csv_slice(*source[1:])
+    elif kind == "parquet":
+        chunk = read_parquet_row_group(*source[1:])
+    else:
+        chunk = source[1]
+
+    stream_linter = StreamLinter(meta_data)
+    stream_linter.feed(chunk, row_offset)
+
+    keys = []
+    for _, _, key_columns in key_checks:
+        if not all(c in chunk.columns for c in key_columns):
+            keys.append(None)
+            continue
+        key = chunk[key_columns]
+        notnull = key.notnull().all(axis=1).values
+        # Typed as in the Linter's df_ge, so a key read as an int in one chunk and a float in another matches
+        hashes = hash_rows(typed_keys(key[notnull], meta_data), row_offset + np.flatnonzero(notnull))
+        keys.append((len(chunk), int((~notnull).sum()), hashes))
+    return time.perf_counter() - start, (chunk_index, len(chunk), stream_linter, keys)
+
+
+class LintJob:
+    """
+    A file to be linted by the MemoryBudgetScheduler, and its results
+    """
+
+    def __init__(self, path, meta_data, file_format=None):
+        self.path = path
+        self.meta_data = meta_data
+        self.file_format = file_format or get_file_format(path)
+        self.estimated_rows = estimate_row_count(path, self.file_format)
+        self.row_bytes = estimate_row_bytes(meta_data, self.file_format)
+
+        self.mode = None
+        self.chunksize = None
+        self.task_bytes = None
+        self.tasks = 0
+        self.queue_time = 0.0
+        self.run_time = 0.0
+        self.success = None
+        self.log = None
+        self.error = None
+
+        self.in_flight = 0
+        self.exhausted = False
+        self._sources = None
+        self._stream_linter = None
+        self._key_checks = None
+        self._duplicate_finders = None
+        self._key_counts = None
+        self._chunk_rows = None
+        self._ready_time = None
+
+    @property
+    def estimated_bytes(self):
+        return self.estimated_rows * self.row_bytes
+
+    def plan(self, max_task_bytes, memory_budget):
+        """
+        Decide whether to lint the whole file in one task or in chunks, and the memory
+        each task is expected to need (never more than the whole budget, so every task can run)
+        """
+        if self.estimated_bytes <= max_task_bytes:
+            self.mode = "whole"
+            self.task_bytes = self.estimated_bytes
+        else:
+            self.mode = "chunked"
+            self.chunksize = max(1, max_task_bytes // self.row_bytes)
+            self.task_bytes = self.chunksize * self.row_bytes
+            if self.file_format == "parquet":
+                # Parquet is read a row group at a time, whatever the chunksize
+                import pyarrow.parquet as pq
+                metadata = pq.ParquetFile(self.path).metadata
+                rows = max(metadata.row_group(i).num_rows for i in range(metadata.num_row_groups))
+                self.task_bytes = rows * self.row_bytes
+        self.task_bytes = min(self.task_bytes, memory_budget)
+
+    def _iter_sources(self):
+        # The source of each chunk task, in file order
+        if self.file_format == "csv" and get_compression(self.path) is None:
+            from data_linter.encoding import scan_file
+            offsets = scan_file(self.path, chunksize=self.chunksize).chunk_offsets
+            ends = offsets[1:] + [os.path.getsize(self.path)]
+            for start, end in zip(offsets, ends):
+                yield ("csv", self.path, start, end)
+        elif self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            for i in range(pq.ParquetFile(self.path).metadata.num_row_groups):
+                yield ("parquet", self.path, i)
+        else:
+            for chunk in iter_chunks(self.path, self.chunksize, self.file_format, meta_data=self.meta_data):
+                yield ("frame", chunk)
+
+    def next_task(self):
+        """
+        Return the (function, args) of the job's next task to run in a worker, or None if
+        there are no more
+        """
+        if self.exhausted:
+            return None
+        if self.mode == "whole":
+            self.exhausted = True
+            return _lint_whole, (self.path, self.meta_data, self.file_format)
+
+        try:
+            if self._sources is None:
+                self._sources = self._iter_sources()
+                self._stream_linter = StreamLinter(self.meta_data)
+                self._key_checks = _key_checks(self.meta_data)
+                self._duplicate_finders = [DuplicateFinder() for _ in self._key_checks]
+                self._key_counts = [[0, 0] for _ in self._key_checks]
+                self._chunk_rows = []
+            source = next(self._sources, None)
+        except Exception as e:
+            self.fail(e)
+            return None
+        if source is None:
+            self.exhausted = True
+            return None
+        self._chunk_rows.append(None)
+        return _check_chunk, (self.meta_data, source, len(self._chunk_rows) - 1, self._key_checks)
+
+    def task_done(self, result):
+        """
+        Record the result of one of the job's tasks
+        """
+        elapsed, result = result
+        self.run_time += elapsed
+        if self.mode == "whole":
+            self.success, self.log = result
+            return
+
+        chunk_index, rows, stream_linter, keys = result
+        self._chunk_rows[chunk_index] = rows
+        self._stream_linter.merge(stream_linter)
+        for i, key in enumerate(keys):
+            if key is not None:
+                rows, missing, hashes = key
+                self._key_counts[i][0] += rows
+                self._key_counts[i][1] += missing
+                self._duplicate_finders[i].update_hashes(hashes)
+
+    def fail(self, error):
+        self.success, self.error = False, error
+        self.exhausted = True
+        self._sources = None
+        for finder in self._duplicate_finders or []:
+            finder.finish()
+        self._duplicate_finders = None
+
+    def finish(self):
+        """
+        Finish a chunked job once all of its tasks are done, checking uniqueness across the chunks
+        """
+        if self.mode == "whole" or self.error is not None:
+            return
+
+        # The row numbers of the first row of each chunk, now that every chunk has been read
+        chunk_starts = np.concatenate([[0], np.cumsum(self._chunk_rows)]).tolist()
+        mask = (1 << _CHUNK_ROW_BITS) - 1
+
+        def row_numbers(row_ids):
+            return [chunk_starts[row_id >> _CHUNK_ROW_BITS] + (row_id & mask) for row_id in row_ids]
+
+        log = self._stream_linter.snapshot()
+        for entries in log.values():
+            for entry in entries.values():
+                result = entry.get("result") or {}
+                if "unexpected_index_list" in result:
+                    result["unexpected_index_list"] = row_numbers(result["unexpected_index_list"])
+
+        finished = {}
+        for (check_name, col_name, key_columns), finder, (rows, missing) in zip(
+                self._key_checks, self._duplicate_finders, self._key_counts):
+            # The primary key is only checked once, and logged for each of its columns
+            key = tuple(key_columns)
+            if key not in finished:
+                finished[key] = finder.finish()
+            duplicates = finished[key]
+            log.setdefault(col_name, {})[check_name] = {
+                "success": duplicates["duplicate_row_count"] == 0,
+                "result": {
+                    "element_count": rows,
+                    "missing_count": missing,
+                    "unexpected_count": duplicates["duplicate_row_count"],
+                    "duplicate_key_count": duplicates["duplicate_key_count"],
+                    # Only the hashes of chunks are kept, so the duplicates are listed by row number
+                    "unexpected_list": [],
+                    "unexpected_index_list": row_numbers(row for rows in duplicates["samples"] for row in rows),
+                },
+                "exception_info": None
+            }
+
+        self.log = log
+        self.success = all(entry["success"] for entries in log.values() for entry in entries.values())
+        self._stream_linter = self._duplicate_finders = None
+
+    def as_dict(self):
+        return {
+            "success": self.success,
+            "mode": self.mode,
+            "estimated_bytes": self.estimated_bytes,
+            "task_bytes": self.task_bytes,
+            "chunksize": self.chunksize,
+            "tasks": self.tasks,
+            "queue_time": self.queue_time,
+            "run_time": self.run_time,
+            "log": self.log,
+            "error": None if self.error is None else repr(self.error),
+        }
+
+
+class MemoryBudgetScheduler:
+    """
+    Lints many files concurrently in max_workers processes, keeping the total estimated memory
+    of the running tasks within memory_budget bytes.
+
+    Files estimated to need more than max_task_bytes (by default a quarter of the budget) are
+    linted in chunks, which may run at the same time as each other
+    """
+
+    def __init__(self, memory_budget, max_workers=None, max_task_bytes=None):
+        self.memory_budget = memory_budget
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_task_bytes = max_task_bytes or memory_budget // 4
+        self.jobs = []
+
+    def add(self, path, meta_data, file_format=None):
+        job = LintJob(path, meta_data, file_format)
+        job.plan(self.max_task_bytes, self.memory_budget)
+        self.jobs.append(job)
+        return job
+
+    def run(self):
+        """
+        Run all of the jobs and return a report with each job's results and timings, keyed by path,
+        and the utilisation of the memory budget and workers
+        """
+        start = time.perf_counter()
+        ready = deque(self.jobs)
+        for job in self.jobs:
+            job._ready_time = start
+
+        running = {}
+        in_use = 0
+        peak = 0
+        memory_time = 0.0
+        last_change = start
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                # First fit, so small tasks fill the space left by large ones.  Jobs go to the back
+                # of the queue after each task, so the files' tasks are interleaved
+                submitted = True
+                while submitted:
+                    submitted = False
+                    for _ in range(len(ready)):
+                        job = ready.popleft()
+                        if len(running) >= self.max_workers or in_use + job.task_bytes > self.memory_budget:
+                            ready.append(job)
+                            continue
+                        task = job.next_task()
+                        if task is None:
+                            if job.in_flight == 0:
+                                job.finish()
+                            continue
+
+                        now = time.perf_counter()
+                        memory_time += in_use * (now - last_change)
+                        last_change = now
+                        job.queue_time += now - job._ready_time
+                        job._ready_time = now
+                        job.tasks += 1
+                        job.in_flight += 1
+                        running[executor.submit(task[0], *task[1])] = job
+                        in_use += job.task_bytes
+                        peak = max(peak, in_use)
+                        ready.append(job)
+                        submitted = True
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                now = time.perf_counter()
+                memory_time += in_use * (now - last_change)
+                last_change = now
+                for future in done:
+                    job = running.pop(future)
+                    in_use -= job.task_bytes
+                    job.in_flight -= 1
+                    if job.error is None:
+                        try:
+                            job.task_done(future.result())
+                        except Exception as e:
+                            job.fail(e)
+                    if job.exhausted and job.in_flight == 0 and job not in ready:
+                        job.finish()
+
+        wall_time = time.perf_counter() - start
+        busy_time = sum(job.run_time for job in self.jobs)
+        return {
+            "success": all(job.success for job in self.jobs),
+            "jobs": {job.path: job.as_dict() for job in self.jobs},
+            "wall_time": wall_time,
+            "memory_budget": self.memory_budget,
+            "peak_estimated_bytes": peak,
+            "memory_utilisation": memory_time / (wall_time * self.memory_budget) if wall_time else 0.0,
+            "worker_utilisation": busy_time / (wall_time * self.max_workers) if wall_time else 0.0,
+            "total_queue_time": sum(job.queue_time for job in self.jobs),
+        }
+
+
+def lint_files_within_budget(files, memory_budget, max_workers=None, max_task_bytes=None):
+    """
+    Lint many files concurrently within memory_budget bytes.  files is an iterable of
+    (path, meta_data) pairs.  Returns the MemoryBudgetScheduler's report
+    """
+    scheduler = MemoryBudgetScheduler(memory_budget, max_workers, max_task_bytes)
+    for path, meta_data in files:
+        scheduler.add(path, meta_data)
+    return scheduler.run()
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.sketches
+~~~~~~~~~~~~~~~
+This module contains compact, mergeable summaries (sketches) of column values.
+Sketches built on separate chunks or files can be merged to give the sketch of the
+combined data, which means large tables can be summarised in parallel and in bounded memory
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+
+def _bit_length(x):
+    """
+    Vectorised equivalent of int.bit_length for an array of uint64
+    """
+    x = x.copy()
+    n = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        s = np.uint64(shift)
+        big = x >= (np.uint64(1) << s)
+        n[big] += shift
+        x[big] >>= s
+    n += (x > 0)
+    return n
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct values seen, using 2**precision bytes of memory.
+    The standard error of the estimate is roughly 1.04 / sqrt(2**precision)
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series):
+        """
+        Add the values in the pandas series to the sketch
+        """
+        if len(series) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(series, index=False).values
+        p = self.precision
+
+        idx = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes << np.uint64(p)
+        rank = np.minimum(64 - _bit_length(rest) + 1, 64 - p + 1)
+
+        np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+
+        # Small range correction
+        zeros = int(np.sum(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+
+        return int(round(estimate))
+
+    def to_dict(self):
+        registers = base64.b64encode(self.registers.tobytes()).decode("ascii")
+        return {"precision": self.precision, "registers": registers}
+
+    @classmethod
+    def from_dict(cls, d):
+        hll = cls(d["precision"])
+        hll.registers = np.frombuffer(base64.b64decode(d["registers"]), dtype=np.uint8).copy()
+        return hll
+
+
+class QuantileSketch:
+    """
+    Estimates quantiles of numeric values, in the style of a KLL sketch.
+
+    Values are kept in levels, where each value at level i stands for 2**i of the original values.
+    When a level holds more than k values, it is sorted and every other value (starting at random)
+    is promoted to the next level.  Memory is about k * log2(n / k) values, and the rank error
+    of a quantile is a small multiple of 1 / k
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._random = np.random.RandomState(seed)
+
+    def update(self, values):
+        """
+        Add the values in the numeric array values to the sketch, ignoring NaNs
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd value out stays at this level, so no weight is lost
+                keep = len(items) % 2
+                self.levels[level] = items[len(items) - keep:]
+                promoted = items[:len(items) - keep][self._random.randint(2)::2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        merged = QuantileSketch(max(self.k, other.k))
+        merged.count = self.count + other.count
+        n_levels = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([s.levels[i] for s in [self, other] if i < len(s.levels)])
+            for i in range(n_levels)
+        ]
+        merged._compact()
+        return merged
+
+    def quantiles(self, qs):
+        """
+        Return the estimated value at each quantile in qs (numbers between 0 and 1),
+        or None for each if no values have been seen
+        """
+        if self.count == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1])
+        return items[np.minimum(positions, len(items) - 1)].tolist()
+
+    def to_dict(self):
+        return {"k": self.k, "count": self.count, "levels": [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(d["k"])
+        sketch.count = d["count"]
+        sketch.levels = [np.array(level, dtype=np.float64) for level in d["levels"]]
+        return sketch
+
+
+class TopValues:
+    """
+    Tracks the most frequent values with a Misra-Gries summary of at most k counters.
+    A value's count is underestimated by at most (values seen) / (k + 1), so any value which
+    makes up more than that fraction of the values is kept.  Values are kept as strings
+    """
+
+    def __init__(self, k=20):
+        self.k = k
+        self.total = 0
+        self.counts = {}
+
+    def _reduce(self, counts):
+        # Subtract the (k + 1)th largest count, keeping at most k positive counts
+        if len(counts) <= self.k:
+            return counts
+        counts = counts.sort_values(ascending=False, kind="mergesort")
+        return (counts.iloc[:self.k] - counts.iloc[self.k])[lambda c: c > 0]
+
+    def update(self, series):
+        """
+        Add the non-null values in the pandas series to the summary
+        """
+        values = series.dropna()
+        self.total += len(values)
+        batch = self._reduce(values.astype(str).value_counts())
+        current = pd.Series(self.counts, dtype=np.int64)
+        combined = current.add(batch, fill_value=0).astype(np.int64)
+        self.counts = {str(v): int(c) for v, c in self._reduce(combined).items()}
+
+    def merge(self, other):
+        merged = TopValues(max(self.k, other.k))
+        merged.total = self.total + other.total
+        combined = pd.Series(self.counts, dtype=np.int64).add(
+            pd.Series(other.counts, dtype=np.int64), fill_value=0).astype(np.int64)
+        merged.counts = {str(v): int(c) for v, c in merged._reduce(combined).items()}
+        return merged
+
+    def frequencies(self):
+        """
+        Return the estimated fraction of values which are each of the top values
+        """
+        if self.total == 0:
+            return {}
+        return {v: c / self.total for v, c in self.counts.items()}
+
+    def to_dict(self):
+        return {"k": self.k, "total": self.total, "counts": dict(self.counts)}
+
+    @classmethod
+    def from_dict(cls, d):
+        top = cls(d["k"])
+        top.total = d["total"]
+        top.counts = dict(d["counts"])
+        return top
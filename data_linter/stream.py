@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.stream
+~~~~~~~~~~~~~~~
+This module contains StreamLinter, a long-lived validator for data that arrives as a
+stream of small batches (e.g. JSONL micro-batches).
+The metadata is validated and the checks are prepared once, so the cost of each batch
+is just the vectorised checks themselves.  Results are kept as running counts plus a
+bounded sample of failures, so memory does not grow with the length of the stream
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_linter.checks import failure_mask, get_column_checks
+from data_linter.lint import validate_meta_data
+
+
+class CheckCounter:
+    """
+    Running totals for a single check on a single column
+    """
+
+    def __init__(self, max_failure_samples):
+        self.max_failure_samples = max_failure_samples
+        self.element_count = 0
+        self.missing_count = 0
+        self.unexpected_count = 0
+        self.unexpected_list = []
+        self.unexpected_index_list = []
+
+    def update(self, series, failures, row_offset):
+        self.element_count += len(series)
+        self.missing_count += int(series.isnull().sum())
+
+        positions = np.flatnonzero(failures.values)
+        self.unexpected_count += len(positions)
+
+        space = self.max_failure_samples - len(self.unexpected_list)
+        if space > 0 and len(positions) > 0:
+            positions = positions[:space]
+            self.unexpected_list.extend(series.iloc[positions].tolist())
+            self.unexpected_index_list.extend((positions + row_offset).tolist())
+
+    def merge(self, other):
+        """
+        Add the totals of other, keeping the failure samples with the smallest row numbers
+        """
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        self.unexpected_count += other.unexpected_count
+        samples = sorted(zip(self.unexpected_index_list + other.unexpected_index_list,
+                             self.unexpected_list + other.unexpected_list), key=lambda s: s[0])
+        samples = samples[:self.max_failure_samples]
+        self.unexpected_index_list = [index for index, _ in samples]
+        self.unexpected_list = [value for _, value in samples]
+
+    def as_dict(self):
+        non_missing = self.element_count - self.missing_count
+        unexpected_percent = 100 * self.unexpected_count / non_missing if non_missing else 0.0
+        return {
+            "success": self.unexpected_count == 0,
+            "result": {
+                "element_count": self.element_count,
+                "missing_count": self.missing_count,
+                "unexpected_count": self.unexpected_count,
+                "unexpected_percent": unexpected_percent,
+                "unexpected_list": list(self.unexpected_list),
+                "unexpected_index_list": list(self.unexpected_index_list),
+            },
+            "exception_info": None
+        }
+
+
+class ColumnOrderCounter:
+    """
+    Running totals for check_column_exists_and_order on a single column
+    """
+
+    def __init__(self, expected_pos):
+        self.expected_pos = expected_pos
+        self.batches_missing = 0
+        self.batches_out_of_order = 0
+
+    def update(self, actual_pos):
+        if actual_pos is None:
+            self.batches_missing += 1
+        elif actual_pos != self.expected_pos:
+            self.batches_out_of_order += 1
+
+    def merge(self, other):
+        self.batches_missing += other.batches_missing
+        self.batches_out_of_order += other.batches_out_of_order
+
+    def as_dict(self):
+        return {
+            "success": self.batches_missing == 0 and self.batches_out_of_order == 0,
+            "result": {
+                "expected_pos": self.expected_pos,
+                "batches_missing": self.batches_missing,
+                "batches_out_of_order": self.batches_out_of_order,
+            },
+            "exception_info": None
+        }
+
+
+class StreamLinter:
+    """
+    Takes a table meta data object, and checks successive batches of records against it
+    with feed(batch).  A report of everything seen so far is available at any time from snapshot()
+    """
+
+    def __init__(self, meta_data, max_failure_samples=10, verdict_cache=None):
+
+        validate_meta_data(meta_data)
+        self.meta_data = meta_data
+        self.meta_cols = meta_data["columns"]
+        self.max_failure_samples = max_failure_samples
+        self.verdict_cache = None if verdict_cache is None else verdict_cache.view()
+
+        self.row_count = 0
+        self.batch_count = 0
+
+        self._checks = []
+        self._counters = {}
+        for pos, col in enumerate(self.meta_cols):
+            counters = {"check_column_exists_and_order": ColumnOrderCounter(pos)}
+            for check_name in get_column_checks(col):
+                counters[check_name] = CheckCounter(max_failure_samples)
+                self._checks.append((col, check_name))
+            self._counters[col["name"]] = counters
+
+    def feed(self, batch, row_offset=None):
+        """
+        Check a batch of records, which may be a pandas dataframe or a list of dicts
+        (e.g. parsed JSONL lines).  Failures are numbered from row_offset, by default the
+        number of rows fed so far
+        """
+        if row_offset is None:
+            row_offset = self.row_count
+        if not isinstance(batch, pd.DataFrame):
+            batch = pd.DataFrame.from_records(batch)
+
+        df_cols = {c: i for i, c in enumerate(batch.columns)}
+        for col in self.meta_cols:
+            self._counters[col["name"]]["check_column_exists_and_order"].update(df_cols.get(col["name"]))
+
+        for col, check_name in self._checks:
+            if col["name"] not in df_cols:
+                continue
+            series = batch[col["name"]]
+            failures = failure_mask(check_name, series, col, self.verdict_cache)
+            self._counters[col["name"]][check_name].update(series, failures, row_offset)
+
+        self.row_count += len(batch)
+        self.batch_count += 1
+
+    def merge(self, other):
+        """
+        Add the results of other, a StreamLinter with the same metadata which has checked
+        other batches (e.g. in another process)
+        """
+        for name, counters in other._counters.items():
+            for check_name, counter in counters.items():
+                self._counters[name][check_name].merge(counter)
+        self.row_count += other.row_count
+        self.batch_count += other.batch_count
+
+    def snapshot(self):
+        """
+        Return the results so far, in the same format as ValidationLog.as_dict.  The one difference
+        is that the results of check_column_exists_and_order are counts over the batches - the
+        column's expected_pos, and batches_missing and batches_out_of_order, the number of batches
+        in which it was missing or in another position
+        """
+        return {name: {check_name: counter.as_dict() for check_name, counter in counters.items()}
+                for name, counters in self._counters.items()}
+
+    def verdict_cache_stats(self):
+        return None if self.verdict_cache is None else self.verdict_cache.stats.as_dict()
+
+    def success(self):
+        if self.batch_count == 0:
+            raise Exception("No batches have been fed to the linter yet.")
+        return all(entry["success"]
+                   for entries in self.snapshot().values()
+                   for entry in entries.values())
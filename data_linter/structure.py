@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.structure
+~~~~~~~~~~~~~~~
+This module contains StructureLinter, which checks the shape of a data file - which columns
+exist, their order and (for typed formats) their types - without reading any data rows.
+It is cheap enough to run before a full lint, so that a wrongly shaped file is rejected
+before any time is spent reading it
+"""
+
+import pandas as pd
+
+from data_linter.checks import _comparable_values, get_range_bounds
+from data_linter.lint import Linter
+from data_linter.read_data import get_file_format, read_parquet_statistics, read_schema
+from data_linter.validation_log import ValidationLog
+
+
+def _arrow_type_matches(arrow_type, meta_type):
+    import pyarrow as pa
+
+    if meta_type in ["int", "long"]:
+        return pa.types.is_integer(arrow_type)
+    if meta_type in ["float", "double"]:
+        return pa.types.is_floating(arrow_type)
+    if meta_type == "boolean":
+        return pa.types.is_boolean(arrow_type)
+    if meta_type in ["date", "datetime"]:
+        return pa.types.is_date(arrow_type) or pa.types.is_timestamp(arrow_type)
+    return pa.types.is_string(arrow_type)
+
+
+# Dates have no json type, so are expected to be strings.  Integers are valid floats
+_JSON_TYPES = {
+    "int": [int],
+    "long": [int],
+    "float": [int, float],
+    "double": [int, float],
+    "boolean": [bool],
+    "date": [str],
+    "datetime": [str],
+    "character": [str],
+}
+
+
+def _json_type_matches(python_type, meta_type):
+    if python_type is type(None):
+        # A null in the first record tells us nothing about the type
+        return True
+    return python_type in _JSON_TYPES[meta_type]
+
+
+class StructureLinter(Linter):
+    """
+    Takes the path to a data file and a table meta data object and checks the structure of the
+    file against the meta data, reading only the csv header, the first jsonl record or the parquet footer.
+
+    check_column_exists_and_order behaves as for Linter.  check_types compares the types in the file
+    with the metadata for typed formats (parquet, and jsonl from the first record), and does nothing for csv.
+    For parquet, check_range uses the min and max statistics in the footer.
+    Checks which need the data (nulls, pattern, enums, length, unique) do nothing
+    """
+
+    def __init__(self, path, meta_data, file_format=None):
+
+        self.meta_data = meta_data
+        self.validate_meta_data()
+        self.meta_cols = meta_data["columns"]
+
+        self.path = path
+        self.file_format = file_format or get_file_format(path)
+
+        schema = read_schema(path, self.file_format)
+        self.file_types = dict(schema)
+
+        # An empty frame with the file's columns, so the log can be presented as for Linter
+        self.df_ge = pd.DataFrame(columns=[name for name, _ in schema])
+        self.vlog = ValidationLog(self)
+
+    def check_nulls(self, columns=None):
+        pass
+
+    def check_pattern(self, columns=None):
+        pass
+
+    def check_enums(self, columns=None):
+        pass
+
+    def check_unique(self, columns=None):
+        pass
+
+    def check_length(self, columns=None):
+        pass
+
+    def check_range(self, columns=None):
+        """
+        For parquet, test the minimum and maximum against the row group statistics in the footer.
+        Columns without statistics are not checked
+        """
+        if self.file_format != "parquet":
+            return
+
+        test_name = "check_range"
+        statistics = read_parquet_statistics(self.path)
+
+        for col in self._get_meta_cols(columns):
+            if "minimum" not in col and "maximum" not in col:
+                continue
+            stats = statistics.get(col["name"])
+            if stats is None or stats["min"] is None:
+                continue
+
+            minimum, maximum = get_range_bounds(col)
+            # The statistics have the file's type (e.g. strings, or dates rather than timestamps),
+            # so are converted to the column's type as the values are in Linter.check_range
+            observed_min, observed_max = _comparable_values(pd.Series([stats["min"], stats["max"]]), col["type"])
+
+            le = self.vlog[col["name"]][test_name]
+            le.set_result_key("observed_min", stats["min"])
+            le.set_result_key("observed_max", stats["max"])
+            # No rows are read, so none can be shown
+            le.set_result_key("unexpected_list", [])
+            le.set_result_key("unexpected_index_list", [])
+            try:
+                if pd.isnull(observed_min) or pd.isnull(observed_max):
+                    raise TypeError(f"statistics {stats['min']!r} and {stats['max']!r} are not {col['type']}s")
+                below = minimum is not None and observed_min < minimum
+                above = maximum is not None and observed_max > maximum
+            except TypeError as e:
+                le.set_exception_info_key("raised_exception", True)
+                le.set_exception_info_key("exception_message", f"Cannot compare with the range of {col['name']}: {e}")
+                le.success = False
+                continue
+            le.success = not (below or above)
+
+    def check_types(self, columns=None):
+        test_name = "check_data_type"
+
+        if self.file_format == "parquet":
+            type_matches = _arrow_type_matches
+        elif self.file_format == "jsonl":
+            type_matches = _json_type_matches
+        else:
+            return
+
+        for col in self._get_meta_cols(columns):
+            if col["name"] not in self.file_types:
+                continue
+
+            file_type = self.file_types[col["name"]]
+            le = self.vlog[col["name"]][test_name]
+            le.set_result_key("expected_type", col["type"])
+            le.set_result_key("observed_value", getattr(file_type, "__name__", str(file_type)))
+            le.success = type_matches(file_type, col["type"])
+
+
+def lint_structure(path, meta_data, file_format=None):
+    """
+    Check the structure of the file at path against meta_data without reading any data rows
+    """
+    linter = StructureLinter(path, meta_data, file_format)
+    linter.check_all()
+    return linter
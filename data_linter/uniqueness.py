@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.uniqueness
+~~~~~~~~~~~~~~~
+This module contains functions that find duplicated keys (a single column, or a composite
+primary key) in data which may be spread across many chunks and files.
+
+Each key is reduced to a pair of independent 64 bit hashes, so the chance of two different keys
+being treated as the same is negligible.  Hashes are held in memory until a memory budget is
+reached, after which they are spilled to local disk, partitioned by hash, so that each partition
+can be checked for duplicates on its own
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data_linter.impose_data_types import impose_metadata_types_on_pd_df
+from data_linter.read_data import iter_chunks
+
+ROW_DTYPE = np.dtype([("h1", np.uint64), ("h2", np.uint64), ("row", np.int64)])
+
+# Must be 16 characters.  Differs from pandas' default key so the two hashes are independent
+_SECOND_HASH_KEY = "5a9c3e1f7b2d4086"
+
+
+def hash_keys(keys):
+    """
+    Return two independent arrays of 64 bit hashes of the rows of the dataframe keys
+    """
+    h1 = pd.util.hash_pandas_object(keys, index=False).values
+    h2 = pd.util.hash_pandas_object(keys, index=False, hash_key=_SECOND_HASH_KEY).values
+    return h1, h2
+
+
+def typed_keys(keys, meta_data):
+    """
+    Return the dataframe keys with the types in meta_data imposed on its columns, so the same key
+    hashes the same however it was read (e.g. "1" from a csv file and 1 from a parquet file)
+    """
+    if meta_data is None:
+        return keys
+    return impose_metadata_types_on_pd_df(keys, meta_data)
+
+
+def hash_rows(keys, row_ids):
+    """
+    Return the rows of the dataframe keys as an array of ROW_DTYPE, identified by row_ids
+    """
+    rows = np.empty(len(keys), dtype=ROW_DTYPE)
+    rows["h1"], rows["h2"] = hash_keys(keys)
+    rows["row"] = row_ids
+    return rows
+
+
+class DuplicateFinder:
+    """
+    Finds duplicate keys across a sequence of calls to update.
+
+    memory_budget is the number of bytes of hashes (24 per row) to hold in memory before spilling
+    to num_partitions files in a temporary directory (within tmpdir if given).  A partition needs
+    to fit in memory when it is checked, so num_partitions should be increased for very large data
+    """
+
+    def __init__(self, memory_budget=256 * 1024 ** 2, num_partitions=64, max_samples=20, tmpdir=None):
+        self.memory_budget = memory_budget
+        self.num_partitions = num_partitions
+        self.max_samples = max_samples
+        self.tmpdir = tmpdir
+
+        self._buffers = []
+        self._buffered_bytes = 0
+        self._spill_dir = None
+
+    def update(self, keys, row_ids):
+        """
+        Add the rows of the dataframe keys, which are identified in the results by row_ids
+        """
+        self.update_hashes(hash_rows(keys, row_ids))
+
+    def update_hashes(self, rows):
+        """
+        Add rows which have already been hashed by hash_rows (e.g. in another process)
+        """
+        self._buffers.append(rows)
+        self._buffered_bytes += rows.nbytes
+        if self._buffered_bytes > self.memory_budget:
+            self._spill()
+
+    def _partition_path(self, partition):
+        return os.path.join(self._spill_dir, f"partition_{partition}.bin")
+
+    def _spill(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="data_linter_unique_", dir=self.tmpdir)
+
+        rows = np.concatenate(self._buffers) if self._buffers else np.empty(0, dtype=ROW_DTYPE)
+        self._buffers = []
+        self._buffered_bytes = 0
+
+        partitions = rows["h1"] % np.uint64(self.num_partitions)
+        order = np.argsort(partitions, kind="stable")
+        rows, partitions = rows[order], partitions[order]
+        bounds = np.searchsorted(partitions, np.arange(self.num_partitions + 1, dtype=np.uint64))
+
+        for p in range(self.num_partitions):
+            lo, hi = bounds[p], bounds[p + 1]
+            if hi > lo:
+                with open(self._partition_path(p), "ab") as f:
+                    rows[lo:hi].tofile(f)
+
+    def _iter_partitions(self):
+        if self._spill_dir is None:
+            if self._buffers:
+                yield np.concatenate(self._buffers)
+            return
+
+        self._spill()
+        for p in range(self.num_partitions):
+            path = self._partition_path(p)
+            if os.path.exists(path):
+                yield np.fromfile(path, dtype=ROW_DTYPE)
+
+    def _find_duplicates(self, rows, result):
+        rows = rows[np.lexsort((rows["row"], rows["h2"], rows["h1"]))]
+        same_as_previous = (rows["h1"][1:] == rows["h1"][:-1]) & (rows["h2"][1:] == rows["h2"][:-1])
+
+        is_duplicate = np.zeros(len(rows), dtype=bool)
+        is_duplicate[1:] |= same_as_previous
+        is_duplicate[:-1] |= same_as_previous
+        group_starts = np.flatnonzero(is_duplicate & ~np.concatenate([[False], same_as_previous]))
+
+        result["duplicate_row_count"] += int(is_duplicate.sum())
+        result["duplicate_key_count"] += len(group_starts)
+
+        # Sample the duplicates which first appear earliest, so the sample doesn't depend on partitioning
+        first_rows = rows["row"][group_starts]
+        samples = []
+        for start in group_starts[np.argsort(first_rows, kind="stable")[:self.max_samples]]:
+            end = start + 1
+            while end < len(rows) and same_as_previous[end - 1]:
+                end += 1
+            samples.append(rows["row"][start:end].tolist())
+        result["samples"] = sorted(result["samples"] + samples)[:self.max_samples]
+
+    def finish(self):
+        """
+        Return the number of rows whose key is duplicated, the number of duplicated keys,
+        and up to max_samples lists of the row_ids which share a key (those whose first row_id is smallest)
+        """
+        result = {"duplicate_row_count": 0, "duplicate_key_count": 0, "samples": []}
+        try:
+            for rows in self._iter_partitions():
+                self._find_duplicates(rows, result)
+        finally:
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+            self._buffers = []
+            self._buffered_bytes = 0
+
+        return result
+
+
+def find_duplicates_in_df(df, key_columns, max_samples=20, memory_budget=256 * 1024 ** 2):
+    """
+    Check that the combination of values in key_columns is unique in the dataframe df, ignoring
+    rows with a null in any key column.  Returns the result in the same format as great_expectations
+    with the duplicated values and their index labels in unexpected_list and unexpected_index_list
+    """
+    keys = df[key_columns]
+    notnull = keys.notnull().all(axis=1).values
+
+    finder = DuplicateFinder(memory_budget=memory_budget, max_samples=max_samples)
+    finder.update(keys[notnull], np.flatnonzero(notnull))
+    duplicates = finder.finish()
+
+    unexpected_index_list = []
+    unexpected_list = []
+    for positions in duplicates["samples"]:
+        for position in positions:
+            unexpected_index_list.append(df.index[position])
+            values = keys.iloc[position].tolist()
+            unexpected_list.append(values[0] if len(key_columns) == 1 else tuple(values))
+
+    return {
+        "success": duplicates["duplicate_row_count"] == 0,
+        "result": {
+            "element_count": len(df),
+            "missing_count": int((~notnull).sum()),
+            "unexpected_count": duplicates["duplicate_row_count"],
+            "duplicate_key_count": duplicates["duplicate_key_count"],
+            "unexpected_list": unexpected_list,
+            "unexpected_index_list": unexpected_index_list,
+        }
+    }
+
+
+def find_duplicates_in_files(paths, key_columns, chunksize=100000, file_format=None,
+                             max_samples=20, memory_budget=256 * 1024 ** 2, tmpdir=None, meta_data=None):
+    """
+    Find duplicate keys across all of the files in paths, reading only key_columns, chunksize rows
+    at a time.  Rows with a null in any key column are ignored.
+
+    If meta_data is provided, its types are imposed on the key columns before they are compared,
+    so files of different formats can be checked together.  Otherwise keys are compared as they are read.
+
+    Returns the counts of duplicated rows and keys, and samples of duplicates as lists of
+    (path, row number) pairs
+    """
+    paths = list(paths)
+    finder = DuplicateFinder(memory_budget=memory_budget, max_samples=max_samples, tmpdir=tmpdir)
+    file_starts = []
+    offset = 0
+    for path in paths:
+        file_starts.append(offset)
+        for chunk in iter_chunks(path, chunksize=chunksize, file_format=file_format, columns=key_columns):
+            keys = chunk[key_columns]
+            notnull = keys.notnull().all(axis=1).values
+            finder.update(typed_keys(keys[notnull], meta_data), offset + np.flatnonzero(notnull))
+            offset += len(chunk)
+
+    result = finder.finish()
+    file_starts = np.array(file_starts)
+    samples = []
+    for row_ids in result["samples"]:
+        file_indices = np.searchsorted(file_starts, row_ids, side="right") - 1
+        samples.append([(paths[f], row_id - int(file_starts[f])) for f, row_id in zip(file_indices, row_ids)])
+    result["samples"] = samples
+    return result
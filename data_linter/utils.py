@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from functools import lru_cache
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def read_package_json(rel_path):
+    """
+    Load a json file shipped with the package e.g. "data/type_conversion.json".
+    The result is cached, so must not be modified
+    """
+    with open(os.path.join(_PACKAGE_DIR, rel_path), encoding="utf-8") as f:
+        return json.load(f)
@@ -4,10 +4,15 @@ import pandas as pd
 import numpy as np
 from tabulate import tabulate
 import json
+from functools import lru_cache
 
-from jinja2 import Environment, PackageLoader
-jinja_env = Environment(loader=PackageLoader(
-    'data_linter', 'templates'), trim_blocks=True, lstrip_blocks=True)
+
+@lru_cache(maxsize=None)
+def get_jinja_env():
+    # Only built when a report is rendered, as importing jinja2 and loading templates is slow
+    from jinja2 import Environment, PackageLoader
+    return Environment(loader=PackageLoader(
+        'data_linter', 'templates'), trim_blocks=True, lstrip_blocks=True)
 
 class ValidationLog:
     """
@@ -64,7 +69,13 @@ class ValidationLog:
         df = df.sort_values(["success", "col_name", "validation_description"])
         df["success"] = np.where(df["success"], "✅", "❌")
 
-        return df.pipe(tabulate, headers='keys', tablefmt='pipe', showindex=False)
+        md = df.pipe(tabulate, headers='keys', tablefmt='pipe', showindex=False)
+
+        stats = self.linter.verdict_cache_stats()
+        if stats is not None:
+            md += (f"\n\nVerdict cache: {stats['hits']} hits, {stats['misses']} misses "
+                   f"({stats['hit_rate']:.1%} hit rate)")
+        return md
 
     def as_detailed_markdown(self):
 
@@ -91,7 +102,7 @@ class ValidationLog:
             "success": self.success(),
             "dataset_name": self.linter.meta_data.get("name", None)
         }
-        template = jinja_env.get_template('validationlog_detailed.j2')
+        template = get_jinja_env().get_template('validationlog_detailed.j2')
         return template.render(jinja_data)
 
     def _repr_markdown_(self):
@@ -164,7 +175,7 @@ class ColumnLogEntries:
             "col_name": self.col_name,
             "metadata": json.dumps(self.meta_lookup[self.col_name])
         }
-        template = jinja_env.get_template('logentries_detailed.j2')
+        template = get_jinja_env().get_template('logentries_detailed.j2')
         return template.render(jinja_data)
 
 
@@ -292,7 +303,7 @@ class LogEntry:
                 jinja_data["unexpected_data"] = unexpected_data
 
 
-            template = jinja_env.get_template('logentry_detailed.j2')
+            template = get_jinja_env().get_template('logentry_detailed.j2')
             return template.render(jinja_data)
 
         if self.validation_description == "check_column_exists_and_order":
@@ -307,15 +318,15 @@ class LogEntry:
             jinja_data["expected_pos"] = self.result["expected_pos"] + 1 # Zero indexed in data
 
 
-            template = jinja_env.get_template('logentry_detailed_column_exists_and_order.j2')
+            template = get_jinja_env().get_template('logentry_detailed_column_exists_and_order.j2')
             return template.render(jinja_data)
 
         if self.validation_description == "check_data_type":
-            template = jinja_env.get_template(
+            template = get_jinja_env().get_template(
                 'logentry_detailed_data_type.j2')
             return template.render(jinja_data)
 
-        template = jinja_env.get_template('logentry_detailed.j2')
+        template = get_jinja_env().get_template('logentry_detailed.j2')
         return template.render(jinja_data)
 
 
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+data_linter.verdict_cache
+~~~~~~~~~~~~~~~
+This module contains VerdictCache, an optional on-disk cache of the results of evaluating
+individual values - whether a string matches a pattern, whether it can be converted to a type,
+and what datetime it parses to.
+
+Data often repeats the same distinct strings from one run to the next, so with a cache only
+values which haven't been seen before are evaluated.  The cache is a sqlite database keyed by
+(kind, key, value) - e.g. ("pattern", "^[a-z]+$", "abc") - and the least recently used entries
+are evicted once it holds more than max_entries
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    result INTEGER,
+    last_used INTEGER NOT NULL,
+    UNIQUE (kind, key, value)
+);
+CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used);
+"""
+
+
+class CacheStats:
+    """
+    Counts of distinct values found in (hits) and missing from (misses) a VerdictCache
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "miss_rate": self.misses / lookups if lookups else 0.0,
+        }
+
+
+class VerdictCache:
+    """
+    A cache of per-value results stored in the sqlite database at path, which is created
+    if it doesn't exist (":memory:" gives a cache which only lasts as long as this object).
+    Can be shared between threads
+    """
+
+    def __init__(self, path, max_entries=1000000):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE lookup (value TEXT PRIMARY KEY)")
+        self._clock = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM verdicts").fetchone()[0]
+        # The number of entries is counted once, then kept up to date by store
+        self._count = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def lookup(self, kind, key, values):
+        """
+        Return a dict of the cached results for those of the (string) values which are in the
+        cache, and mark them as recently used
+        """
+        with self._lock, self._conn:
+            self._clock += 1
+            self._conn.execute("DELETE FROM lookup")
+            self._conn.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", ((v,) for v in values))
+            self._conn.execute(
+                "UPDATE verdicts SET last_used = ? WHERE kind = ? AND key = ? "
+                "AND value IN (SELECT value FROM lookup)", (self._clock, kind, key))
+            rows = self._conn.execute(
+                "SELECT v.value, v.result FROM verdicts v JOIN lookup l ON v.value = l.value "
+                "WHERE v.kind = ? AND v.key = ?", (kind, key)).fetchall()
+        return dict(rows)
+
+    def store(self, kind, key, results):
+        """
+        Add the results, a dict of {value: result}, to the cache, evicting the least
+        recently used entries if there are more than max_entries
+        """
+        with self._lock, self._conn:
+            self._clock += 1
+            # Inserting and then updating the values already present (which is rare, as only
+            # values missing from the cache are stored) counts how many entries were added
+            changes = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO verdicts (kind, key, value, result, last_used) VALUES (?, ?, ?, ?, ?)",
+                ((kind, key, value, result, self._clock) for value, result in results.items()))
+            added = self._conn.total_changes - changes
+            if added < len(results):
+                self._conn.executemany(
+                    "UPDATE verdicts SET result = ?, last_used = ? WHERE kind = ? AND key = ? AND value = ?",
+                    ((result, self._clock, kind, key, value) for value, result in results.items()))
+            self._count += added
+
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM verdicts WHERE rowid IN "
+                    "(SELECT rowid FROM verdicts ORDER BY last_used LIMIT ?)", (excess,))
+                self._count -= excess
+
+    def apply(self, kind, key, values, evaluate, stats=None):
+        """
+        Return evaluate(values) for the pandas series of strings values, evaluating only the
+        distinct values which aren't already in the cache.  evaluate must take and return a
+        series of integers (or bools, or nulls).  The number of distinct values found
+        and not found are added to the cache's stats, and to stats if provided
+        """
+        codes, distinct = pd.factorize(values.values)
+        cached = self.lookup(kind, key, distinct)
+        missing = [v for v in distinct if v not in cached]
+
+        if missing:
+            evaluated = evaluate(pd.Series(missing, dtype=object))
+            new = {v: (None if pd.isnull(r) else int(r)) for v, r in zip(missing, evaluated)}
+            self.store(kind, key, new)
+            cached.update(new)
+
+        for s in [self.stats, stats]:
+            if s is not None:
+                s.update(len(distinct) - len(missing), len(missing))
+
+        # Results are returned as python objects so large integers aren't rounded to floats
+        results = np.array([cached[v] for v in distinct], dtype=object)
+        return pd.Series(results[codes], index=values.index, dtype=object)
+
+    def view(self):
+        """
+        Return a VerdictCacheView of this cache, which keeps its own stats
+        """
+        return VerdictCacheView(self)
+
+
+class VerdictCacheView:
+    """
+    Shares a VerdictCache, but counts the hits and misses of its own lookups - so that,
+    for example, each Linter can report its own hit rate
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.stats = CacheStats()
+
+    def apply(self, kind, key, values, evaluate):
+        return self.cache.apply(kind, key, values, evaluate, stats=self.stats)
@@ -0,0 +1,53 @@
+"""
+Measure the throughput of enum membership checks at different enum sizes, comparing
+pd.Series.isin with a list (what great_expectations does) against data_linter.enums.EnumSet.
+
+Usage: python scripts/benchmark_enums.py [--rows N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_linter.enums import EnumSet
+
+ENUM_SIZES = [10, 1000, 50000, 500000]
+
+
+def best_time(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    print(f"{'kind':10} {'enum size':>10} {'strategy':>10} {'isin rows/s':>14} {'EnumSet rows/s':>15}")
+
+    for kind in ["int", "string"]:
+        for size in ENUM_SIZES:
+            enum = list(range(0, 2 * size, 2))
+            values = pd.Series(rng.randint(0, 2 * size, args.rows))
+            if kind == "string":
+                enum = [f"code_{v}" for v in enum]
+                values = "code_" + values.astype(str)
+
+            enum_set = EnumSet(enum)
+            isin_time = best_time(lambda: values.isin(enum))
+            enum_set_time = best_time(lambda: enum_set.contains(values))
+
+            print(f"{kind:10} {size:10d} {enum_set.strategy:>10} "
+                  f"{args.rows / isin_time:14,.0f} {args.rows / enum_set_time:15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
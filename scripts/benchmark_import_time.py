@@ -0,0 +1,64 @@
+"""
+Measure how long it takes to import the data_linter modules in a fresh interpreter,
+and which heavy dependencies each import pulls in.
+
+Usage: python scripts/benchmark_import_time.py [--repeat N] [--max-seconds S]
+Exits with a non-zero status if the median import time of any module exceeds --max-seconds
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "data_linter.lint",
+    "data_linter.validation_log",
+    "data_linter.impose_data_types",
+    "data_linter.generate_meta_data",
+    "data_linter.stream",
+    "data_linter.structure",
+]
+
+HEAVY_DEPENDENCIES = ["great_expectations", "jsonschema", "jinja2", "pkg_resources"]
+
+CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def time_import(module):
+    code = CODE.format(module=module, heavy=HEAVY_DEPENDENCIES)
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    too_slow = []
+    print(f"{'module':40} {'median (s)':>10}  heavy imports")
+    for module in MODULES:
+        results = [time_import(module) for _ in range(args.repeat)]
+        median = statistics.median(r["seconds"] for r in results)
+        heavy = ", ".join(results[0]["heavy"]) or "-"
+        print(f"{module:40} {median:10.3f}  {heavy}")
+        if args.max_seconds is not None and median > args.max_seconds:
+            too_slow.append(module)
+
+    if too_slow:
+        print(f"Import time exceeded {args.max_seconds}s for: {', '.join(too_slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the time and peak memory of lint_file on a csv file with pattern columns, with and
+without raw_pattern_scan.  Memory is the peak traced by tracemalloc, which includes numpy and
+pandas allocations but not the pages of the memory-mapped file.
+
+Usage: python scripts/benchmark_raw_scan.py [--rows N] [--failure-rate F]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_linter.lint import lint_file
+
+META_DATA = {
+    "columns": [
+        {"name": "id", "type": "int"},
+        {"name": "code", "type": "character", "pattern": "^[A-Z]{2}[0-9]{4}$"},
+        {"name": "postcode", "type": "character", "pattern": "^[A-Z]{1,2}[0-9][A-Z0-9]? ?[0-9][A-Z]{2}$"},
+    ]
+}
+
+
+def write_csv(path, rows, failure_rate, rng):
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+
+    def random_letters():
+        return pd.Series(letters[rng.randint(0, 26, rows)])
+
+    def random_digits(low, high):
+        return pd.Series(rng.randint(low, high, rows)).astype(str)
+
+    codes = random_letters() + random_letters() + random_digits(1000, 10000)
+    codes[rng.rand(rows) < failure_rate] = "bad"
+    postcodes = random_letters() + random_digits(1, 10) + " " + random_digits(1, 10) + "AB"
+    pd.DataFrame({"id": np.arange(rows), "code": codes, "postcode": postcodes}).to_csv(path, index=False)
+
+
+def measure(path, raw_pattern_scan):
+    tracemalloc.start()
+    start = time.perf_counter()
+    linter = lint_file(path, META_DATA, raw_pattern_scan=raw_pattern_scan)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, linter.success()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--failure-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "data.csv")
+        write_csv(path, args.rows, args.failure_rate, np.random.RandomState(0))
+        print(f"{args.rows:,d} rows, {os.path.getsize(path) / 1024 ** 2:,.0f} MB")
+        print(f"{'raw_pattern_scan':>16} {'seconds':>8} {'peak MB':>8} {'success':>8}")
+        for raw_pattern_scan in [False, True]:
+            elapsed, peak, success = measure(path, raw_pattern_scan)
+            print(f"{str(raw_pattern_scan):>16} {elapsed:8.2f} {peak / 1024 ** 2:8.0f} {str(success):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import unittest
+import asyncio
+import os
+import sys
+
+from data_linter.lint import Linter
+from data_linter.async_lint import alint_files
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import get_test_csv, read_json
+
+
+class TestAsyncLint(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_acheck_all_matches_check_all(self):
+
+        df = get_test_csv(cwd, "test_csv_data_invalid_enums")
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+
+        l = Linter(df, meta)
+        l.check_all()
+
+        events = []
+        al = Linter(df, meta)
+        self.loop.run_until_complete(al.acheck_all(progress=events.append))
+
+        self.assertDictEqual(al.vlog.as_dict(), l.vlog.as_dict())
+        self.assertEqual([e["col_name"] for e in events], ["myint", "mychar"])
+
+    def test_alint_files(self):
+
+        files = [
+            (os.path.join(cwd, "data", "test_csv_data_valid.csv"), read_json(cwd, "meta/test_meta_cols_valid.json")),
+            (os.path.join(cwd, "data", "test_csv_data_missing_col.csv"), read_json(cwd, "meta/test_meta_cols_valid.json")),
+            (os.path.join(cwd, "data", "does_not_exist.csv"), read_json(cwd, "meta/test_meta_cols_valid.json")),
+        ]
+
+        results = self.loop.run_until_complete(alint_files(files, timeout=60))
+
+        self.assertTrue(results[0].success())
+        self.assertFalse(results[1].success())
+        self.assertIsInstance(results[2], Exception)
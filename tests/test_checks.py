@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from parameterized import parameterized
+
+from data_linter.checks import (INT_MAX, LONG_MAX, get_range_bounds, parse_integer_column, parse_integer_strings,
+                                pattern_failures, range_failures, type_failures)
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import get_test_csv, read_json
+
+
+class TestRowChecks(unittest.TestCase):
+
+    @parameterized.expand(
+        [
+            ("int_without_null", []),
+            ("int_with_null", []),
+            ("int_with_long", [1]),
+            ("int_with_float", [1]),
+        ]
+    )
+    def test_type_failures_ints(self, col_name, expected_failures):
+
+        df = get_test_csv(cwd, "test_csv_data_ints")
+        meta = read_json(cwd, "meta/test_meta_cols_ints.json")
+        col = [c for c in meta["columns"] if c["name"] == col_name][0]
+
+        failures = type_failures(df[col_name], col)
+        self.assertEqual(list(df.index[failures]), expected_failures)
+
+    @parameterized.expand(
+        [
+            ("12", INT_MAX, 12, False),
+            (" -7 ", INT_MAX, -7, False),
+            ("+0042", INT_MAX, 42, False),
+            ("-0", INT_MAX, 0, False),
+            ("2147483647", INT_MAX, 2147483647, False),
+            ("-2147483648", INT_MAX, -2147483648, False),
+            ("2147483648", INT_MAX, 0, True),
+            ("9223372036854775807", LONG_MAX, 9223372036854775807, False),
+            ("-9223372036854775808", LONG_MAX, -9223372036854775808, False),
+            ("9223372036854775808", LONG_MAX, 0, True),
+            ("99999999999999999999", LONG_MAX, 0, True),
+            ("0000000000000000000000000000000000000001", LONG_MAX, 1, False),
+            ("1.0", LONG_MAX, 0, True),
+            ("1 2", LONG_MAX, 0, True),
+            ("+", LONG_MAX, 0, True),
+            ("", LONG_MAX, 0, True),
+            ("１２", LONG_MAX, 0, True),
+            ("abc", LONG_MAX, 0, True),
+        ]
+    )
+    def test_parse_integer_strings(self, value, limit, expected_value, expected_failure):
+        ints, failures = parse_integer_strings(np.array(["1", value, "3"], dtype=object), limit)
+
+        self.assertEqual(failures.tolist(), [False, expected_failure, False])
+        if not expected_failure:
+            self.assertEqual(ints.tolist(), [1, expected_value, 3])
+
+    def test_parse_integer_column(self):
+        series = pd.Series(["1", None, "3000000000", "x", "-4"], name="mylong")
+
+        converted, failures = parse_integer_column(series, "long")
+        self.assertEqual(str(converted.dtype), "Int64")
+        self.assertEqual(converted.isnull().tolist(), [False, True, False, True, False])
+        self.assertEqual(failures.tolist(), [False, False, False, True, False])
+
+        converted, failures = parse_integer_column(series, "int")
+        self.assertEqual(list(series.index[failures]), [2, 3])
+
+        converted, failures = parse_integer_column(pd.Series([1.0, np.nan, 2.5]), "int")
+        self.assertEqual(failures.tolist(), [False, False, True])
+        self.assertEqual(converted[0], 1)
+
+    @parameterized.expand(
+        [
+            (" 12\t", False),
+            ("\xa012", True),
+            ("12\u2003", True),
+        ]
+    )
+    def test_parse_integer_whitespace(self, value, expected_failure):
+
+        # Strings too long to parse with numpy must strip the same whitespace
+        for padding in [0, 40]:
+            padded = value + " " * padding
+            _, failures = parse_integer_strings(np.array([padded], dtype=object), LONG_MAX)
+            self.assertEqual(failures.tolist(), [expected_failure])
+
+    def test_parse_integer_column_float_overflow(self):
+        series = pd.Series([9223372036854775808.0, -9223372036854775808.0, 2147483648.0])
+
+        _, failures = parse_integer_column(series, "long")
+        self.assertEqual(failures.tolist(), [True, False, False])
+
+        _, failures = parse_integer_column(series, "int")
+        self.assertEqual(failures.tolist(), [True, True, True])
+
+    def test_long_range_bounds(self):
+        col = {"name": "mylong", "type": "long", "minimum": "-9007199254740993", "maximum": 9007199254740993}
+        minimum, maximum = get_range_bounds(col)
+        self.assertEqual((minimum, maximum), (-9007199254740993, 9007199254740993))
+
+        series = pd.Series(["9007199254740993", "9007199254740994", None])
+        self.assertEqual(range_failures(series, col).tolist(), [False, True, False])
+
+    @parameterized.expand(
+        [
+            ({"name": "a", "type": "int", "minimum": "one"},),
+            ({"name": "a", "type": "float", "maximum": "1.5x"},),
+            ({"name": "a", "type": "date", "minimum": "not a date"},),
+        ]
+    )
+    def test_invalid_range_bounds(self, col):
+        with self.assertRaisesRegex(ValueError, "of column a is not a valid"):
+            get_range_bounds(col)
+
+    def test_pattern_failures_not_stripped(self):
+        # As with great_expectations, whitespace is part of the value matched
+        series = pd.Series(["abc", " abc", "abc ", None])
+        failures = pattern_failures(series, {"name": "a", "type": "character", "pattern": "^[a-z]+$"})
+        self.assertEqual(failures.tolist(), [False, True, True, False])
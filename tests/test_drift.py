@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+from data_linter.drift import ColumnSketch, TableSketch, compare_sketches
+from data_linter.lint import Linter
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+META = {
+    "columns": [
+        {"name": "mychar", "type": "character", "nullable": True},
+        {"name": "myfloat", "type": "float"},
+    ]
+}
+
+
+def make_df(seed, char_weights=(0.5, 0.3, 0.2), null_rate=0.0, loc=0.0):
+    random = np.random.RandomState(seed)
+    n = 5000
+    chars = random.choice(["a", "b", "c"], size=n, p=char_weights).astype(object)
+    chars[random.rand(n) < null_rate] = None
+    return pd.DataFrame({"mychar": chars, "myfloat": random.normal(loc, 1, size=n).astype(str)})
+
+
+class TestDrift(unittest.TestCase):
+
+    def test_no_drift(self):
+        baseline = TableSketch(META)
+        baseline.update(make_df(1))
+        current = TableSketch(META)
+        current.update(make_df(2))
+
+        results = compare_sketches(baseline, current)
+        self.assertEqual(set(results["mychar"]), {
+            "check_drift_null_rate", "check_drift_distinct_count", "check_drift_top_values"})
+        self.assertEqual(set(results["myfloat"]), {
+            "check_drift_null_rate", "check_drift_distinct_count", "check_drift_quantiles"})
+        self.assertTrue(all(r["success"] for col in results.values() for r in col.values()))
+
+    def test_drift(self):
+        baseline = TableSketch(META)
+        baseline.update(make_df(1))
+        current = TableSketch(META)
+        current.update(make_df(2, char_weights=(0.1, 0.1, 0.8), null_rate=0.2, loc=1.0))
+
+        results = compare_sketches(baseline, current)
+        self.assertFalse(results["mychar"]["check_drift_null_rate"]["success"])
+        self.assertFalse(results["mychar"]["check_drift_top_values"]["success"])
+        self.assertFalse(results["myfloat"]["check_drift_quantiles"]["success"])
+
+        # Thresholds can be loosened for a single column
+        results = compare_sketches(baseline, current, {"columns": {"mychar": {"null_rate": 0.5}}})
+        self.assertTrue(results["mychar"]["check_drift_null_rate"]["success"])
+
+    def test_merge_column_sketches(self):
+        values = pd.Series(["1", "2", "2", None])
+        sketch = ColumnSketch({"name": "a", "type": "int"}, top_k=5)
+        sketch.update(values)
+
+        # A baseline saved when the column was a float has no top values
+        other = ColumnSketch({"name": "a", "type": "float"})
+        other.update(values)
+        other.quantiles = None
+
+        for merged in [sketch.merge(other), other.merge(sketch)]:
+            self.assertEqual(merged.row_count, 8)
+            self.assertIsNotNone(merged.quantiles)
+            self.assertIsNotNone(merged.top_values)
+        self.assertEqual(sketch.merge(other).top_k, 5)
+        self.assertEqual(sketch.merge(other).top_values.k, 5)
+
+    def test_linter_check_drift(self):
+        baseline_linter = Linter(make_df(1), META)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baseline.json")
+            baseline_linter.profile().save(path)
+
+            linter = Linter(make_df(2, char_weights=(0.1, 0.1, 0.8)), META)
+            linter.check_all()
+            linter.check_drift(path)
+
+        log = linter.vlog.as_dict()
+        self.assertTrue(log["mychar"]["check_drift_null_rate"]["success"])
+        self.assertFalse(log["mychar"]["check_drift_top_values"]["success"])
+        self.assertFalse(linter.success())
+        self.assertIn("check_drift_top_values", linter.markdown_report())
@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import tempfile
+
+from parameterized import parameterized
+
+from data_linter.lint import lint_file
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+try:
+    import duckdb
+    DUCKDB_INSTALLED = True
+except ImportError:
+    # CI installs the duckdb extra, so the tests mustn't be skipped there
+    if os.environ.get("REQUIRE_DUCKDB") == "true":
+        raise
+    DUCKDB_INSTALLED = False
+
+
+def _successes(linter):
+    return {(col_name, check_name): entry["success"]
+            for col_name, entries in linter.vlog.as_dict().items()
+            for check_name, entry in entries.items()}
+
+
+@unittest.skipUnless(DUCKDB_INSTALLED, "duckdb is not installed")
+class TestDuckDBLinter(unittest.TestCase):
+
+    @parameterized.expand(
+        [
+            ("test_csv_data_valid", "meta/test_meta_cols_valid.json"),
+            ("test_csv_data_missing_col", "meta/test_meta_cols_valid.json"),
+            ("test_csv_data_valid_wrong_order", "meta/test_meta_cols_valid.json"),
+            ("test_csv_data_invalid_enums", "meta/test_meta_cols_enums.json"),
+            ("test_csv_data_invalid_regex", "meta/test_meta_cols_regex.json"),
+            ("test_csv_data_ints", "meta/test_meta_cols_ints.json"),
+        ]
+    )
+    def test_results_match_pandas_backend(self, d, m):
+
+        path = os.path.join(cwd, "data", d + ".csv")
+        meta = read_json(cwd, m)
+
+        pandas_linter = lint_file(path, meta, backend="pandas")
+        duckdb_linter = lint_file(path, meta, backend="duckdb")
+
+        self.assertDictEqual(_successes(duckdb_linter), _successes(pandas_linter))
+
+    def test_failure_sample(self):
+
+        path = os.path.join(cwd, "data", "test_csv_data_invalid_enums.csv")
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+
+        l = lint_file(path, meta, backend="duckdb")
+        result = l.vlog["mychar"]["check_enums"].result
+
+        self.assertEqual(result["unexpected_count"], 1)
+        self.assertEqual(result["unexpected_list"], ["d"])
+        self.assertEqual(result["unexpected_index_list"], [2])
+
+        l.markdown_report()
+
+    def test_numeric_enums_and_long_ranges(self):
+
+        meta = {
+            "columns": [
+                {"name": "myint", "type": "int", "enum": [1, 2]},
+                {"name": "mylong", "type": "long", "maximum": 9007199254740993},
+            ]
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.csv")
+            with open(path, "w") as f:
+                f.write("myint,mylong\n01,9007199254740993\n2,9007199254740994\nx,1\n")
+
+            pandas_linter = lint_file(path, meta, backend="pandas")
+            duckdb_linter = lint_file(path, meta, backend="duckdb")
+
+        self.assertDictEqual(_successes(duckdb_linter), _successes(pandas_linter))
+        # "01" is the number 1, and "x" isn't in the enum
+        self.assertEqual(duckdb_linter.vlog["myint"]["check_enums"].result["unexpected_index_list"], [2])
+        # 2**53 + 1 is in range, but would be rounded as a double
+        self.assertEqual(duckdb_linter.vlog["mylong"]["check_range"].result["unexpected_index_list"], [1])
@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+from parameterized import parameterized
+
+from data_linter.encoding import EncodingError, invalid_utf8_mask, scan_file
+from data_linter.lint import lint_file
+from data_linter.read_data import iter_chunks
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+def write_bytes(tmpdir, data, name="data.csv"):
+    path = os.path.join(tmpdir, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class TestEncoding(unittest.TestCase):
+
+    @parameterized.expand([
+        (b"abc", []),
+        ("é✅🌈".encode("utf-8"), []),
+        (b"a\xffb", [1]),
+        (b"a\xc3", [1]),
+        (b"\xc3\x28", [0]),
+        (b"a\x80b", [1]),
+        (b"\xc0\xaf", [0, 1]),
+        (b"\xed\xa0\x80", [0]),
+        (b"\xe2\x82", [0]),
+    ])
+    def test_invalid_utf8_mask(self, data, expected):
+        arr = np.frombuffer(data, dtype=np.uint8)
+        self.assertEqual(np.flatnonzero(invalid_utf8_mask(arr)).tolist(), expected)
+
+    def test_valid_file(self):
+        path = os.path.join(cwd, "data", "test_csv_utf8_strings.csv")
+        report = scan_file(path)
+        self.assertTrue(report.success())
+        self.assertEqual(report.invalid_utf8_count, 0)
+
+    @parameterized.expand([(1024,), (4,)])
+    def test_invalid_file(self, block_size):
+        data = "a,b\n1,é\n2,x\xff\n3,y\x01\n".encode("utf-8").replace(b"\xc3\xbf", b"\xff")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, data)
+            report = scan_file(path, block_size=block_size)
+
+        self.assertFalse(report.success())
+        self.assertEqual(report.invalid_utf8, [{"offset": data.index(b"\xff"), "line": 3, "byte": 0xFF}])
+        self.assertEqual(report.control_characters, [{"offset": data.index(b"\x01"), "line": 4, "byte": 1}])
+        self.assertEqual(report.line_count, 4)
+
+    def test_lint_file_check_encoding(self):
+        meta = read_json(cwd, "meta/test_meta_cols_utf8_strings.json")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, b"ascii_strings,naughty_strings,utf8_strings\na,b,\xe9\n")
+            with self.assertRaises(EncodingError) as cm:
+                lint_file(path, meta, check_encoding=True)
+
+        self.assertEqual(cm.exception.report.invalid_utf8[0]["line"], 2)
+
+    def test_block_size_too_small(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, "é✅🌈".encode("utf-8"))
+            with self.assertRaises(ValueError):
+                scan_file(path, block_size=2)
+            self.assertTrue(scan_file(path, block_size=4).success())
+
+    def test_lint_file_control_characters(self):
+        meta = read_json(cwd, "meta/test_meta_cols_utf8_strings.json")
+        data = b"ascii_strings,naughty_strings,utf8_strings\na,b,c\nd,e\x01,f\ng,h,i\n"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, data)
+            linter = lint_file(path, meta, check_encoding=True)
+            expected = lint_file(path, meta)
+
+        self.assertFalse(linter.success())
+        result = linter.vlog["naughty_strings"]["check_control_characters"].result
+        self.assertEqual(result["unexpected_index_list"], [1])
+        self.assertEqual(result["unexpected_list"], ["e\x01"])
+        self.assertTrue(linter.vlog["ascii_strings"]["check_control_characters"].success)
+        # The scan doesn't change how the file is parsed
+        self.assertTrue(linter.df_ge.equals(expected.df_ge))
+
+    def test_chunk_offsets(self):
+        data = b'a,b\n1,"x\ny"\n2,z\n3,w\n4,v\n'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, data)
+            report = scan_file(path, chunksize=2, block_size=8)
+            chunks = list(iter_chunks(path, chunk_offsets=report.chunk_offsets))
+
+        self.assertEqual(report.chunk_offsets, [4, data.index(b"3,w")])
+        self.assertEqual([c["b"].tolist() for c in chunks], [["x\ny", "z"], ["w", "v"]])
+        self.assertEqual(chunks[1].index.tolist(), [2, 3])
+
+    def test_chunk_offsets_skip_blank_lines(self):
+        data = b'\na,b\r\n\r\n1,x\n\n2,y\n3,z\n'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, data)
+            for block_size in [4, 1024]:
+                report = scan_file(path, chunksize=2, block_size=block_size)
+                chunks = list(iter_chunks(path, chunk_offsets=report.chunk_offsets))
+
+                self.assertEqual(report.chunk_offsets, [data.index(b"\r\n\r\n") + 2, data.index(b"3,z")])
+                self.assertEqual([c["b"].tolist() for c in chunks], [["x", "y"], ["z"]])
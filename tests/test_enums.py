@@ -0,0 +1,66 @@
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from parameterized import parameterized
+
+from data_linter.enums import EnumSet, get_enum_set
+from data_linter.lint import Linter
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import get_test_csv, read_json
+
+
+class TestEnums(unittest.TestCase):
+
+    @parameterized.expand(
+        [
+            ("isin", list(range(0, 100, 2))),
+            ("sorted", list(range(0, 100000, 2))),
+            ("hashed", [str(i) for i in range(0, 100000, 2)]),
+        ]
+    )
+    def test_strategies_match_isin(self, strategy, enum):
+
+        enum_set = EnumSet(enum)
+        self.assertEqual(enum_set.strategy, strategy)
+
+        values = pd.Series(np.random.RandomState(0).randint(-10, 100010, 5000))
+        if isinstance(enum[0], str):
+            values = values.astype(str)
+
+        expected = values.isin(enum).values
+        np.testing.assert_array_equal(enum_set.contains(values), expected)
+
+    @parameterized.expand(
+        [
+            ("test_csv_data_invalid_enums", False),
+            ("test_csv_data_valid_enums", True),
+        ]
+    )
+    def test_enum_file(self, d, r):
+
+        df = get_test_csv(cwd, d)
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+        mychar = meta["columns"][1]
+        del mychar["enum"]
+        mychar["enum_file"] = os.path.join(cwd, "data", "test_enum_mychar.txt")
+
+        l = Linter(df, meta)
+        l.check_enums()
+        self.assertEqual(l.vlog["mychar"]["check_enums"].success, r)
+
+    def test_enum_set_cached(self):
+
+        col = {"name": "a", "type": "character", "enum": [str(i) for i in range(2000)]}
+        enum_set = get_enum_set(col)
+        self.assertIs(get_enum_set(dict(col, enum=list(col["enum"]))), enum_set)
+
+        # Changing the enum in place gives a new set
+        col["enum"].append("x")
+        self.assertIsNot(get_enum_set(col), enum_set)
+        self.assertTrue(get_enum_set(col).contains(pd.Series(["x"]))[0])
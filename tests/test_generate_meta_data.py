@@ -2,6 +2,7 @@ import unittest
 import os
 import sys
 import json
+import tempfile
 import pandas as pd
 from jsonschema.exceptions import ValidationError
 import jsonschema
@@ -9,7 +10,7 @@ import pkg_resources
 
 from parameterized import parameterized
 
-from data_linter.generate_meta_data import generate_from_pd_df
+from data_linter.generate_meta_data import ColumnProfile, generate_from_pd_df, generate_from_file, generate_from_files
 
 cwd = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(__file__))
@@ -33,3 +34,103 @@ class TestGenerateMetadata(unittest.TestCase):
             schema = json.load(io)
 
         jsonschema.validate(result, schema)
+
+    def test_generate_from_file(self):
+
+        # A small chunksize means the column profiles must be combined across chunks
+        path = os.path.join(cwd, "data/test_csv_data_valid.csv")
+        expected_result = read_json(cwd, "expected_results/test_result_generated_metadata_from_file.json")
+        result = generate_from_file(path, chunksize=2)
+
+        self.assertDictEqual(result, expected_result)
+
+        with pkg_resources.resource_stream("data_linter", "data/metadata_jsonschema.json") as io:
+            schema = json.load(io)
+
+        jsonschema.validate(result, schema)
+
+    def test_generate_from_file_ints(self):
+
+        path = os.path.join(cwd, "data/test_csv_data_ints.csv")
+        result = generate_from_file(path, chunksize=2)
+
+        actual = {c["name"]: (c["type"], c["nullable"]) for c in result["columns"]}
+
+        expected = {"int_without_null": ("int", False),
+                    "int_with_null": ("int", True),
+                    "int_with_long": ("float", False),
+                    "int_with_float": ("float", False)}
+
+        self.assertDictEqual(actual, expected)
+
+    def test_generate_with_range(self):
+
+        path = os.path.join(cwd, "data/test_csv_data_valid.csv")
+        result = generate_from_file(path, chunksize=2, include_range=True)
+        cols = {c["name"]: c for c in result["columns"]}
+
+        self.assertEqual((cols["myint"]["minimum"], cols["myint"]["maximum"]), (1, 100))
+        self.assertEqual((cols["mylong"]["minimum"], cols["mylong"]["maximum"]), (234897234908, 23489727853534508))
+        self.assertEqual(cols["mydatetime"]["maximum"], "2018-01-01T10:00:00")
+        self.assertNotIn("minimum", cols["mychar"])
+
+        # The range is only added when asked for
+        self.assertNotIn("minimum", generate_from_file(path)["columns"][0])
+
+    def test_no_enum_from_small_samples(self):
+
+        profile = ColumnProfile("a")
+        profile.update(pd.Series(["x", "y"] * 3))
+        self.assertIsNone(profile.proposed_enum())
+
+        profile.update(pd.Series(["x", "y"] * 30))
+        self.assertEqual(profile.proposed_enum(), ["x", "y"])
+
+    @parameterized.expand(
+        [
+            ([1.0, None, 3.0], "int"),
+            ([1.0, None, 3e9], "long"),
+            ([1.0, None, 2.0 ** 63], "float"),
+            ([1.0, None, 2.5], "float"),
+        ]
+    )
+    def test_integral_floats(self, values, expected_type):
+
+        # Integers with nulls are read as floats from parquet and jsonl
+        profile = ColumnProfile("a")
+        profile.update(pd.Series(values, dtype=float), integral_floats=True)
+        self.assertEqual(profile.type, expected_type)
+
+        # but floats which happen to be whole numbers are still floats
+        profile = ColumnProfile("a")
+        profile.update(pd.Series(values, dtype=float))
+        self.assertEqual(profile.type, "float")
+
+    def test_parquet_types(self):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Both columns are read as floats with the same values
+        table = pa.Table.from_arrays([pa.array([1, None, 3], type=pa.int64()),
+                                      pa.array([1.0, None, 3.0], type=pa.float64())],
+                                     names=["myint", "myfloat"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.parquet")
+            pq.write_table(table, path)
+            result = generate_from_file(path)
+
+        types = {col["name"]: col["type"] for col in result["columns"]}
+        self.assertEqual(types, {"myint": "int", "myfloat": "float"})
+
+    def test_generate_from_files(self):
+
+        # The same data split across files with a different column order should give the
+        # same metadata, with columns ordered as in the first file
+        paths = [os.path.join(cwd, "data/test_csv_data_valid.csv"),
+                 os.path.join(cwd, "data/test_csv_data_valid_wrong_order.csv")]
+        expected_result = read_json(cwd, "expected_results/test_result_generated_metadata_from_file.json")
+
+        for n_jobs in [1, 2]:
+            result = generate_from_files(paths, n_jobs=n_jobs)
+            self.assertDictEqual(result, expected_result)
@@ -6,7 +6,8 @@ import json
 import os
 import sys
 
-from data_linter.impose_data_types import impose_metadata_types_on_pd_df, _pd_df_datatypes_match_metadata_data_types
+from data_linter.impose_data_types import (impose_metadata_types_on_pd_df, _pd_df_datatypes_match_metadata_data_types,
+                                           get_type_conversion_dict)
 
 cwd = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(__file__))
@@ -88,3 +89,32 @@ class ConformanceTestOfValidData(unittest.TestCase):
 
         self.assertTrue(
             _pd_df_datatypes_match_metadata_data_types(df, meta_cols))
+
+
+class IntegerImpositionTest(unittest.TestCase):
+
+    def test_nullable_long(self):
+        df = pd.DataFrame({"mylong": ["9223372036854775807", None, "-3"]})
+        meta_data = {"columns": [{"name": "mylong", "type": "long"}]}
+
+        df = impose_metadata_types_on_pd_df(df, meta_data)
+
+        self.assertEqual(str(df["mylong"].dtype), "Int64")
+        self.assertEqual(df["mylong"][0], 9223372036854775807)
+        self.assertTrue(pd.isnull(df["mylong"][1]))
+
+    def test_int_overflow_is_not_imposed(self):
+        df = pd.DataFrame({"myint": ["1", "3000000000"]})
+        meta_data = {"columns": [{"name": "myint", "type": "int"}]}
+
+        self.assertEqual(impose_metadata_types_on_pd_df(df, meta_data)["myint"].dtype.kind, "O")
+        with self.assertRaises(ValueError):
+            impose_metadata_types_on_pd_df(df, meta_data, errors="raise")
+
+    def test_type_conversion_dict_is_a_copy(self):
+        get_type_conversion_dict()["int"]["pd_datatype"] = "object"
+        df = impose_metadata_types_on_pd_df(pd.DataFrame({"myfloat": ["1.5"]}),
+                                            {"columns": [{"name": "myfloat", "type": "float"}]})
+
+        self.assertNotEqual(get_type_conversion_dict()["int"]["pd_datatype"], "object")
+        self.assertEqual(df["myfloat"].dtype.kind, "f")
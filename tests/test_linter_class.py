@@ -1,5 +1,6 @@
 import unittest
 import os
+import subprocess
 import sys
 import json
 import pandas as pd
@@ -38,3 +39,12 @@ class TestLinterMethods(unittest.TestCase):
 
         with self.assertRaises(ValidationError):
             L = Linter(df, meta)
+
+    def test_import_does_not_load_heavy_dependencies(self):
+
+        # great_expectations, jsonschema and jinja2 should only be imported when needed
+        code = ("import sys, data_linter.lint; "
+                "print([m for m in ['great_expectations', 'jsonschema', 'jinja2'] if m in sys.modules])")
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=os.path.dirname(cwd))
+
+        self.assertEqual(output.decode().strip(), "[]")
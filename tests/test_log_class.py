@@ -90,6 +90,25 @@ class TestLogMethods(unittest.TestCase):
         self.assertDictEqual(result, expected_result)
 
 
+    def test_check_range_and_length(self):
+
+        df = get_test_csv(cwd, "test_csv_data_valid")
+        meta = read_json(cwd, "meta/test_meta_cols_range.json")
+
+        l = Linter(df, meta)
+        l.check_range()
+        l.check_length()
+
+        actual = {k: {check: v[check]["result"]["unexpected_index_list"] for check in v}
+                  for k, v in l.vlog.as_dict().items()}
+
+        expected = {"myint": {"check_range": [1]},
+                    "myfloat": {"check_range": []},
+                    "mychar": {"check_length": [0]},
+                    "mydate": {"check_range": []}}
+
+        self.assertDictEqual(actual, expected)
+
     @parameterized.expand(
         [
             (
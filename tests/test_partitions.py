@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+from data_linter.partitions import discover_partitions, lint_partitioned_directory
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+def make_partitioned_dir(root, partitions):
+    path = os.path.join(cwd, "data", "test_csv_data_valid.csv")
+    for partition in partitions:
+        os.makedirs(os.path.join(root, partition))
+        shutil.copy(path, os.path.join(root, partition, "part-0.csv"))
+    with open(os.path.join(root, "_SUCCESS"), "w"):
+        pass
+
+
+class TestPartitions(unittest.TestCase):
+
+    def test_discover_partitions(self):
+        with tempfile.TemporaryDirectory() as root:
+            make_partitioned_dir(root, ["mypartition=1", "mypartition=__HIVE_DEFAULT_PARTITION__"])
+            partitions = discover_partitions(root)
+
+        self.assertEqual([(p, v) for p, v, _ in partitions], [
+            ("mypartition=1", {"mypartition": "1"}),
+            ("mypartition=__HIVE_DEFAULT_PARTITION__", {"mypartition": None}),
+        ])
+        self.assertEqual([os.path.basename(f) for _, _, files in partitions for f in files],
+                         ["part-0.csv", "part-0.csv"])
+
+    def test_valid_partitions(self):
+        meta = read_json(cwd, "meta/test_meta_cols_partition.json")
+        with tempfile.TemporaryDirectory() as root:
+            make_partitioned_dir(root, ["mypartition=1", "mypartition=2"])
+            result = lint_partitioned_directory(root, meta, n_jobs=2)
+
+        self.assertTrue(result.success())
+        self.assertEqual(len(result.file_results), 2)
+        self.assertEqual(result.partition_results["mypartition"]["check_data_type"]["result"]["element_count"], 2)
+
+    def test_invalid_partitions(self):
+        meta = read_json(cwd, "meta/test_meta_cols_partition.json")
+        meta["columns"][-1]["nullable"] = False
+        with tempfile.TemporaryDirectory() as root:
+            make_partitioned_dir(root, ["mypartition=1", "mypartition=abc",
+                                        "mypartition=__HIVE_DEFAULT_PARTITION__", "other=1"])
+            result = lint_partitioned_directory(root, meta, n_jobs=1)
+
+        self.assertFalse(result.success())
+        self.assertEqual(result.unexpected_keys, ["other"])
+
+        checks = result.partition_results["mypartition"]
+        self.assertEqual(checks["check_data_type"]["result"]["unexpected_index_list"], ["mypartition=abc"])
+        self.assertEqual(checks["check_nulls"]["result"]["unexpected_index_list"],
+                         ["mypartition=__HIVE_DEFAULT_PARTITION__", "other=1"])
+
+        # The data files are linted without the partition column
+        self.assertTrue(all(success for success, _ in result.file_results.values()))
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from parameterized import parameterized
+
+from data_linter.quarantine import quarantine_file
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+class TestQuarantine(unittest.TestCase):
+
+    @parameterized.expand([("csv",), ("jsonl",)])
+    def test_quarantine_file(self, output_format):
+
+        path = os.path.join(cwd, "data", "test_csv_data_invalid_enums.csv")
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            passed_path = os.path.join(tmpdir, "passed." + output_format)
+            failed_path = os.path.join(tmpdir, "failed." + output_format)
+
+            summary = quarantine_file(path, meta, passed_path, failed_path, chunksize=2)
+
+            if output_format == "csv":
+                passed = pd.read_csv(passed_path, dtype=object)
+                failed = pd.read_csv(failed_path, dtype=object)
+            else:
+                passed = pd.read_json(passed_path, lines=True, dtype=False)
+                failed = pd.read_json(failed_path, lines=True, dtype=False)
+
+        self.assertEqual(list(passed["mychar"]), ["a", "b"])
+        self.assertEqual(list(failed["mychar"]), ["d"])
+        self.assertEqual(list(failed["_failure_reasons"]), ["mychar:check_enums"])
+
+        self.assertEqual(summary["rows"], 3)
+        self.assertEqual(summary["failed_rows"], 1)
+        self.assertEqual(summary["failures"]["mychar"]["check_enums"], 1)
+        self.assertEqual(summary["failures"]["myint"]["check_data_type"], 0)
+
+    def test_quarantine_jsonl_to_parquet(self):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+        records = ['{"myint": 1, "mychar": "a"}', '{"myint": 2, "mychar": "d"}',
+                   '{"myint": null, "mychar": "b"}', '{"myint": 3, "mychar": "e"}']
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.jsonl")
+            with open(path, "w") as f:
+                f.write("\n".join(records) + "\n")
+            passed_path = os.path.join(tmpdir, "passed.parquet")
+            failed_path = os.path.join(tmpdir, "failed.parquet")
+
+            # The nulls in the second chunk make myint float64
+            summary = quarantine_file(path, meta, passed_path, failed_path, chunksize=2)
+
+            passed = pq.read_table(passed_path)
+            failed = pq.read_table(failed_path)
+
+        self.assertEqual(summary["failed_rows"], 2)
+        self.assertEqual(passed.schema.field_by_name("myint").type, pa.int64())
+        self.assertEqual(passed.to_pandas()["myint"].tolist()[:1], [1])
+        self.assertTrue(pd.isnull(passed.to_pandas()["myint"][1]))
+        self.assertEqual(failed.to_pandas()["myint"].tolist(), ["2", "3"])
+        self.assertEqual(failed.to_pandas()["mychar"].tolist(), ["d", "e"])
@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from parameterized import parameterized
+
+from data_linter.checks import failure_mask, failure_result
+from data_linter.lint import lint_file
+from data_linter.raw_scan import read_columns, scan_csv_patterns
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+def write_bytes(tmpdir, data, name="data.csv"):
+    path = os.path.join(tmpdir, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def pandas_result(path, col):
+    series = pd.read_csv(path, dtype=object)[col["name"]]
+    return failure_result(series, failure_mask("check_pattern", series, col))
+
+
+class TestRawScan(unittest.TestCase):
+
+    @parameterized.expand([
+        ("plain", b"a,b\n1,abc\n2,ab1\n3,xyz\n"),
+        ("no_trailing_newline", b"a,b\n1,abc\n2,ab1"),
+        ("crlf", b"a,b\r\n1,abc\r\n2,ab1\r\n"),
+        ("nulls", b"a,b\n1,\n2,NA\n3,ab1\n4,null\n"),
+        ("blank_lines", b"\na,b\n1,abc\n\n2,ab1\n\n3,d\n"),
+        ("whitespace", b"a,b\n1, abc \n2,  ab1\n3,      abc\n"),
+        ("quoted", b'a,b\n1,"abc"\n2,"ab,1"\n3,"a""bc"\n4,"x\ny"\n5,""\n'),
+        ("non_ascii", "a,b\n1,abc\n2,ébc\n3,abé\n".encode("utf-8")),
+        ("short_records", b"a,b\n1\n2,ab1\n"),
+    ])
+    def test_matches_pandas(self, name, data):
+        col = {"name": "b", "type": "character", "pattern": "^[a-z]{3}$"}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, data)
+            expected = pandas_result(path, col)
+            for block_size in [4, 1024]:
+                result = scan_csv_patterns(path, [col], block_size=block_size)["b"]
+                self.assertEqual(result, expected)
+
+    def test_unicode_pattern(self):
+        col = {"name": "b", "type": "character", "pattern": "^[éa-z]+$"}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, "a,b\n1,abé\n2,ab1\n".encode("utf-8"))
+            result = scan_csv_patterns(path, [col])["b"]
+
+        self.assertEqual(result["result"]["unexpected_list"], ["ab1"])
+        self.assertEqual(result["result"]["unexpected_index_list"], [1])
+
+    def test_skips_columns(self):
+        cols = [
+            {"name": "a", "type": "int"},
+            {"name": "missing", "type": "character", "pattern": "^a$"},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, b"a,b\n1,2\n")
+            self.assertEqual(scan_csv_patterns(path, cols), {})
+
+    def test_compressed_raises(self):
+        with self.assertRaises(ValueError):
+            scan_csv_patterns("data.csv.gz", [])
+
+    def test_lint_file(self):
+        meta_data = read_json(cwd, "meta/test_meta_cols_regex.json")
+        path = os.path.join(cwd, "data", "test_csv_data_invalid_regex.csv")
+
+        expected = lint_file(path, meta_data)
+        linter = lint_file(path, meta_data, raw_pattern_scan=True)
+
+        self.assertEqual(linter.success(), expected.success())
+        result = linter.vlog["mypattern"]["check_pattern"].result
+        expected_result = expected.vlog["mypattern"]["check_pattern"].result
+        self.assertEqual(result["unexpected_index_list"], expected_result["unexpected_index_list"])
+        self.assertEqual(result["unexpected_list"], expected_result["unexpected_list"])
+
+        # The pattern column is only scanned, but still has all of its checks
+        self.assertNotIn("mypattern", linter.df_ge.columns)
+        self.assertTrue(linter.vlog["mypattern"]["check_column_exists_and_order"].success)
+        self.assertTrue(linter.vlog["mypattern"]["check_data_type"].success)
+        self.assertEqual(linter.vlog["mypattern"]["check_data_type"].result["element_count"], 3)
+        linter.markdown_report()
+
+    def test_read_columns(self):
+        meta_data = {
+            "columns": [
+                {"name": "a", "type": "character", "pattern": "^a$"},
+                {"name": "b", "type": "character", "pattern": "^b$", "nullable": False},
+                {"name": "c", "type": "int"},
+            ]
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_bytes(tmpdir, b"a,b,c\na,b,1\n")
+            self.assertEqual(read_columns(path, meta_data), ["b", "c"])
+
+            meta_data["columns"] = meta_data["columns"][:1]
+            path = write_bytes(tmpdir, b"a\na\n")
+            self.assertEqual(read_columns(path, meta_data), ["a"])
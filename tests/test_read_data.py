@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import bz2
+import gzip
+import shutil
+import tempfile
+import pandas as pd
+
+from parameterized import parameterized
+
+from data_linter.read_data import (
+    _iter_jsonl_chunks_with_schema,
+    arrow_schema_from_metadata,
+    get_compression,
+    get_file_format,
+    read_file,
+    read_schema,
+)
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+JSONL_PATH = os.path.join(cwd, "data", "test_jsonl_data_valid.jsonl")
+
+
+def compress(path, tmpdir, compression):
+    suffix, opener = {"gz": ("gz", gzip.open), "bz2": ("bz2", bz2.open)}[compression]
+    compressed_path = os.path.join(tmpdir, os.path.basename(path) + "." + suffix)
+    with open(path, "rb") as f_in, opener(compressed_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    return compressed_path
+
+
+class TestReadData(unittest.TestCase):
+
+    @parameterized.expand([
+        ("data.csv", "csv", None),
+        ("data.jsonl.gz", "jsonl", "gzip"),
+        ("data.CSV.bz2", "csv", "bz2"),
+        ("data.ndjson.zst", "jsonl", "zstd"),
+    ])
+    def test_get_file_format(self, path, file_format, compression):
+        self.assertEqual(get_file_format(path), file_format)
+        self.assertEqual(get_compression(path), compression)
+
+    def test_jsonl_with_schema(self):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        df = read_file(JSONL_PATH, meta_data=meta)
+
+        pd.testing.assert_frame_equal(df, read_file(JSONL_PATH))
+        # Dates are left as strings
+        self.assertEqual(df["mydate"].tolist(), ["2018-01-01"] * 3)
+
+    def test_jsonl_projection(self):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        df = read_file(JSONL_PATH, columns=["myint", "mychar"], meta_data=meta)
+        self.assertEqual(list(df.columns), ["myint", "mychar"])
+
+    def test_jsonl_values_of_other_types(self):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.jsonl")
+            with open(path, "w") as f:
+                f.write('{"myint": 1, "mychar": "a"}\n{"myint": "abc", "mychar": "b"}\n')
+            df = read_file(path, meta_data=meta)
+
+        self.assertEqual(df["myint"].tolist(), [1, "abc"])
+        # Columns in the schema but not the file are not added
+        self.assertEqual(list(df.columns), ["myint", "mychar"])
+
+    def test_jsonl_null_columns(self):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.jsonl")
+            with open(path, "w") as f:
+                f.write('{"myint": 1}\n{"myint": 2, "mychar": null}\n')
+            df = read_file(path, meta_data=meta)
+            expected = read_file(path)
+
+        # mychar is null in every row but is in the file, so is a null column
+        self.assertEqual(list(df.columns), ["myint", "mychar"])
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertTrue(df["mychar"].isnull().all())
+
+    def test_jsonl_chunks_across_blocks(self):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        schema = arrow_schema_from_metadata(meta)
+        chunks = list(_iter_jsonl_chunks_with_schema(JSONL_PATH, 2, None, schema, block_size=100))
+
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(chunks[1].index.tolist(), [2])
+        self.assertEqual(pd.concat(chunks)["mychar"].tolist(), ["a", "hello", "hello"])
+
+    @parameterized.expand([("gz",), ("bz2",)])
+    def test_compressed_files(self, compression):
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        csv_path = os.path.join(cwd, "data", "test_csv_data_valid.csv")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            compressed_csv = compress(csv_path, tmpdir, compression)
+            compressed_jsonl = compress(JSONL_PATH, tmpdir, compression)
+
+            pd.testing.assert_frame_equal(read_file(compressed_csv), read_file(csv_path))
+            pd.testing.assert_frame_equal(read_file(compressed_jsonl, meta_data=meta),
+                                          read_file(JSONL_PATH, meta_data=meta))
+            self.assertEqual(read_schema(compressed_csv), read_schema(csv_path))
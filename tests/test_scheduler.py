@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+
+from data_linter.scheduler import MemoryBudgetScheduler, estimate_row_bytes, lint_files_within_budget
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.files = [
+            (os.path.join(cwd, "data", "test_csv_data_valid.csv"), read_json(cwd, "meta/test_meta_cols_valid.json")),
+            (os.path.join(cwd, "data", "test_csv_data_invalid_enums.csv"), read_json(cwd, "meta/test_meta_cols_enums.json")),
+        ]
+
+    def test_estimate_row_bytes(self):
+        meta = {"columns": [{"name": "a", "type": "int"}, {"name": "b", "type": "character"}]}
+        self.assertEqual(estimate_row_bytes(meta, "csv"), 2 * (64 * 2 + 8 + 64))
+        self.assertEqual(estimate_row_bytes(meta, "parquet"), 2 * 2 * (8 + 64))
+
+    def test_whole_files(self):
+        report = lint_files_within_budget(self.files, memory_budget=1024 ** 3, max_workers=2)
+
+        self.assertFalse(report["success"])
+        valid, invalid = [report["jobs"][path] for path, _ in self.files]
+        self.assertEqual((valid["mode"], valid["tasks"]), ("whole", 1))
+        self.assertTrue(valid["success"])
+        self.assertFalse(invalid["success"])
+        self.assertFalse(invalid["log"]["mychar"]["check_enums"]["success"])
+        self.assertLessEqual(report["peak_estimated_bytes"], 1024 ** 3)
+
+    def test_chunked_files(self):
+        scheduler = MemoryBudgetScheduler(memory_budget=10 ** 6, max_workers=2, max_task_bytes=1)
+        for path, meta in self.files:
+            scheduler.add(path, meta)
+        report = scheduler.run()
+
+        valid, invalid = [report["jobs"][path] for path, _ in self.files]
+        self.assertEqual((valid["mode"], valid["chunksize"]), ("chunked", 1))
+        # One task per row
+        self.assertEqual(valid["tasks"], 3)
+        self.assertTrue(valid["success"])
+        self.assertEqual(invalid["log"]["mychar"]["check_enums"]["result"]["unexpected_list"], ["d"])
+        self.assertLessEqual(report["peak_estimated_bytes"], 10 ** 6)
+
+    def test_chunked_uniqueness(self):
+        path, meta = self.files[0]
+        meta["columns"][0]["unique"] = True
+        meta["primary_key"] = ["myint", "mychar"]
+
+        scheduler = MemoryBudgetScheduler(memory_budget=10 ** 6, max_workers=2, max_task_bytes=1)
+        scheduler.add(path, meta)
+        job = scheduler.run()["jobs"][path]
+
+        self.assertEqual(job["mode"], "chunked")
+        self.assertFalse(job["success"])
+        # myint is 1 in the first and last rows, which are in different chunks
+        result = job["log"]["myint"]["check_unique"]
+        self.assertFalse(result["success"])
+        self.assertEqual(result["result"]["unexpected_index_list"], [0, 2])
+        for col in ["myint", "mychar"]:
+            self.assertTrue(job["log"][col]["check_primary_key"]["success"])
+            self.assertEqual(job["log"][col]["check_primary_key"]["result"]["element_count"], 3)
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from data_linter.sketches import HyperLogLog, QuantileSketch, TopValues
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_count_is_close_to_true_distinct_count(self):
+
+        hll = HyperLogLog()
+        hll.update(pd.Series([str(i) for i in range(20000)] * 2))
+
+        self.assertAlmostEqual(hll.count(), 20000, delta=20000 * 0.05)
+
+    def test_merge_matches_single_sketch(self):
+
+        values = pd.Series(range(5000))
+
+        whole = HyperLogLog()
+        whole.update(values)
+
+        first, second = HyperLogLog(), HyperLogLog()
+        first.update(values[:3000])
+        second.update(values[2000:])
+
+        self.assertEqual(first.merge(second).count(), whole.count())
+
+    def test_to_dict_round_trip(self):
+
+        hll = HyperLogLog()
+        hll.update(pd.Series(range(1000)))
+
+        self.assertEqual(HyperLogLog.from_dict(hll.to_dict()).count(), hll.count())
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_quantiles_are_close(self):
+
+        values = np.random.RandomState(1).permutation(100000)
+        sketch = QuantileSketch()
+        for chunk in np.array_split(values, 7):
+            sketch.update(chunk)
+
+        for q, estimate in zip([0.1, 0.5, 0.9], sketch.quantiles([0.1, 0.5, 0.9])):
+            self.assertAlmostEqual(estimate, q * 100000, delta=100000 * 0.03)
+        self.assertLess(sum(len(level) for level in sketch.levels), 5000)
+
+    def test_merge(self):
+
+        first, second = QuantileSketch(), QuantileSketch()
+        first.update(np.arange(0, 50000))
+        second.update(np.arange(50000, 100000))
+        merged = QuantileSketch.from_dict(first.merge(second).to_dict())
+
+        self.assertEqual(merged.count, 100000)
+        self.assertAlmostEqual(merged.quantiles([0.5])[0], 50000, delta=100000 * 0.02)
+
+    def test_empty(self):
+        self.assertEqual(QuantileSketch().quantiles([0.5]), [None])
+
+
+class TestTopValues(unittest.TestCase):
+
+    def test_frequent_values_are_kept(self):
+
+        values = ["a"] * 500 + ["b"] * 300 + [str(i) for i in range(200)]
+        top = TopValues(k=5)
+        for chunk in np.array_split(np.array(values, dtype=object), 3):
+            top.update(pd.Series(chunk))
+
+        frequencies = top.frequencies()
+        self.assertEqual(top.total, 1000)
+        self.assertEqual(set(frequencies), {"a", "b"})
+        self.assertAlmostEqual(frequencies["a"], 0.5, delta=1000 / 6 / 1000)
+
+    def test_merge(self):
+
+        first, second = TopValues(k=3), TopValues(k=3)
+        first.update(pd.Series(["a", "a", "b", None]))
+        second.update(pd.Series(["a", "c"]))
+        merged = first.merge(second)
+
+        self.assertEqual(merged.total, 5)
+        self.assertEqual(merged.counts, {"a": 3, "b": 1, "c": 1})
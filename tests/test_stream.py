@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+
+from data_linter.stream import StreamLinter
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import get_test_csv, read_json
+
+
+class TestStreamLinter(unittest.TestCase):
+
+    def test_feed_batches(self):
+
+        df = get_test_csv(cwd, "test_csv_data_invalid_enums")
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+
+        sl = StreamLinter(meta)
+        sl.feed(df.iloc[:2])
+        self.assertTrue(sl.success())
+
+        sl.feed(df.iloc[2:])
+        self.assertFalse(sl.success())
+
+        result = sl.snapshot()["mychar"]["check_enums"]["result"]
+        self.assertEqual(result["element_count"], 3)
+        self.assertEqual(result["unexpected_count"], 1)
+        self.assertEqual(result["unexpected_list"], ["d"])
+        self.assertEqual(result["unexpected_index_list"], [2])
+
+    def test_feed_records(self):
+
+        meta = read_json(cwd, "meta/test_meta_cols_enums.json")
+
+        sl = StreamLinter(meta, max_failure_samples=1)
+        sl.feed([{"myint": 1, "mychar": "x"}, {"myint": 2.5, "mychar": "y"}])
+        sl.feed([{"mychar": "a"}])
+
+        result = sl.snapshot()
+        self.assertEqual(result["mychar"]["check_enums"]["result"]["unexpected_count"], 2)
+        self.assertEqual(result["mychar"]["check_enums"]["result"]["unexpected_list"], ["x"])
+        self.assertEqual(result["myint"]["check_data_type"]["result"]["unexpected_index_list"], [1])
+        self.assertEqual(result["myint"]["check_column_exists_and_order"]["result"]["batches_missing"], 1)
@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+
+from parameterized import parameterized
+
+from data_linter.lint import lint_file
+from data_linter.read_data import _statistic_value
+from data_linter.structure import lint_structure
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+class TestStructureLinter(unittest.TestCase):
+
+    @parameterized.expand(
+        [
+            (
+                "test_csv_data_valid",
+                "meta/test_meta_cols_valid.json",
+                "expected_results/test_check_column_exists_and_order/data_valid.json",
+            ),
+            (
+                "test_csv_data_missing_col",
+                "meta/test_meta_cols_valid.json",
+                "expected_results/test_check_column_exists_and_order/missing_col.json",
+            ),
+            (
+                "test_csv_data_valid_wrong_order",
+                "meta/test_meta_cols_valid.json",
+                "expected_results/test_check_column_exists_and_order/wrong_order.json",
+            ),
+        ]
+    )
+    def test_csv_structure_matches_full_lint(self, d, m, r):
+
+        path = os.path.join(cwd, "data", d + ".csv")
+        meta = read_json(cwd, m)
+        expected_result = read_json(cwd, r)
+
+        l = lint_structure(path, meta)
+        self.assertDictEqual(l.vlog.as_dict(), expected_result)
+
+    @parameterized.expand(
+        [
+            ("meta/test_meta_cols_valid.json", True),
+            ("meta/test_meta_cols_allstring.json", False),
+        ]
+    )
+    def test_parquet_types(self, m, r):
+
+        path = os.path.join(cwd, "data", "test_parquet_data_valid.parquet")
+        meta = read_json(cwd, m)
+
+        l = lint_structure(path, meta)
+        self.assertEqual(l.success(), r)
+
+    def test_structure_first(self):
+
+        path = os.path.join(cwd, "data", "test_csv_data_missing_col.csv")
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+
+        l = lint_file(path, meta, structure_first=True)
+        self.assertFalse(l.success())
+        self.assertEqual(len(l.df_ge), 0)
+
+    def test_parquet_range(self):
+
+        path = os.path.join(cwd, "data", "test_parquet_data_valid.parquet")
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        cols = {c["name"]: c for c in meta["columns"]}
+        cols["mydate"]["minimum"] = "2017-01-01"
+        cols["mylong"]["maximum"] = 9223372036854775807
+
+        l = lint_structure(path, meta)
+        self.assertTrue(l.vlog["mydate"]["check_range"].success)
+        self.assertTrue(l.vlog["mylong"]["check_range"].success)
+
+    def test_parquet_range_wrong_type(self):
+
+        path = os.path.join(cwd, "data", "test_parquet_data_valid.parquet")
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        # The statistics of mychar are strings, which can't be compared with an int range
+        col = [c for c in meta["columns"] if c["name"] == "mychar"][0]
+        col.update({"type": "int", "minimum": 0})
+
+        l = lint_structure(path, meta)
+        le = l.vlog["mychar"]["check_range"]
+        self.assertFalse(le.success)
+        self.assertTrue(le.exception_info["raised_exception"])
+
+    @parameterized.expand(
+        [
+            (pd.Timestamp("2018-01-01 10:00", tz="UTC"), pa.timestamp("ms")),
+            (pd.Timestamp("2018-01-01 11:00", tz="Europe/Paris"), pa.timestamp("ms", tz="Europe/Paris")),
+            (1514800800000, pa.timestamp("ms")),
+        ]
+    )
+    def test_statistic_value_is_naive(self, value, arrow_type):
+
+        # Newer versions of pyarrow give the statistics of timestamp columns as UTC timestamps
+        statistic = _statistic_value(value, arrow_type)
+        self.assertEqual(statistic, pd.Timestamp("2018-01-01 10:00"))
+        self.assertIsNone(statistic.tzinfo)
@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+from data_linter.lint import Linter
+from data_linter.uniqueness import DuplicateFinder, find_duplicates_in_files
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import get_test_csv, read_json
+
+
+class TestUniqueness(unittest.TestCase):
+
+    def test_spilled_result_matches_in_memory(self):
+
+        keys = pd.DataFrame({"a": np.arange(10000) % 7000, "b": ["x"] * 10000})
+
+        results = []
+        for memory_budget in [10 ** 9, 1000]:
+            finder = DuplicateFinder(memory_budget=memory_budget, num_partitions=8, max_samples=3)
+            for start in range(0, 10000, 2500):
+                chunk = keys.iloc[start:start + 2500]
+                finder.update(chunk, np.arange(start, start + len(chunk)))
+            results.append(finder.finish())
+
+        self.assertEqual(results[0]["duplicate_row_count"], 6000)
+        self.assertEqual(results[0]["duplicate_key_count"], 3000)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0]["samples"][0], [0, 7000])
+
+    def test_check_unique(self):
+
+        df = get_test_csv(cwd, "test_csv_data_valid")
+        meta = read_json(cwd, "meta/test_meta_cols_unique.json")
+
+        l = Linter(df, meta)
+        l.check_unique()
+
+        unique_result = l.vlog["myint"]["check_unique"]
+        self.assertFalse(unique_result.success)
+        self.assertEqual(unique_result.result["unexpected_index_list"], [0, 2])
+
+        self.assertTrue(l.vlog["myint"]["check_primary_key"].success)
+        self.assertTrue(l.vlog["mychar"]["check_primary_key"].success)
+        self.assertNotIn("check_unique", l.vlog["mychar"].entries)
+
+    def test_find_duplicates_in_files(self):
+
+        paths = [os.path.join(cwd, "data", "test_csv_data_valid.csv"),
+                 os.path.join(cwd, "data", "test_csv_data_valid_enums.csv")]
+
+        result = find_duplicates_in_files(paths, ["myint", "mychar"])
+
+        # (1, hello) and (100, hello) appear once each, but (1, a) is in both files
+        self.assertEqual(result["duplicate_key_count"], 1)
+        self.assertEqual(result["samples"], [[(paths[0], 0), (paths[1], 0)]])
+
+    def test_find_duplicates_in_files_of_different_formats(self):
+
+        meta = {"columns": [{"name": "myint", "type": "int"}, {"name": "mychar", "type": "character"}]}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, "data.csv"), os.path.join(tmpdir, "data.jsonl")]
+            with open(paths[0], "w") as f:
+                f.write("myint,mychar\n1,a\n2,b\n")
+            with open(paths[1], "w") as f:
+                f.write('{"myint": 1, "mychar": "a"}\n{"myint": null, "mychar": "b"}\n')
+
+            # Read as they are, the csv's strings never match the jsonl file's numbers
+            result = find_duplicates_in_files(paths, ["myint", "mychar"])
+            self.assertEqual(result["duplicate_key_count"], 0)
+
+            result = find_duplicates_in_files(paths, ["myint", "mychar"], meta_data=meta)
+
+        self.assertEqual(result["duplicate_key_count"], 1)
+        self.assertEqual(result["samples"], [[(paths[0], 0), (paths[1], 0)]])
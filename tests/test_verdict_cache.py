@@ -0,0 +1,105 @@
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from data_linter.checks import failure_mask
+from data_linter.impose_data_types import convert_datetime_column
+from data_linter.lint import Linter
+from data_linter.verdict_cache import VerdictCache
+
+cwd = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from testutils import read_json
+
+
+class TestVerdictCache(unittest.TestCase):
+
+    def test_apply(self):
+        calls = []
+
+        def evaluate(values):
+            calls.append(values.tolist())
+            return values.str.startswith("a")
+
+        with VerdictCache(":memory:") as cache:
+            first = cache.apply("pattern", "^a", pd.Series(["a", "b", "a"]), evaluate)
+            second = cache.apply("pattern", "^a", pd.Series(["b", "ab"], index=[5, 6]), evaluate)
+
+            self.assertEqual(first.tolist(), [1, 0, 1])
+            self.assertEqual(second.tolist(), [0, 1])
+            self.assertEqual(second.index.tolist(), [5, 6])
+            self.assertEqual(calls, [["a", "b"], ["ab"]])
+            self.assertEqual(cache.stats.as_dict()["hits"], 1)
+            self.assertEqual(cache.stats.as_dict()["misses"], 3)
+
+    def test_lru_eviction(self):
+        with VerdictCache(":memory:", max_entries=3) as cache:
+            cache.store("pattern", "^a", {"a": 1, "b": 0})
+            cache.lookup("pattern", "^a", ["a"])
+            cache.store("pattern", "^a", {"c": 0, "d": 0})
+
+            self.assertEqual(len(cache), 3)
+            self.assertEqual(cache.lookup("pattern", "^a", ["a", "b", "c", "d"]), {"a": 1, "c": 0, "d": 0})
+
+    def test_store_existing_values(self):
+        with VerdictCache(":memory:", max_entries=3) as cache:
+            cache.store("pattern", "^a", {"a": 1, "b": 0})
+            # Values already in the cache are updated, and don't count towards max_entries
+            cache.store("pattern", "^a", {"a": 0, "b": 0})
+            cache.store("pattern", "^a", {"c": 0})
+
+            self.assertEqual(len(cache), 3)
+            self.assertEqual(cache.lookup("pattern", "^a", ["a", "b", "c"]), {"a": 0, "b": 0, "c": 0})
+
+    def test_persists_between_runs(self):
+        col = {"name": "mychar", "type": "character", "pattern": "^[a-c]$"}
+        series = pd.Series(["a", "d", None, "b"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "verdicts.sqlite")
+            with VerdictCache(path) as cache:
+                first = failure_mask("check_pattern", series, col, cache)
+            with VerdictCache(path) as cache:
+                second = failure_mask("check_pattern", series, col, cache)
+                stats = cache.stats.as_dict()
+
+        expected = failure_mask("check_pattern", series, col)
+        self.assertEqual(first.tolist(), expected.tolist())
+        self.assertEqual(second.tolist(), expected.tolist())
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 0))
+
+    def test_type_failures(self):
+        col = {"name": "myint", "type": "int"}
+        series = pd.Series(["1", "x", "2.5", "1"])
+        with VerdictCache(":memory:") as cache:
+            failures = failure_mask("check_data_type", series, col, cache)
+        self.assertEqual(failures.tolist(), [False, True, True, False])
+
+    def test_convert_datetime_column(self):
+        series = pd.Series(["2018-01-01T10:00:00.123456789", None, "2018-01-02"])
+        with VerdictCache(":memory:") as cache:
+            convert_datetime_column(series, "ignore", cache)
+            result = convert_datetime_column(series, "ignore", cache)
+            unparseable = convert_datetime_column(pd.Series(["2018-01-01", "x"]), "ignore", cache)
+
+        pd.testing.assert_series_equal(result, pd.to_datetime(series))
+        self.assertEqual(unparseable.tolist(), ["2018-01-01", "x"])
+
+    def test_linter_reports_stats(self):
+        df = pd.read_csv(os.path.join(cwd, "data", "test_csv_data_valid.csv"), dtype=object)
+        meta = read_json(cwd, "meta/test_meta_cols_valid.json")
+        meta["columns"][2]["pattern"] = "^[a-z]+$"
+
+        with VerdictCache(":memory:") as cache:
+            Linter(df, meta, verdict_cache=cache).check_all()
+            linter = Linter(df, meta, verdict_cache=cache)
+            linter.check_all()
+
+        self.assertTrue(linter.success())
+        stats = linter.verdict_cache_stats()
+        self.assertEqual(stats["misses"], 0)
+        self.assertGreater(stats["hits"], 0)
+        self.assertIn("Verdict cache", linter.markdown_summary())